@@ -11,11 +11,33 @@ class Anthology(RestAPIClient):
 
     _campus_id = 5
 
-    def __init__(self, base_url, application_key):
+    def __init__(
+        self,
+        base_url,
+        application_key,
+        configuration_ttl: int = 3600,
+        configuration_snapshot: AnyStr = None,
+        preload_configurations: bool = False,
+    ):
+        """
+        Args:
+            base_url (AnyStr): Anthology base URL
+            application_key (AnyStr): Anthology API key
+            configuration_ttl (int, optional): seconds a configuration fetched with fetch_cached_configurations is
+                reused for. Defaults to an hour.
+            configuration_snapshot (AnyStr, optional): path of a JSON file the configuration cache is persisted to
+                and restored from, e.g. on a cold start
+            preload_configurations (bool, optional): fetch all parameterless configuration types concurrently now,
+                rather than one at a time when first needed. Defaults to False.
+        """
         super().__init__(authorization=application_key, base_url=base_url)
 
         self.timeout = 30  # Anthology's APIs are incredibly slow and prone to timeouts.
         self.endpoints = all_endpoints
+        self.configuration_ttl = configuration_ttl
+        self.configuration_snapshot = configuration_snapshot
+        if preload_configurations:
+            self.preload_configurations()
 
     @staticmethod
     def format_anthology_filters(supplied_filters: Dict) -> AnyStr:
@@ -47,7 +69,19 @@ class Anthology(RestAPIClient):
 
     from .certificate._create import create_certificate
 
-    from .configuration._read import fetch_configurations
+    from .configuration._read import fetch_configurations, fetch_configurations_batch, _configuration_url
+    from .configuration._cache import (
+        _cached_configuration_entries,
+        _cached_configuration_entry,
+        _load_configuration_snapshot,
+        _store_configuration_entries,
+        _write_configuration_snapshot,
+        fetch_cached_configurations,
+        fetch_cached_configurations_batch,
+        fetch_configuration_indexes,
+        preload_configurations,
+        invalidate_configurations,
+    )
     from .configuration._create import create_term, create_start_date, validate_term, add_programs_to_start_date
     from .configuration._copy import copy_class_schedule
 
@@ -62,6 +96,8 @@ class Anthology(RestAPIClient):
         fetch_classes_for_courses,
         fetch_course_by_cccid,
         fetch_all_enrolled_courses,
+        stream_all_courses,
+        stream_all_enrolled_courses,
     )
     from .course._register import register_course, add_new_course, add_attendance
     from .course._reinstate import reinstate_course
@@ -73,8 +109,12 @@ class Anthology(RestAPIClient):
         fetch_enrollment_by_enrollment_id,
         fetch_all_enrollments,
         fetch_student_enrollment_period_by_id,
+        stream_all_enrollments,
     )
 
+    from .odata._batch import _batch_service_root, odata_batch, odata_batch_get
+    from .odata._read import stream_odata, stream_odata_changes
+
     from .student._create import create_student
-    from .student._read import student_by_id, student_search  # refactored
+    from .student._read import student_by_id, student_search, student_search_many  # refactored
     from .student._update import update_student, change_student_status
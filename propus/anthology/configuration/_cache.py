@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+from typing import AnyStr, Dict, List, Tuple
+
+# Configuration types which need no parameters, and can therefore be preloaded
+PRELOADABLE_CONFIGURATIONS = [
+    "billing_method",
+    "ethnicity",
+    "gender",
+    "grade_level",
+    "program",
+    "pronoun",
+    "school_status",
+    "shift",
+    "suffix",
+    "term",
+    "title",
+]
+
+# Kept at module level so the cache outlives the Anthology object, e.g. across warm starts of a Lambda, and is shared
+# by every Anthology object of the process. Keyed by base URL, then by configuration type and parameters.
+_configuration_cache = {}
+_configuration_cache_lock = threading.Lock()
+
+
+def _configuration_key(configuration_type: AnyStr, kwargs: Dict) -> AnyStr:
+    return f"{configuration_type}:{json.dumps(kwargs, sort_keys=True, default=str)}"
+
+
+def build_configuration_indexes(values: List[Dict]) -> Dict[AnyStr, Dict]:
+    """
+    Build the reverse lookups of a configuration list.
+
+    Args:
+        values (List[Dict]): the "value" list of a configuration response
+
+    Returns:
+        Dict: {"name": {Name: Id}, "code": {Code: Id}}
+    """
+    return {
+        "name": {v["Name"]: v.get("Id") for v in values if v.get("Name") is not None},
+        "code": {v["Code"]: v.get("Id") for v in values if v.get("Code") is not None},
+    }
+
+
+def _load_configuration_snapshot(self) -> Dict:
+    if not (self.configuration_snapshot and os.path.isfile(self.configuration_snapshot)):
+        return {}
+    with open(self.configuration_snapshot, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _write_configuration_snapshot(self, entries: Dict):
+    # Written next to its destination and renamed, so a concurrent reader never sees a partial file
+    directory = os.path.dirname(os.path.abspath(self.configuration_snapshot))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{self.configuration_snapshot}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(entries, file)
+    os.replace(tmp_path, self.configuration_snapshot)
+
+
+def _cached_configuration_entries(self) -> Dict:
+    # Callers must hold _configuration_cache_lock
+    entries = _configuration_cache.setdefault(self.base_url, {})
+    if not entries and self.configuration_snapshot:
+        entries.update(self._load_configuration_snapshot())
+    return entries
+
+
+def _store_configuration_entries(self, responses: Dict[AnyStr, Dict]) -> Dict[AnyStr, Dict]:
+    fetched_at = time()
+    new_entries = {
+        key: {
+            "fetched_at": fetched_at,
+            "response": response,
+            "indexes": build_configuration_indexes(response.get("value") or []) if isinstance(response, dict) else {},
+        }
+        for key, response in responses.items()
+    }
+    with _configuration_cache_lock:
+        entries = self._cached_configuration_entries()
+        entries.update(new_entries)
+        if self.configuration_snapshot:
+            self._write_configuration_snapshot(entries)
+    return new_entries
+
+
+async def _cached_configuration_entry(self, configuration_type: AnyStr, **kwargs) -> Dict:
+    key = _configuration_key(configuration_type, kwargs)
+    with _configuration_cache_lock:
+        entry = self._cached_configuration_entries().get(key)
+    if entry and time() - entry["fetched_at"] < self.configuration_ttl:
+        return entry
+
+    response = await self.fetch_configurations(configuration_type, **kwargs)
+    return self._store_configuration_entries({key: response})[key]
+
+
+async def fetch_cached_configurations(self, configuration_type: AnyStr, **kwargs) -> Dict:
+    """
+    Cached version of fetch_configurations. A response is reused for configuration_ttl seconds, by every Anthology
+    object of the process, and from the configuration_snapshot file when one is set.
+
+    Args:
+        configuration_type (AnyStr): configuration type requested, see fetch_configurations
+        kwargs: Any additional arguments needed for the configuration fetching
+
+    Returns:
+        dict: the response of fetch_configurations
+    """
+    return (await self._cached_configuration_entry(configuration_type, **kwargs))["response"]
+
+
+async def fetch_cached_configurations_batch(self, configurations: List[Tuple[AnyStr, Dict]]) -> List[Dict]:
+    """
+    Cached version of fetch_configurations_batch: the configurations missing from the cache, or expired, are fetched
+    together in a single OData $batch request.
+
+    Args:
+        configurations (List[Tuple[AnyStr, Dict]]): configuration type and additional arguments of each configuration,
+            e.g. [("program_version", {"program_id": 4}), ("program_version", {"program_id": 5})]
+
+    Returns:
+        List[Dict]: the response of each configuration, in order
+    """
+    keys = [_configuration_key(t, kwargs) for t, kwargs in configurations]
+    with _configuration_cache_lock:
+        entries = self._cached_configuration_entries()
+        cached = {
+            k: entries[k] for k in keys if k in entries and time() - entries[k]["fetched_at"] < self.configuration_ttl
+        }
+
+    missing = {k: c for k, c in zip(keys, configurations) if k not in cached}
+    if missing:
+        responses = await self.fetch_configurations_batch(list(missing.values()))
+        cached |= self._store_configuration_entries(dict(zip(missing, responses)))
+    return [cached[k]["response"] for k in keys]
+
+
+async def fetch_configuration_indexes(self, configuration_type: AnyStr, **kwargs) -> Dict[AnyStr, Dict]:
+    """
+    Reverse lookups of a configuration, cached like fetch_cached_configurations.
+
+    Args:
+        configuration_type (AnyStr): configuration type requested, see fetch_configurations
+        kwargs: Any additional arguments needed for the configuration fetching
+
+    Returns:
+        dict: {"name": {Name: Id}, "code": {Code: Id}}, e.g. indexes["code"]["2023-24-TERM-19"] -> 175
+    """
+    return (await self._cached_configuration_entry(configuration_type, **kwargs))["indexes"]
+
+
+def preload_configurations(self, configuration_types: List[AnyStr] = None, max_concurrency: int = 8) -> Dict:
+    """
+    Fill the configuration cache with several configuration types at once, fetching them concurrently.
+
+    Args:
+        configuration_types (List[AnyStr], optional): the types to preload. Defaults to PRELOADABLE_CONFIGURATIONS.
+        max_concurrency (int, optional): maximum number of requests at once. Defaults to 8.
+
+    Returns:
+        dict: configuration type -> the exception raised while fetching it, for the types which failed
+    """
+    configuration_types = configuration_types or PRELOADABLE_CONFIGURATIONS
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        futures = {t: pool.submit(asyncio.run, self.fetch_cached_configurations(t)) for t in configuration_types}
+    return {t: future.exception() for t, future in futures.items() if future.exception()}
+
+
+def invalidate_configurations(self, configuration_type: AnyStr = None):
+    """
+    Drop cached configurations, e.g. after creating a term.
+
+    Args:
+        configuration_type (AnyStr, optional): the type to drop, with any parameters. Defaults to all types.
+    """
+    with _configuration_cache_lock:
+        entries = _configuration_cache.get(self.base_url, {})
+        for key in list(entries):
+            if configuration_type is None or key.startswith(f"{configuration_type}:"):
+                del entries[key]
+        if self.configuration_snapshot and os.path.isfile(self.configuration_snapshot):
+            self._write_configuration_snapshot(entries)
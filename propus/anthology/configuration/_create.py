@@ -125,12 +125,14 @@ async def create_start_date(self, name: AnyStr, start_date: datetime) -> Dict:
 
 
 async def add_programs_to_start_date(self, term_name: str, start_date: datetime) -> Dict:
-    program_resp = await self.fetch_configurations(configuration_type="program")
+    program_resp = await self.fetch_cached_configurations(configuration_type="program")
+    programs = [prog for prog in program_resp.get("value") if prog.get("Code") != "CONED"]
+    # The program versions of every program are read in one $batch request
+    prog_ver_resps = await self.fetch_cached_configurations_batch(
+        [("program_version", {"program_id": prog.get("Id")}) for prog in programs]
+    )
     start_request_body = []
-    for prog in program_resp.get("value"):
-        if prog.get("Code") == "CONED":
-            continue
-        prog_ver_resp = await self.fetch_configurations(configuration_type="program_version", program_id=prog.get("Id"))
+    for prog, prog_ver_resp in zip(programs, prog_ver_resps):
         for prog_ver in prog_ver_resp.get("value"):
             total_weeks = prog_ver.get("TotalWeeks")
             mid_point_date = start_date + timedelta(days=(floor(total_weeks / 2)) * 7)
@@ -1,4 +1,4 @@
-from typing import AnyStr, Dict
+from typing import AnyStr, Dict, List, Tuple
 
 
 async def fetch_configurations(self, configuration_type: AnyStr, **kwargs) -> Dict:
@@ -27,8 +27,24 @@ async def fetch_configurations(self, configuration_type: AnyStr, **kwargs) -> Di
     Returns:
         dict: Dictionary data of all available billing methods
     """
+    return self.make_request(url=self._configuration_url(configuration_type, **kwargs))
+
+
+def _configuration_url(self, configuration_type: AnyStr, **kwargs) -> AnyStr:
     if configuration_type in ["program_version", "program", "shift", "start_date"]:
         kwargs["campus_id"] = self._campus_id
-    return self.make_request(
-        url=self._get_endpoint(configuration_type, parameters={f"<{k}>": v for k, v in kwargs.items()})
-    )
+    return self._get_endpoint(configuration_type, parameters={f"<{k}>": v for k, v in kwargs.items()})
+
+
+async def fetch_configurations_batch(self, configurations: List[Tuple[AnyStr, Dict]]) -> List[Dict]:
+    """
+    Fetch several configurations in a single OData $batch request, see fetch_configurations.
+
+    Args:
+        configurations (List[Tuple[AnyStr, Dict]]): configuration type and additional arguments of each configuration,
+            e.g. [("program_version", {"program_id": 4}), ("program_version", {"program_id": 5})]
+
+    Returns:
+        List[Dict]: the response of each configuration, in order
+    """
+    return await self.odata_batch_get([self._configuration_url(t, **kwargs) for t, kwargs in configurations])
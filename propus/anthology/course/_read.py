@@ -1,5 +1,5 @@
 import json
-from typing import Dict, List, AnyStr
+from typing import Dict, Iterator, List, AnyStr
 
 
 async def fetch_classes_for_courses(self, student_id: int, term_id: int, course_ids: List[int]) -> Dict:
@@ -163,3 +163,32 @@ async def fetch_course_by_cccid(self, ccc_id: AnyStr, enrollment_id=None) -> Dic
         url=self._get_endpoint("course_search"),
         params={"$filter": filter_param, "$expand": "Student,Enrollment,Course,Term"},
     )
+
+
+def stream_all_courses(self, profile: AnyStr = "courses", **kwargs) -> Iterator[Dict]:
+    """
+    Streaming version of fetch_all_courses, reading the course catalog page by page. See Anthology.stream_odata.
+
+    Args:
+        profile (AnyStr, optional): $select/$expand profile. Defaults to "courses".
+        kwargs: Any additional arguments for stream_odata, e.g. params={"$filter": "IsActive eq true"}
+
+    Returns:
+        Iterator[Dict]: course entities
+    """
+    return self.stream_odata("fetch_all_courses", profile=profile, **kwargs)
+
+
+def stream_all_enrolled_courses(self, profile: AnyStr = "enrolled_courses", **kwargs) -> Iterator[Dict]:
+    """
+    Streaming version of fetch_all_enrolled_courses, reading the student courses page by page with only the columns
+    of the profile. See Anthology.stream_odata.
+
+    Args:
+        profile (AnyStr, optional): $select/$expand profile. Defaults to "enrolled_courses".
+        kwargs: Any additional arguments for stream_odata, e.g. page_size=1000
+
+    Returns:
+        Iterator[Dict]: student course entities, with their Student, Enrollment, Course and Term
+    """
+    return self.stream_odata("course_search", profile=profile, **kwargs)
@@ -14,6 +14,7 @@ from propus.anthology.endpoints.course import (
     course_unregister_endpoints,
 )
 from propus.anthology.endpoints.enrollment import enrollment_create_endpoints, enrollment_read_endpoints
+from propus.anthology.endpoints.odata import odata_batch_endpoints
 from propus.anthology.endpoints.student import (
     student_create_endpoints,
     student_read_endpoints,
@@ -35,6 +36,7 @@ end_points = [
     course_unregister_endpoints,
     enrollment_create_endpoints,
     enrollment_read_endpoints,
+    odata_batch_endpoints,
     student_create_endpoints,
     student_read_endpoints,
     student_update_endpoints,
@@ -0,0 +1,3 @@
+odata_batch_endpoints = {
+    "odata_batch": ("<service_root>/$batch", ["<service_root>"]),
+}
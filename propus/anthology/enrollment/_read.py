@@ -1,5 +1,5 @@
 import json
-from typing import Dict, AnyStr
+from typing import Dict, Iterator, AnyStr
 
 
 async def fetch_all_enrollments(self) -> Dict:
@@ -15,6 +15,21 @@ async def fetch_all_enrollments(self) -> Dict:
     )
 
 
+def stream_all_enrollments(self, profile: AnyStr = "enrollments", **kwargs) -> Iterator[Dict]:
+    """
+    Streaming version of fetch_all_enrollments, reading the enrollments page by page with only the columns of the
+    profile. See Anthology.stream_odata.
+
+    Args:
+        profile (AnyStr, optional): $select/$expand profile. Defaults to "enrollments".
+        kwargs: Any additional arguments for stream_odata, e.g. page_size=1000
+
+    Returns:
+        Iterator[Dict]: enrollment entities, with their Student, Program, ProgramVersion and StartTerm
+    """
+    return self.stream_odata("enrollment_search", profile=profile, **kwargs)
+
+
 async def fetch_enrollment_by_cccid(self, ccc_id: AnyStr) -> Dict:
     """
     API Wrapper to fetch enrollments for a specific student
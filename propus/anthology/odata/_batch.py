@@ -0,0 +1,106 @@
+import json
+import re
+from typing import AnyStr, Dict, List
+
+from requests.utils import requote_uri
+
+from propus.api_client import FailedRequest
+
+# OData service roots of Anthology; a $batch request is sent to one of them and may only hold its operations
+ODATA_SERVICE_ROOT = re.compile(r"^(/ds/[^/]+)/")
+
+
+def _batch_service_root(self, url: AnyStr) -> AnyStr:
+    path = url.removeprefix(self.base_url)
+    match = ODATA_SERVICE_ROOT.match(path)
+    if not match:
+        raise ValueError(f"{url} is not an OData URL, only OData operations can be batched")
+    return match.group(1)
+
+
+async def odata_batch(self, operations: List[Dict], max_operations: int = 100) -> List[Dict]:
+    """
+    Send several OData operations in a single HTTP request using OData JSON $batch, instead of one request each.
+    Operations are grouped by OData service root (/ds/odata, /ds/campusnexus) and sent max_operations at a
+    time; their responses are returned in the order of the operations.
+
+    The commands API (/api/commands/...) is not an OData service and cannot be batched.
+
+    Args:
+        operations (List[Dict]): the operations, each a dict with:
+            - url (AnyStr): full URL of the operation, e.g. self._get_endpoint("term")
+            - method (AnyStr, optional): HTTP method. Defaults to GET.
+            - body (Dict, optional): JSON body of the operation
+        max_operations (int, optional): maximum number of operations per $batch request. Defaults to 100.
+
+    Returns:
+        List[Dict]: the response of each operation. Example:
+        [
+            {"status": 200, "headers": {...}, "body": {"@odata.context": "...", "value": [...]}},
+            {"status": 404, "headers": {...}, "body": {"error": {...}}}
+        ]
+    """
+    groups = {}
+    for index, operation in enumerate(operations):
+        groups.setdefault(self._batch_service_root(operation["url"]), []).append(index)
+
+    responses = [None] * len(operations)
+    for service_root, indexes in groups.items():
+        for chunk in (indexes[i:][:max_operations] for i in range(0, len(indexes), max_operations)):
+            requests = []
+            for index in chunk:
+                operation = operations[index]
+                request = {
+                    "id": str(index),
+                    "method": operation.get("method", "GET").upper(),
+                    "url": requote_uri(operation["url"].removeprefix(self.base_url)),
+                    "headers": {"accept": "application/json"},
+                }
+                if operation.get("body") is not None:
+                    request["headers"]["content-type"] = "application/json"
+                    request["body"] = operation["body"]
+                requests.append(request)
+
+            batch_response = self.make_request(
+                req_type="post",
+                url=self._get_endpoint("odata_batch", parameters={"<service_root>": service_root}),
+                data=json.dumps({"requests": requests}),
+            )
+            for response in (batch_response or {}).get("responses", []):
+                body = response.get("body")
+                if isinstance(body, str):
+                    try:
+                        body = json.loads(body)
+                    except ValueError:
+                        pass
+                responses[int(response["id"])] = {
+                    "status": response.get("status"),
+                    "headers": response.get("headers", {}),
+                    "body": body,
+                }
+
+    missing = [index for index, response in enumerate(responses) if response is None]
+    if missing:
+        raise FailedRequest(500, f"$batch response is missing operations {missing}")
+    return responses
+
+
+async def odata_batch_get(self, urls: List[AnyStr], max_operations: int = 100) -> List[Dict]:
+    """
+    Batched version of several GET requests, see odata_batch.
+
+    Args:
+        urls (List[AnyStr]): full URLs to read
+        max_operations (int, optional): maximum number of operations per $batch request. Defaults to 100.
+
+    Returns:
+        List[Dict]: the body of each response, in the order of the urls
+
+    Raises:
+        FailedRequest: if any of the reads failed
+    """
+    responses = await self.odata_batch([{"url": url} for url in urls], max_operations=max_operations)
+    for url, response in zip(urls, responses):
+        if not 200 <= (response["status"] or 0) < 300:
+            raise FailedRequest(response["status"], f"{url}: {response['body']}")
+    return [response["body"] for response in responses]
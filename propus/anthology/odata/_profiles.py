@@ -0,0 +1,45 @@
+"""
+$select / $expand projection profiles for the Anthology OData reader (Anthology.stream_odata).
+
+Expanding Student, Enrollment, Course and Term without a projection returns every column of every entity, most of
+which no caller reads, and is what makes the full scans slow enough to time out. A profile lists the columns a caller
+needs, so it only pays for those.
+"""
+
+ODATA_PROFILES = {
+    # Student courses with the student, enrollment period, course and term they belong to
+    "enrolled_courses": {
+        "$select": (
+            "Id,StudentId,StudentEnrollmentPeriodId,CourseId,TermId,ClassSectionId,Status,LetterGrade,StartDate,"
+            "EndDate,LastModifiedDateTime"
+        ),
+        "$expand": (
+            "Student($select=Id,StudentNumber,FirstName,LastName,EmailAddress),"
+            "Enrollment($select=Id,EnrollmentNumber,SchoolStatusId,ProgramVersionId,StartDate),"
+            "Course($select=Id,Code,Name),"
+            "Term($select=Id,Code,StartDate,EndDate)"
+        ),
+    },
+    # Course catalog
+    "courses": {"$select": "Id,Code,Name,IsActive,LastModifiedDateTime"},
+    # Enrollment periods with the student, program, program version and start term
+    "enrollments": {
+        "$select": (
+            "Id,StudentId,EnrollmentNumber,SchoolStatusId,ProgramId,ProgramVersionId,StartDate,GraduationDate,"
+            "LastModifiedDateTime"
+        ),
+        "$expand": (
+            "Student($select=Id,StudentNumber),"
+            "Program($select=Id,Code,Name),"
+            "ProgramVersion($select=Id,Code,Name),"
+            "StartTerm($select=Id,Code,StartDate)"
+        ),
+    },
+    # Students
+    "students": {
+        "$select": (
+            "Id,StudentNumber,FirstName,LastName,MiddleName,EmailAddress,OtherEmailAddress,SchoolStatusId,"
+            "LastModifiedDateTime"
+        ),
+    },
+}
@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AnyStr, Dict, Iterator
+
+from propus.anthology.odata._profiles import ODATA_PROFILES
+
+
+def _odata_page(self, url: AnyStr, params: Dict = None) -> Dict:
+    response = self.make_request(url=url, params=params)
+    if not isinstance(response, dict) or "value" not in response:
+        raise ValueError(f"Unexpected OData response from {url}: {response}")
+    return response
+
+
+def stream_odata(
+    self,
+    endpoint: AnyStr,
+    params: Dict = None,
+    profile: AnyStr = None,
+    page_size: int = 500,
+    max_concurrency: int = 4,
+) -> Iterator[Dict]:
+    """
+    Stream the entities of an Anthology OData endpoint page by page, instead of loading them in a single request.
+
+    The first page is requested with $count=true. When Anthology reports the total count, the remaining pages are
+    requested concurrently with $top/$skip (ordered by Id unless $orderby is given, so pages do not overlap) and yielded
+    in order. When it answers with an @odata.nextLink instead, the next links are followed one after the other.
+
+    Args:
+        endpoint (AnyStr): name of an OData endpoint, e.g. "course_search"
+        params (Dict, optional): additional OData query options, e.g. {"$filter": "Status eq 'C'"}. They override the
+            options of the profile.
+        profile (AnyStr, optional): name of a $select/$expand profile from ODATA_PROFILES, e.g. "enrolled_courses"
+        page_size (int, optional): number of entities per request. Defaults to 500.
+        max_concurrency (int, optional): maximum number of pages requested at once. Defaults to 4.
+
+    Returns:
+        Iterator[Dict]: the entities, one at a time
+    """
+    url = self._get_endpoint(endpoint)
+    query = dict(ODATA_PROFILES[profile]) if profile else {}
+    query |= params or {}
+    query.setdefault("$orderby", "Id")
+
+    first = _odata_page(self, url, query | {"$top": page_size, "$skip": 0, "$count": "true"})
+    yield from first["value"]
+
+    next_link = first.get("@odata.nextLink")
+    total = first.get("@odata.count")
+    if total is not None and not next_link:
+        skips = range(page_size, int(total), page_size)
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            # Keep at most max_concurrency pages in flight, yielding them in order as they complete
+            pending = []
+            for skip in skips:
+                pending.append(pool.submit(_odata_page, self, url, query | {"$top": page_size, "$skip": skip}))
+                if len(pending) >= max_concurrency:
+                    yield from pending.pop(0).result()["value"]
+            for future in pending:
+                yield from future.result()["value"]
+        return
+
+    if next_link:
+        while next_link:
+            page = _odata_page(self, next_link)
+            yield from page["value"]
+            next_link = page.get("@odata.nextLink")
+        return
+
+    # Neither a count nor a next link: keep skipping until a short page
+    skip, page = page_size, first
+    while len(page["value"]) == page_size:
+        page = _odata_page(self, url, query | {"$top": page_size, "$skip": skip})
+        yield from page["value"]
+        skip += page_size
+
+
+def stream_odata_changes(self, endpoint: AnyStr, since: datetime, params: Dict = None, **kwargs) -> Iterator[Dict]:
+    """
+    Stream only the entities of an Anthology OData endpoint modified after a point in time (delta query), by adding
+    "LastModifiedDateTime gt <since>" to the $filter. See stream_odata.
+
+    The pages stay ordered by Id rather than by LastModifiedDateTime: an entity modified while the query runs then
+    only shows up twice, whereas with a time ordering it would move to the end and shift an unread entity into an
+    already read page.
+
+    Args:
+        endpoint (AnyStr): name of an OData endpoint, e.g. "student_search"
+        since (datetime): only entities modified after this time are returned
+        params (Dict, optional): additional OData query options. A $filter is combined with the delta filter.
+        kwargs: Any additional arguments for stream_odata, e.g. profile="students"
+
+    Returns:
+        Iterator[Dict]: the modified entities, one at a time
+    """
+    params = dict(params or {})
+    delta_filter = f"LastModifiedDateTime gt {since.strftime('%Y-%m-%dT%H:%M:%S')}Z"
+    params["$filter"] = f"({params['$filter']}) and {delta_filter}" if params.get("$filter") else delta_filter
+    return self.stream_odata(endpoint, params=params, **kwargs)
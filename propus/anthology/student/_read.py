@@ -1,5 +1,7 @@
 import json
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+from urllib.parse import quote_plus
 
 from propus.anthology.student._exceptions import InvalidSearchParameters
 
@@ -84,3 +86,53 @@ async def student_search(self, **kwargs):
     """
     params = {"$filter": get_filters(kwargs)} if kwargs else None
     return self.make_request(url=self._get_endpoint("student_search"), params=params)
+
+
+def _chunk_student_numbers(student_numbers: List[str], max_filter_length: int) -> List[List[str]]:
+    # quote_plus encodes character by character, so the encoded length of the filter is the sum of its terms' lengths
+    chunks, chunk, length = [], [], len(quote_plus("$filter=()"))
+    for number in student_numbers:
+        term_length = len(quote_plus(f"StudentNumber eq '{number}' or "))
+        if chunk and length + term_length > max_filter_length:
+            chunks.append(chunk)
+            chunk, length = [], len(quote_plus("$filter=()"))
+        chunk.append(number)
+        length += term_length
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+async def student_search_many(
+    self, student_numbers: Iterable[str], max_url_length: int = 2000, max_concurrency: int = 4
+) -> Dict[str, Dict]:
+    """
+    Search students by many student numbers (ccc_id) at once. The numbers are split into chunks whose
+    student_number_or search URL stays under max_url_length, and the chunks are searched concurrently.
+
+    Args:
+        student_numbers (Iterable[str]): student numbers to search, duplicates are searched once
+        max_url_length (int, optional): maximum length of a search URL. Defaults to 2000.
+        max_concurrency (int, optional): maximum number of searches at once. Defaults to 4.
+
+    Returns:
+        Dict[str, Dict]: student number -> student record from Anthology, for the student numbers found. Example:
+        {
+            "STUDENT_123_ZXY": {"Id": 17557, "StudentNumber": "STUDENT_123_ZXY", ...}
+        }
+    """
+    student_numbers = list(dict.fromkeys(str(n) for n in student_numbers if n))
+    if not student_numbers:
+        return {}
+    url = self._get_endpoint("student_search")
+    chunks = _chunk_student_numbers(student_numbers, max_url_length - len(url) - 1)
+
+    def search(chunk):
+        return self.make_request(url=url, params={"$filter": get_filters({"student_number_or": chunk})})
+
+    students = {}
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        for response in pool.map(search, chunks):
+            for student in response.get("value", []):
+                students.setdefault(student.get("StudentNumber"), student)
+    return students
@@ -1,9 +1,9 @@
 import inspect
 
 import sqlalchemy
-from sqlalchemy import text, TIMESTAMP
+from sqlalchemy import select, text, tuple_, TIMESTAMP
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import DeclarativeBase, mapped_column
+from sqlalchemy.orm import DeclarativeBase, configure_mappers, mapped_column, object_session
 from sqlalchemy.exc import IntegrityError
 
 from propus import Logging
@@ -11,6 +11,19 @@ from propus import Logging
 logger = Logging.get_logger("propus/sql/calbright")
 
 
+def loader_profile(name):
+    """
+    Register a classmethod of a model as one of its named eager-loading profiles, see Base.loader_options.
+    The method takes the model class and returns a list of loader options (selectinload / joinedload bundles).
+    """
+
+    def decorator(method):
+        method.loader_profile = name
+        return classmethod(method)
+
+    return decorator
+
+
 class orm_mixin_class(object):
     """
     Additional functionality wanted in orm classes (that inherit from Base).
@@ -54,6 +67,70 @@ class Base(DeclarativeBase, orm_mixin_class):
     def to_dict(self):
         return {k: getattr(self, k) for k in self.col_names()}
 
+    @classmethod
+    def loader_options(cls, *profiles) -> list:
+        """
+        Loader options of named eager-loading profiles of the model (see loader_profile), to load a graph of
+        relationships in a constant number of queries instead of one lazy load per relationship and row.
+        E.g. session.scalars(select(User).options(*User.loader_options("user-with-enrollments")))
+
+        Args:
+            profiles (str): names of the profiles
+
+        Returns:
+            list: loader options
+        """
+        # Most relationships are backrefs, which only exist once the mappers are configured
+        configure_mappers()
+        builders = {}
+        for klass in reversed(cls.__mro__):
+            for attribute in vars(klass).values():
+                name = getattr(getattr(attribute, "__func__", None), "loader_profile", None)
+                if name:
+                    builders[name] = attribute.__func__
+        options = []
+        for profile in profiles:
+            if profile not in builders:
+                raise ValueError(f"{cls.__name__} has no loader profile {profile}, available: {sorted(builders)}")
+            options.extend(builders[profile](cls))
+        return options
+
+    @classmethod
+    def eager_load(cls, objects: list, *profiles) -> list:
+        """
+        Load the relationships of named profiles onto already loaded objects, with the profile's queries run once
+        for all of them. Objects which are not persistent, or which already loaded the profiles, are skipped.
+
+        Args:
+            objects (list): objects of the model
+            profiles (str): names of the profiles, see loader_options
+
+        Returns:
+            list: the objects
+        """
+        by_session = {}
+        for obj in objects:
+            state = sqlalchemy.inspect(obj, raiseerr=False)
+            if state is None or not state.persistent or set(profiles) <= state.info.get("loaded_profiles", set()):
+                continue
+            by_session.setdefault(object_session(obj), []).append(state)
+        mapper = sqlalchemy.inspect(cls)
+        for session, states in by_session.items():
+            identities = [state.identity for state in states]
+            if len(mapper.primary_key) == 1:
+                criteria = mapper.primary_key[0].in_([identity[0] for identity in identities])
+            else:
+                criteria = tuple_(*mapper.primary_key).in_(identities)
+            session.execute(select(cls).where(criteria).options(*cls.loader_options(*profiles))).all()
+            for state in states:
+                state.info.setdefault("loaded_profiles", set()).update(profiles)
+        return objects
+
+    def load_profile(self, *profiles):
+        """Load the relationships of named profiles onto this object, see eager_load"""
+        type(self).eager_load([self], *profiles)
+        return self
+
     @staticmethod
     def session_commit_with_rollback_on_unique(session) -> bool:
         """
@@ -76,6 +76,7 @@ from propus.calbright_sql.student_form import StudentForm
 from propus.calbright_sql.student_contact_method import StudentContactMethod
 from propus.calbright_sql.student_contact_time import StudentContactTime
 from propus.calbright_sql.suffix import Suffix
+from propus.calbright_sql.sync_watermark import SyncWatermark
 from propus.calbright_sql.term import Term
 from propus.calbright_sql.workflow_history import WorkflowHistory
 from propus.calbright_sql.user_lms import UserLms
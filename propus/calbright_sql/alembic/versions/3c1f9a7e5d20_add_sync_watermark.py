@@ -0,0 +1,38 @@
+"""add sync watermark
+
+Revision ID: 3c1f9a7e5d20
+Revises: ffda5c32701e
+Create Date: 2026-10-19 13:20:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3c1f9a7e5d20"
+down_revision = "ffda5c32701e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_watermark",
+        sa.Column("source", sa.VARCHAR(length=100), nullable=False),
+        sa.Column("key", sa.VARCHAR(length=255), nullable=False),
+        sa.Column("watermark", sa.TIMESTAMP(), nullable=False),
+        sa.Column("id", sa.UUID(), server_default=sa.text("uuid_generate_v4()"), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.text("NOW()"), nullable=True),
+        sa.Column("modified_at", sa.TIMESTAMP(), server_default=sa.text("NOW()"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("source", "key", name="uniq_sync_watermark_source_key"),
+    )
+    op.create_index(op.f("ix_sync_watermark_id"), "sync_watermark", ["id"], unique=False)
+    op.create_index(op.f("ix_sync_watermark_source"), "sync_watermark", ["source"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_sync_watermark_source"), table_name="sync_watermark")
+    op.drop_index(op.f("ix_sync_watermark_id"), table_name="sync_watermark")
+    op.drop_table("sync_watermark")
@@ -0,0 +1,125 @@
+from typing import AnyStr, Dict, List, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from propus.helpers.sql_alchemy import UPSERT_ROWS_PER_STATEMENT, async_bulk_upsert, async_get_or_create
+
+
+class AsyncCalbright:
+    """
+    asyncio version of Calbright, on SQLAlchemy's asyncio extension and asyncpg (sql_async extra), so the database
+    I/O of asyncio workers overlaps with their HTTP I/O in the same event loop instead of blocking it.
+    - session_factory() returns a new AsyncSession. AsyncSessions must not be shared by concurrent tasks, so each
+      task opens its own: async with calbright.session_factory() as session: ...
+    - get_or_create, upsert and execute each run in their own session / connection and commit.
+    Basic use:
+        calbright = AsyncCalbright.build(connection_configs)
+        user, created = await calbright.get_or_create(User, defaults={"first_name": "Ada"}, ccc_id="ABC1234")
+        await calbright.dispose()
+    """
+
+    _config_string = "postgresql+asyncpg://{user}:{pword}@{host}/{db}"
+
+    def __init__(self, eng):
+        self.engine = eng
+        # Objects stay readable after commit, since lazy loading is not available on async sessions
+        self.session_factory = async_sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+
+    @staticmethod
+    def build(connection_configs: Dict, verbose: bool = False, connection_args={}):
+        """
+        build will return a basic configuration with an SQLAlchemy async engine intialized
+
+        Args:
+            connection_configs (Dict): a dictionary with Database Connection Configs, see Calbright.build
+
+        Returns:
+            AsyncCalbright: Instance of AsyncCalbright Sql Class
+        """
+        engine = create_async_engine(
+            AsyncCalbright._config_string.format(
+                user=connection_configs.get("user"),
+                pword=connection_configs.get("password"),
+                host=connection_configs.get("host"),
+                db=connection_configs.get("db"),
+            ),
+            pool_size=connection_configs.get("poolSize", 50),
+            max_overflow=connection_configs.get("maxOverflow", 50),
+            echo=verbose,
+            connect_args=connection_args,
+        )
+        return AsyncCalbright(engine)
+
+    async def add_all(self, model_objects: list[object]):
+        """
+        Add new records, see Calbright.add_all.
+
+        Args:
+            model_objects (List[SQLalchemy.model]): list of table model being inserted
+        """
+        async with self.session_factory() as session:
+            try:
+                session.add_all(model_objects)
+                await session.commit()
+            except Exception as err:
+                await session.rollback()
+                raise err
+
+    async def get_or_create(self, model, defaults: Dict = None, **kwargs):
+        """
+        Get the record matching kwargs, or create it with defaults, and commit. See async_get_or_create.
+
+        Returns:
+            SQLAlchemy object of the record
+            Boolean: True if the record was created
+        """
+        async with self.session_factory() as session:
+            obj, created = await async_get_or_create(session, model, defaults, **kwargs)
+            await session.commit()
+            return obj, created
+
+    async def upsert(
+        self,
+        model,
+        rows: List[Dict],
+        conflict_target: Union[str, List[str]],
+        update_columns: List[str] = None,
+        skip_unchanged: bool = True,
+        chunk_size: int = UPSERT_ROWS_PER_STATEMENT,
+    ) -> Dict[str, int]:
+        """
+        Upsert rows with INSERT ... ON CONFLICT DO UPDATE and commit, see bulk_upsert.
+
+        Returns:
+            Dict: number of rows "inserted", "updated" and "unchanged"
+        """
+        async with self.session_factory() as session:
+            try:
+                counts = await async_bulk_upsert(
+                    session, model, rows, conflict_target, update_columns, skip_unchanged, chunk_size
+                )
+                await session.commit()
+            except Exception as err:
+                await session.rollback()
+                raise err
+        return counts
+
+    async def execute(self, sql_stmt: AnyStr):
+        """
+        Execute a SQL string on its own connection and commit it, see Calbright.execute.
+
+        Returns:
+            List: the rows, if the statement returns rows
+        """
+        sql_response = None
+        async with self.engine.connect() as con:
+            resp = await con.execute(text(sql_stmt))
+            if resp.returns_rows:
+                sql_response = resp.all()
+            await con.commit()
+        return sql_response
+
+    async def dispose(self):
+        """Close the connections of the engine's pool, e.g. before the event loop is closed"""
+        await self.engine.dispose()
@@ -1,9 +1,9 @@
 from sqlalchemy import FLOAT, ForeignKey, UniqueConstraint, Enum, VARCHAR
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import mapped_column, relationship
+from sqlalchemy.orm import mapped_column, relationship, selectinload
 from propus.helpers.sql_alchemy import update_or_create
 
-from propus.calbright_sql import Base
+from propus.calbright_sql import Base, loader_profile
 from propus.calbright_sql.course import Course
 from propus.calbright_sql.enrollment import LMS
 
@@ -20,6 +20,12 @@ class CourseVersion(Base):
 
     __table_args__ = (UniqueConstraint("course_id", "version_id", name="uniq_course_version"),)
 
+    @loader_profile("course-version-with-program-versions")
+    def _load_with_program_versions(cls):
+        from propus.calbright_sql.program_version_course import ProgramVersionCourse
+
+        return [selectinload(cls.course_program_version).joinedload(ProgramVersionCourse.program_version)]
+
     def seed_data(self, session, **kwargs):
         course_versions_by_name = {
             "MC500": 3,
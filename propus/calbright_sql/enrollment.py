@@ -1,9 +1,9 @@
 import enum
 from sqlalchemy import ForeignKey, VARCHAR, TIMESTAMP, FLOAT, INTEGER, Enum, BOOLEAN
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import mapped_column, relationship, backref
+from sqlalchemy.orm import mapped_column, relationship, backref, joinedload, selectinload
 
-from propus.calbright_sql import Base
+from propus.calbright_sql import Base, loader_profile
 from propus.calbright_sql.enrollment_status import EnrollmentStatus
 from propus.calbright_sql.program_version import ProgramVersion
 from propus.calbright_sql.student import Student
@@ -71,3 +71,18 @@ class Enrollment(Base):
     drop_date = mapped_column(TIMESTAMP)
     completion_date = mapped_column(TIMESTAMP)
     withdrawn_date = mapped_column(TIMESTAMP)
+
+    @loader_profile("enrollment-with-courses")
+    def _load_with_courses(cls):
+        from propus.calbright_sql.enrollment_course_term import EnrollmentCourseTerm
+
+        return [
+            joinedload(cls.enrollment_status),
+            joinedload(cls.program_version).selectinload(ProgramVersion.program_course_version),
+            selectinload(cls.enrollment_enrollment_course_term).options(
+                joinedload(EnrollmentCourseTerm.term),
+                joinedload(EnrollmentCourseTerm.grade),
+                joinedload(EnrollmentCourseTerm.course_version),
+                joinedload(EnrollmentCourseTerm.course_version_section),
+            ),
+        ]
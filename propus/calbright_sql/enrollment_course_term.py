@@ -1,13 +1,14 @@
 import enum
 from sqlalchemy import ForeignKey, TIMESTAMP, UniqueConstraint, Enum, VARCHAR, INTEGER, FLOAT
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import mapped_column, relationship
+from sqlalchemy.orm import mapped_column, relationship, joinedload
 
-from propus.calbright_sql import Base
+from propus.calbright_sql import Base, loader_profile
 from propus.calbright_sql.course_version import CourseVersion
 from propus.calbright_sql.course_version_section import CourseVersionSection
 from propus.calbright_sql.enrollment import Enrollment
 from propus.calbright_sql.grade import Grade
+from propus.calbright_sql.program_version import ProgramVersion
 from propus.calbright_sql.staff import Staff
 from propus.calbright_sql.term import Term
 
@@ -65,3 +66,12 @@ class EnrollmentCourseTerm(Base):
     )
 
     __table_args__ = (UniqueConstraint("enrollment_id", "course_version_id", "term_id", name="uniq_enrollment_course"),)
+
+    @loader_profile("enrollment-course-term-with-program")
+    def _load_with_program(cls):
+        return [
+            joinedload(cls.enrollment)
+            .joinedload(Enrollment.program_version)
+            .selectinload(ProgramVersion.program_course_version),
+            joinedload(cls.course_version_section),
+        ]
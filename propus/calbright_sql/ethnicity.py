@@ -43,7 +43,7 @@ class Ethnicity(Base):
             "White",
         ]
 
-        ethnicities = asyncio.run(anthology.fetch_configurations("ethnicity"))
+        ethnicities = asyncio.run(anthology.fetch_cached_configurations("ethnicity"))
         if not ethnicities.get("value"):
             raise Exception("No Ethnicities Returned from Anthology")
         anthology_ethnicities = {
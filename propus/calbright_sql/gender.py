@@ -24,7 +24,7 @@ class Gender(Base):
             "Non-binary",
             "Decline to state",
         ]
-        genders = asyncio.run(anthology.fetch_configurations("gender"))
+        genders = asyncio.run(anthology.fetch_cached_configurations("gender"))
         if not genders:
             raise Exception("No Genders Returned from Anthology")
         anthology_genders = {gender.get("Name").replace(":", ""): gender.get("Id") for gender in genders.get("value")}
@@ -37,10 +37,9 @@ class LearnerStatus(Base):
             "Withdrawn": "NDS-Withdrawn",
         }
 
-        anthology_resp = asyncio.run(anthology.fetch_configurations("school_status"))
-        if not anthology_resp.get("value"):
+        school_statuses = asyncio.run(anthology.fetch_configuration_indexes("school_status"))["name"]
+        if not school_statuses:
             raise Exception("No Statuses Returned from Anthology")
-        school_statuses = {status.get("Name"): status.get("Id") for status in anthology_resp.get("value")}
 
         for status, anthology_status in learner_status_to_anthology_status.items():
             row = {"status": status, "anthology_id": school_statuses.get(anthology_status)}
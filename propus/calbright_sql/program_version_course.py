@@ -1,8 +1,8 @@
 from sqlalchemy import ForeignKey, text, CheckConstraint, UniqueConstraint, BOOLEAN
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import mapped_column, relationship, backref
+from sqlalchemy.orm import mapped_column, relationship, backref, joinedload
 
-from propus.calbright_sql import Base
+from propus.calbright_sql import Base, loader_profile
 from propus.calbright_sql.course_version import CourseVersion
 from propus.calbright_sql.program_version import ProgramVersion
 from propus.helpers.sql_alchemy import update_or_create
@@ -47,6 +47,18 @@ class ProgramVersionCourse(Base):
         ),
     )
 
+    @loader_profile("program-version-course-with-instructors")
+    def _load_with_instructors(cls):
+        from propus.calbright_sql.course import Course
+        from propus.calbright_sql.instructor_course import InstructorCourse
+
+        return [
+            joinedload(cls.course_version)
+            .joinedload(CourseVersion.course)
+            .selectinload(Course.course_instructor)
+            .joinedload(InstructorCourse.instructor)
+        ]
+
     def __repr__(self) -> str:
         return f"<ProgramVersionCourse: {self.program_version_id} - {self.course_version_id}>"
 
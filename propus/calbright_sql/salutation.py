@@ -13,7 +13,7 @@ class Salutation(Base):
     anthology_id = mapped_column(INTEGER, unique=True)
 
     def seed_data(self, session, anthology, **kwargs):
-        titles = asyncio.run(anthology.fetch_configurations("title"))
+        titles = asyncio.run(anthology.fetch_cached_configurations("title"))
         if not titles.get("value"):
             raise Exception("No Salutations Returned from Anthology")
         for title in titles.get("value"):
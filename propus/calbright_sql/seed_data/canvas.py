@@ -3,10 +3,11 @@ This script is used to seed the database with assignment data from the Canvas AP
 - It will create assessments in the assessment table for each assignment in the course.
 - It pulls the competency information for each assignment based on the module that the assignment is found in.
 - If run multiple times, it will update the existing assessments in the database with the new data.
+- The course structure (modules, assignment groups) is cached in CANVAS_SNAPSHOT_DIR, so only the courses which changed
+    in Canvas since the last run are crawled again.
 
 """
 
-import asyncio
 import csv
 import os
 
@@ -23,7 +24,9 @@ from propus.calbright_sql.competency import Competency, CompetencyType
 from propus.calbright_sql.course_version import CourseVersion
 from propus.calbright_sql.enrollment import LMS
 
+from propus.helpers.canvas_course_snapshot import CanvasCourseSnapshotCache
 from propus.helpers.sql_alchemy import update_or_create
+from propus.helpers.storage import LocalStorage
 
 ssm = AWS_SSM.build("us-west-2")
 creds = ssm.get_param("canvas.dev.token", param_type="json")
@@ -39,6 +42,10 @@ calbright_postgres = Calbright.build(
     verbose=False,
 ).session
 
+course_snapshots = CanvasCourseSnapshotCache(
+    canvas, LocalStorage(os.environ.get("CANVAS_SNAPSHOT_DIR", ".canvas_snapshots"))
+)
+
 
 @dataclass
 class CourseData:
@@ -176,13 +183,8 @@ def get_course_module_data(course_id):
     # Get the course competencies from the database
     competencies = get_course_competencies_from_db(course_id)
 
-    # Get the course modules from the Canvas API - including the items in the modules (with their IDs / type)
-    course_modules = asyncio.run(
-        canvas.get_course_modules(
-            course_id=course_id,
-            include="items",
-        )
-    )
+    # Get the course modules from the course snapshot - including the items in the modules (with their IDs / type)
+    course_modules = course_snapshots.get(course_id)["modules"]
     course_module_data = []
 
     # Go through each module and its items, filtering to only include the items that are
@@ -248,11 +250,7 @@ def ingest_course_data(course_data: CourseData):
     assessments = []
 
     # Fetch the assignment groups for the course - including the assignments and discussion topics
-    assignment_groups = asyncio.run(
-        canvas.get_course_assignment_groups(
-            course_id=course_data.canvas_id, include=["assignments", "discussion_topic"]
-        )
-    )
+    assignment_groups = course_snapshots.get(course_data.canvas_id)["assignment_groups"]
     created_discussions = []
 
     # Go through all the assignment groups and prepares assessment objects for each assignment in them...
@@ -419,6 +417,8 @@ def ingest_all_course_data():
     :return: None
     """
     ingest_canvas_competencies()
+    # Refresh the snapshots of all courses at once, crawling the changed ones concurrently
+    course_snapshots.get_many([course["canvas_id"] for course in COURSES])
     for course in COURSES:
         ingest_course_data(CourseData(**course))
 
@@ -1,7 +1,7 @@
 from sqlalchemy import DATE, VARCHAR
-from sqlalchemy.orm import mapped_column, relationship
+from sqlalchemy.orm import mapped_column, relationship, selectinload
 
-from propus.calbright_sql import Base
+from propus.calbright_sql import Base, loader_profile
 from propus.calbright_sql.user import User  # noqa:F401
 
 
@@ -19,3 +19,9 @@ class Student(Base):
 
     def __repr__(self) -> str:
         return f"<Student: {self.ccc_id}>"
+
+    @loader_profile("student-with-enrollments")
+    def _load_with_enrollments(cls):
+        from propus.calbright_sql.enrollment import Enrollment
+
+        return [selectinload(cls.enrollment_student).options(*Enrollment.loader_options("enrollment-with-courses"))]
@@ -3,7 +3,7 @@ from sqlalchemy import String, INTEGER
 from sqlalchemy.orm import mapped_column
 
 from propus.calbright_sql import Base
-from propus.helpers.sql_alchemy import update_or_create
+from propus.helpers.sql_alchemy import bulk_upsert
 
 
 class Suffix(Base):
@@ -13,10 +13,9 @@ class Suffix(Base):
     anthology_id = mapped_column(INTEGER, unique=True)
 
     def seed_data(self, session, anthology, **kwargs):
-        suffixes = asyncio.run(anthology.fetch_configurations("suffix"))
+        suffixes = asyncio.run(anthology.fetch_cached_configurations("suffix"))
         if not suffixes.get("value"):
             raise Exception("No Suffixes Returned from Anthology")
-        for suffix in suffixes.get("value"):
-            row = {"suffix": suffix.get("Code"), "anthology_id": suffix.get("Id")}
-            update_or_create(session, Suffix, row, suffix=row.get("suffix"), anthology_id=row.get("anthology_id"))
+        rows = [{"suffix": suffix.get("Code"), "anthology_id": suffix.get("Id")} for suffix in suffixes.get("value")]
+        bulk_upsert(session, Suffix, rows, conflict_target=["anthology_id"])
         self.session_commit_with_rollback_on_unique(session)
@@ -0,0 +1,22 @@
+from sqlalchemy import TIMESTAMP, VARCHAR, UniqueConstraint
+from sqlalchemy.orm import mapped_column
+
+from propus.calbright_sql import Base
+
+
+class SyncWatermark(Base):
+    """
+    High-water mark of an incremental sync, e.g. the last time the Canvas submissions of a course were synced.
+    source names the sync (e.g. "canvas_submissions") and key the object it was synced for (e.g. the course lms_id).
+    """
+
+    __tablename__ = "sync_watermark"
+
+    source = mapped_column(VARCHAR(100), nullable=False, index=True)
+    key = mapped_column(VARCHAR(255), nullable=False)
+    watermark = mapped_column(TIMESTAMP, nullable=False)
+
+    __table_args__ = (UniqueConstraint("source", "key", name="uniq_sync_watermark_source_key"),)
+
+    def __repr__(self) -> str:
+        return f"<SyncWatermark: {self.source} - {self.key}>"
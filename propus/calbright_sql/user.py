@@ -1,7 +1,7 @@
 from sqlalchemy import ForeignKey, VARCHAR, UUID, INTEGER, CheckConstraint, BOOLEAN, text
-from sqlalchemy.orm import mapped_column, relationship, backref
+from sqlalchemy.orm import mapped_column, relationship, backref, selectinload
 
-from propus.calbright_sql import Base
+from propus.calbright_sql import Base, loader_profile
 from propus.calbright_sql.gender import Gender
 from propus.calbright_sql.pronoun import Pronoun
 from propus.calbright_sql.salutation import Salutation
@@ -86,6 +86,12 @@ class User(Base):
         ),
     )
 
+    @loader_profile("user-with-enrollments")
+    def _load_with_enrollments(cls):
+        from propus.calbright_sql.student import Student
+
+        return [selectinload(cls.student).options(*Student.loader_options("student-with-enrollments"))]
+
     @staticmethod
     def seed_data(self, session, **kwargs):
         from propus.calbright_sql.seed_data.staff_ingestion import ingest_staff_data
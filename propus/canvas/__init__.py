@@ -1,5 +1,6 @@
-from propus.api_client import RestAPIClient
+from propus.api_client import FailedRequest, RestAPIClient
 from propus.canvas.endpoints import all_endpoints
+from propus.canvas.throttle import CANVAS_RATE_LIMIT_MESSAGE, CanvasThrottle
 from propus.logging_utility import Logging
 
 
@@ -24,6 +25,8 @@ class Canvas(RestAPIClient):
 
         self.endpoints = all_endpoints
         self.auth_providers = auth_providers
+        # Shared with every other Canvas object using the same token, since Canvas rate limits per token
+        self.throttle = CanvasThrottle.shared(base_url, application_key)
 
     def make_request(self, **kwargs):
         req_type = kwargs.get("req_type", "get")
@@ -36,15 +39,23 @@ class Canvas(RestAPIClient):
         all_results = []
         next_url = url
         while next_url:
-            response = self._make_request(
-                next_url,
-                data=data,
-                headers=headers,
-                params=params,
-                req_type=req_type,
-                timeout=timeout,
-                include_full_response=True,
-            )
+            self.throttle.acquire()
+            try:
+                response = self._make_request(
+                    next_url,
+                    data=data,
+                    headers=headers,
+                    params=params,
+                    req_type=req_type,
+                    timeout=timeout,
+                    include_full_response=True,
+                )
+            except Exception as error:
+                self.throttle.release(
+                    rate_limited=isinstance(error, FailedRequest) and CANVAS_RATE_LIMIT_MESSAGE in str(error)
+                )
+                raise
+            self.throttle.release(getattr(response, "headers", None))
 
             json_response = response.json()
             if isinstance(json_response, list):
@@ -80,6 +91,13 @@ class Canvas(RestAPIClient):
     from .enrollment._update import reactivate_enrollment
     from .enrollment._delete import conclude_delete_deactivate_enrollment
 
+    from .graphql._query import graphql_query, graphql_paginate
+    from .graphql._read import (
+        get_course_enrollments_with_grades,
+        get_course_submissions_graphql,
+        get_user_enrollments_with_submissions,
+    )
+
     from .module._read import get_course_modules
 
     from .term._create import create_term
@@ -95,6 +113,9 @@ class Canvas(RestAPIClient):
         list_missing_submissions_for_user,
     )
 
+    from .sis_import._create import create_sis_import
+    from .sis_import._read import get_sis_import, get_sis_import_errors
+
     from .assignment._read import (
         get_course_assignments,
         get_assignment,
@@ -18,8 +18,12 @@ from propus.canvas.endpoints.enrollment import (
     enrollment_update_endpoints,
 )
 
+from propus.canvas.endpoints.graphql import graphql_endpoints
+
 from propus.canvas.endpoints.module import module_get_endpoints
 
+from propus.canvas.endpoints.sis_import import sis_import_create_endpoints, sis_import_get_endpoints
+
 from propus.canvas.endpoints.submission import submission_get_endpoints
 
 from propus.canvas.endpoints.term import (
@@ -35,7 +39,6 @@ from propus.canvas.endpoints.users import (
     user_update_endpoints,
 )
 
-
 endpoints = [
     # assignment
     assignment_get_endpoints,
@@ -54,8 +57,13 @@ endpoints = [
     enrollment_get_endpoints,
     enrollment_delete_endpoints,
     enrollment_update_endpoints,
+    # graphql
+    graphql_endpoints,
     # module
     module_get_endpoints,
+    # sis import
+    sis_import_create_endpoints,
+    sis_import_get_endpoints,
     # user
     user_create_endpoints,
     user_get_endpoints,
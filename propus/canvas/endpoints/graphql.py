@@ -0,0 +1,3 @@
+graphql_endpoints = {
+    "graphql": "/api/graphql",
+}
@@ -0,0 +1,14 @@
+sis_import_create_endpoints = {
+    "create_sis_import": ("/api/v1/accounts/<account_id>/sis_imports", ["<account_id>"]),
+}
+
+sis_import_get_endpoints = {
+    "get_sis_import": (
+        "/api/v1/accounts/<account_id>/sis_imports/<sis_import_id>",
+        ["<account_id>", "<sis_import_id>"],
+    ),
+    "get_sis_import_errors": (
+        "/api/v1/accounts/<account_id>/sis_imports/<sis_import_id>/errors",
+        ["<account_id>", "<sis_import_id>"],
+    ),
+}
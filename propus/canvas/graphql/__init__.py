@@ -0,0 +1,10 @@
+class CanvasGraphQLError(Exception):
+    """Exception raised when Canvas answers a GraphQL query with errors
+
+    Attributes:
+        errors: the errors returned by Canvas
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"Canvas GraphQL query failed: {'; '.join(e.get('message', str(e)) for e in errors)}")
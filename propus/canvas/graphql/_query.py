@@ -0,0 +1,55 @@
+import json
+from typing import Optional
+
+from propus.canvas.graphql import CanvasGraphQLError
+
+
+async def graphql_query(self, query: str, variables: Optional[dict] = None) -> dict:
+    """
+    Run a query against the Canvas GraphQL API.
+    Docs: https://canvas.instructure.com/doc/api/file.graphql.html
+    :param self:
+    :param query: The GraphQL query, e.g. one from propus.canvas.graphql.queries
+    :param variables: The variables of the query
+    :return: The "data" of the response
+    :raises CanvasGraphQLError: If Canvas returns errors for the query
+    """
+    response = self.make_request(
+        req_type="post",
+        url=self._get_endpoint("graphql"),
+        data=json.dumps({"query": query, "variables": variables or {}}),
+        headers=self.headers["post"],
+    )
+    if response.get("errors"):
+        raise CanvasGraphQLError(response["errors"])
+    return response.get("data") or {}
+
+
+async def graphql_paginate(
+    self, query: str, connection_path: list[str], variables: Optional[dict] = None, page_size: int = 100
+) -> list[dict]:
+    """
+    Run a query with a connection and follow its cursor until all the nodes are fetched.
+    The query must take $first and $after variables for the connection and select its pageInfo
+    { hasNextPage endCursor } and nodes.
+    :param self:
+    :param query: The GraphQL query
+    :param connection_path: The path from "data" to the connection, e.g. ["course", "submissionsConnection"]
+    :param variables: The variables of the query, other than $first and $after
+    :param page_size: Number of nodes requested per page
+    :return: The nodes of all pages
+    """
+    nodes = []
+    cursor = None
+    while True:
+        data = await self.graphql_query(query, (variables or {}) | {"first": page_size, "after": cursor})
+        connection = data
+        for key in connection_path:
+            connection = (connection or {}).get(key)
+        if not connection:
+            return nodes
+        nodes.extend(connection.get("nodes") or [])
+        page_info = connection.get("pageInfo") or {}
+        if not page_info.get("hasNextPage"):
+            return nodes
+        cursor = page_info.get("endCursor")
@@ -0,0 +1,86 @@
+import datetime
+from typing import Optional, Union
+
+from propus.canvas.graphql.queries import (
+    COURSE_ENROLLMENTS_WITH_GRADES,
+    COURSE_SUBMISSIONS,
+    USER_ENROLLMENTS_WITH_GRADES,
+)
+
+
+async def get_course_enrollments_with_grades(self, course_id: Union[str, int], page_size: int = 100) -> list[dict]:
+    """
+    Get all enrollments of a course with their user, section and grades, in as few requests as the page size allows.
+    :param self:
+    :param course_id: The Canvas ID of the course
+    :param page_size: Number of enrollments requested per page
+    :return: A list of enrollment nodes, e.g.
+        [{"_id": "1", "type": "StudentEnrollment", "state": "active", "user": {"_id": "9", "sisId": "ABC123"},
+          "section": {...}, "grades": {"currentScore": 92.5, ...}}]
+    """
+    return await self.graphql_paginate(
+        COURSE_ENROLLMENTS_WITH_GRADES,
+        ["course", "enrollmentsConnection"],
+        variables={"course_id": str(course_id)},
+        page_size=page_size,
+    )
+
+
+async def get_course_submissions_graphql(
+    self,
+    course_id: Union[str, int],
+    student_ids: Optional[list[Union[str, int]]] = None,
+    updated_since: Optional[datetime.datetime] = None,
+    states: Optional[list[str]] = None,
+    page_size: int = 100,
+) -> list[dict]:
+    """
+    Get the submissions of a course, for all assignments at once, with their assignment and user.
+    :param self:
+    :param course_id: The Canvas ID of the course
+    :param student_ids: Only return the submissions of these students (Canvas user IDs)
+    :param updated_since: Only return submissions updated after this date_time
+    :param states: Only return submissions in these states, e.g. ["submitted", "graded"]
+    :param page_size: Number of submissions requested per page
+    :return: A list of submission nodes
+    """
+    submission_filter = {}
+    if updated_since is not None:
+        submission_filter["updatedSince"] = updated_since.isoformat()
+    if states is not None:
+        submission_filter["states"] = states
+    variables = {"course_id": str(course_id), "filter": submission_filter or None}
+    if student_ids is not None:
+        variables["student_ids"] = [str(student_id) for student_id in student_ids]
+    return await self.graphql_paginate(
+        COURSE_SUBMISSIONS, ["course", "submissionsConnection"], variables=variables, page_size=page_size
+    )
+
+
+async def get_user_enrollments_with_submissions(
+    self, user_id: Union[str, int], include_submissions: bool = True, page_size: int = 100
+) -> list[dict]:
+    """
+    Get a user's enrollments with their course, section and grades and, per course, the user's submissions.
+    This takes one request for the enrollments plus one (paginated) request per course, instead of the course,
+    module, assignment and submission REST calls per course.
+    :param self:
+    :param user_id: The Canvas ID of the user
+    :param include_submissions: Whether to fetch the user's submissions of every course
+    :param page_size: Number of submissions requested per page
+    :return: A list of enrollments, each with a "submissions" list when include_submissions is set
+    """
+    data = await self.graphql_query(USER_ENROLLMENTS_WITH_GRADES, {"user_id": str(user_id)})
+    enrollments = (data.get("legacyNode") or {}).get("enrollments") or []
+    if not include_submissions:
+        return enrollments
+
+    submissions_by_course = {}
+    for enrollment in enrollments:
+        course_id = enrollment["course"]["_id"]
+        if course_id not in submissions_by_course:
+            submissions_by_course[course_id] = await self.get_course_submissions_graphql(
+                course_id, student_ids=[user_id], page_size=page_size
+            )
+        enrollment["submissions"] = submissions_by_course[course_id]
+    return enrollments
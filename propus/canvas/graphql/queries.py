@@ -0,0 +1,110 @@
+"""
+Library of Canvas GraphQL queries.
+
+Every paginated query takes $first and $after variables for its (single) top level connection, and selects its
+pageInfo, so it can be driven by Canvas.graphql_paginate.
+"""
+
+GRADES_FIELDS = """
+    currentScore
+    currentGrade
+    finalScore
+    finalGrade
+    unpostedCurrentScore
+"""
+
+SUBMISSION_FIELDS = """
+    _id
+    attempt
+    score
+    grade
+    state
+    submittedAt
+    gradedAt
+    updatedAt
+    late
+    missing
+    assignment {
+        _id
+        name
+        pointsPossible
+    }
+    user {
+        _id
+        sisId
+    }
+"""
+
+COURSE_ENROLLMENTS_WITH_GRADES = f"""
+query CourseEnrollmentsWithGrades($course_id: ID!, $first: Int, $after: String) {{
+    course(id: $course_id) {{
+        _id
+        name
+        enrollmentsConnection(first: $first, after: $after) {{
+            nodes {{
+                _id
+                type
+                state
+                user {{
+                    _id
+                    sisId
+                    name
+                }}
+                section {{
+                    _id
+                    sisId
+                    name
+                }}
+                grades {{{GRADES_FIELDS}}}
+            }}
+            pageInfo {{
+                hasNextPage
+                endCursor
+            }}
+        }}
+    }}
+}}
+"""
+
+COURSE_SUBMISSIONS = f"""
+query CourseSubmissions(
+    $course_id: ID!, $student_ids: [ID!], $filter: SubmissionSearchFilterInput, $first: Int, $after: String
+) {{
+    course(id: $course_id) {{
+        submissionsConnection(studentIds: $student_ids, filter: $filter, first: $first, after: $after) {{
+            nodes {{{SUBMISSION_FIELDS}}}
+            pageInfo {{
+                hasNextPage
+                endCursor
+            }}
+        }}
+    }}
+}}
+"""
+
+USER_ENROLLMENTS_WITH_GRADES = f"""
+query UserEnrollmentsWithGrades($user_id: ID!) {{
+    legacyNode(_id: $user_id, type: User) {{
+        ... on User {{
+            _id
+            sisId
+            name
+            enrollments {{
+                _id
+                type
+                state
+                course {{
+                    _id
+                    name
+                    sisId
+                }}
+                section {{
+                    _id
+                    sisId
+                }}
+                grades {{{GRADES_FIELDS}}}
+            }}
+        }}
+    }}
+}}
+"""
@@ -0,0 +1,74 @@
+import urllib.parse
+from typing import IO, Literal, Optional, Union
+
+
+async def create_sis_import(
+    self,
+    attachment: Union[bytes, IO[bytes]],
+    account_id: Optional[Union[str, int]] = None,
+    import_type: str = "instructure_csv",
+    extension: Literal["zip", "csv"] = "zip",
+    batch_mode: Optional[bool] = None,
+    batch_mode_term_id: Optional[Union[str, int]] = None,
+    override_sis_stickiness: Optional[bool] = None,
+    add_sis_stickiness: Optional[bool] = None,
+    clear_sis_stickiness: Optional[bool] = None,
+    diffing_data_set_identifier: Optional[str] = None,
+    change_threshold: Optional[int] = None,
+) -> dict:
+    """
+    Import SIS data into Canvas. The data is posted as the raw body of the request, so a single zip file can carry
+    users.csv, sections.csv and enrollments.csv at once. The import runs asynchronously on Canvas, use get_sis_import
+    to follow its progress.
+    Docs: https://canvas.instructure.com/doc/api/sis_imports.html#method.sis_imports_api.create
+    :param self:
+    :param attachment: The raw bytes (or a binary file object) of the zip or csv file to import
+    :param account_id: The account to import into. Defaults to the root account.
+    :param import_type: Choose the data format for reading SIS data. Defaults to "instructure_csv".
+    :param extension: The file extension of the attachment, either "zip" or "csv"
+    :param batch_mode: If set, this SIS import will be run in batch mode, deleting any data previously imported via
+        SIS that is not present in this latest import.
+    :param batch_mode_term_id: Limit deletions to only this term. Required if batch mode is enabled.
+    :param override_sis_stickiness: Many fields on records in Canvas can be marked “sticky,” which means that when
+        something changes in the UI apart from the SIS, that field gets “stuck.” If set, this import will override
+        UI changes.
+    :param add_sis_stickiness: This option, if present, will process all changes as if they were UI changes.
+        Only valid with override_sis_stickiness.
+    :param clear_sis_stickiness: This option, if present, will clear “stickiness” from all fields touched by this
+        import. Only valid with override_sis_stickiness.
+    :param diffing_data_set_identifier: If set on a CSV import, Canvas will attempt to optimize the SIS import by
+        comparing this set of CSVs to the previous set that has the same data set identifier, and only applying the
+        difference between the two.
+    :param change_threshold: If set with batch_mode, the batch cleanup process will not run if the number of items
+        deleted is higher than the percentage set.
+    :return: The created SIS import object
+    """
+    payload = {"import_type": import_type, "extension": extension}
+    if batch_mode is not None:
+        payload["batch_mode"] = batch_mode
+    if batch_mode_term_id is not None:
+        payload["batch_mode_term_id"] = batch_mode_term_id
+    if override_sis_stickiness is not None:
+        payload["override_sis_stickiness"] = override_sis_stickiness
+    if add_sis_stickiness is not None:
+        payload["add_sis_stickiness"] = add_sis_stickiness
+    if clear_sis_stickiness is not None:
+        payload["clear_sis_stickiness"] = clear_sis_stickiness
+    if diffing_data_set_identifier is not None:
+        payload["diffing_data_set_identifier"] = diffing_data_set_identifier
+    if change_threshold is not None:
+        payload["change_threshold"] = change_threshold
+
+    url = self._get_endpoint(
+        "create_sis_import", {"<account_id>": account_id if account_id is not None else self._account_id}
+    )
+    query_params = urllib.parse.urlencode(payload, doseq=True)
+    url = f"{url}?{query_params}"
+
+    content_type = "application/zip" if extension == "zip" else "text/csv"
+    return self.make_request(
+        req_type="post",
+        url=url,
+        data=attachment,
+        headers=self.headers["post"] | {"Content-Type": content_type},
+    )
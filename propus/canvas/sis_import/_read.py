@@ -0,0 +1,49 @@
+from typing import Optional, Union
+
+
+async def get_sis_import(self, sis_import_id: Union[str, int], account_id: Optional[Union[str, int]] = None) -> dict:
+    """
+    Get the status of an already created SIS import.
+    :param self:
+    :param sis_import_id: The ID of the SIS import
+    :param account_id: The account the import was created in. Defaults to the root account.
+    :return: The SIS import object, including its workflow_state and progress (0-100)
+    """
+    response = self.make_request(
+        req_type="get",
+        url=self._get_endpoint(
+            "get_sis_import",
+            {
+                "<account_id>": account_id if account_id is not None else self._account_id,
+                "<sis_import_id>": sis_import_id,
+            },
+        ),
+    )
+    # make_request collects single objects into a list of pages, the import itself is always a single object
+    return response[0] if isinstance(response, list) else response
+
+
+async def get_sis_import_errors(
+    self, sis_import_id: Union[str, int], account_id: Optional[Union[str, int]] = None
+) -> list[dict]:
+    """
+    Get the errors reported for a SIS import, across all pages.
+    :param self:
+    :param sis_import_id: The ID of the SIS import
+    :param account_id: The account the import was created in. Defaults to the root account.
+    :return: A list of SIS import error objects, e.g.
+        [{"sis_import_id": 1, "file": "users.csv", "message": "...", "row": 2, "row_info": "..."}]
+    """
+    pages = self.make_request(
+        req_type="get",
+        url=self._get_endpoint(
+            "get_sis_import_errors",
+            {
+                "<account_id>": account_id if account_id is not None else self._account_id,
+                "<sis_import_id>": sis_import_id,
+            },
+        ),
+    )
+    if isinstance(pages, dict):
+        pages = [pages]
+    return [error for page in pages for error in page.get("sis_import_errors", [])]
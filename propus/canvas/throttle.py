@@ -0,0 +1,120 @@
+import threading
+from time import monotonic
+from typing import Mapping, Optional
+
+# Canvas does not answer 429 when throttling, it answers 403 with this message in the body
+CANVAS_RATE_LIMIT_MESSAGE = "Rate Limit Exceeded"
+
+
+class CanvasThrottle:
+    """
+    Client side view of Canvas' leaky bucket rate limit, shared by every Canvas object using the same access token.
+
+    Canvas charges every request its cost (X-Request-Cost) against a bucket per access token, which drains over time,
+    and reports what is left of the bucket on every response (X-Rate-Limit-Remaining). Each request also holds a
+    pre-flight penalty for as long as it is in flight, so running too many at once empties the bucket even when they
+    are cheap. Rather than waiting for a 403 "Rate Limit Exceeded", the throttle uses these headers to decide how many
+    requests may be in flight and how far apart they start:
+    - with a full bucket, up to max_concurrency requests run at once, back to back
+    - as the bucket empties, fewer requests are allowed in flight, and below half of the bucket they are spaced by the
+      time Canvas needs to drain the cost of one request
+    - after a throttled request every caller pauses until the bucket had time to recover
+
+    Basic use (done by Canvas.make_request):
+        throttle = CanvasThrottle.shared(base_url, application_key)
+        throttle.acquire()
+        try:
+            response = ...
+        finally:
+            throttle.release(response.headers)
+
+    :param max_concurrency: Maximum number of requests in flight with a full bucket
+    :param reserve: Units of the bucket kept free, for other jobs using the same token
+    """
+
+    BUCKET_SIZE = 700
+    PREFLIGHT_PENALTY = 50
+    # Units per second the bucket drains by; an estimate, Canvas does not report it
+    LEAK_RATE = 10.0
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_concurrency: int = 16, reserve: float = 100):
+        self.max_concurrency = max_concurrency
+        self.reserve = reserve
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._remaining = None
+        self._updated = 0.0
+        self._cost = 1.0
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    @classmethod
+    def shared(cls, base_url: str, application_key: str) -> "CanvasThrottle":
+        """The throttle of an access token, shared by every Canvas object in the process using it"""
+        with cls._shared_lock:
+            return cls._shared.setdefault((base_url, application_key), cls())
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """Estimated remaining quota: the last reported one, refilled by the time elapsed since. None until known."""
+        if self._remaining is None:
+            return None
+        return min(self.BUCKET_SIZE, self._remaining + (monotonic() - self._updated) * self.LEAK_RATE)
+
+    @property
+    def concurrency(self) -> int:
+        """Number of requests allowed in flight with the remaining quota"""
+        remaining = self.remaining
+        if remaining is None:
+            return self.max_concurrency
+        allowed = (remaining - self.reserve) // (self._cost + self.PREFLIGHT_PENALTY)
+        return int(max(1, min(self.max_concurrency, allowed)))
+
+    @property
+    def interval(self) -> float:
+        """Seconds between the start of two requests with the remaining quota"""
+        remaining = self.remaining
+        if remaining is None or remaining >= self.BUCKET_SIZE / 2:
+            return 0.0
+        return self._cost / self.LEAK_RATE
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        with self._condition:
+            while True:
+                now = monotonic()
+                wait = max(self._next_slot, self._paused_until) - now
+                if wait <= 0 and self._in_flight < self.concurrency:
+                    break
+                self._condition.wait(timeout=wait if wait > 0 else None)
+            self._in_flight += 1
+            self._next_slot = now + self.interval
+
+    def release(self, headers: Optional[Mapping] = None, rate_limited: bool = False):
+        """
+        Record the end of a request.
+        :param headers: Headers of the response, if any
+        :param rate_limited: Whether Canvas refused the request with "Rate Limit Exceeded"
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if rate_limited:
+                self._remaining = 0.0
+                self._updated = monotonic()
+                self._paused_until = max(self._paused_until, self._updated + self.PREFLIGHT_PENALTY / self.LEAK_RATE)
+            elif headers is not None:
+                try:
+                    remaining = float(headers.get("X-Rate-Limit-Remaining"))
+                    cost = float(headers.get("X-Request-Cost"))
+                except (TypeError, ValueError):
+                    pass
+                else:
+                    self._remaining = remaining
+                    self._updated = monotonic()
+                    # Moving average, so a single expensive request does not collapse the concurrency
+                    self._cost = 0.8 * self._cost + 0.2 * cost
+            self._condition.notify_all()
@@ -43,7 +43,11 @@ async def list_users_in_account(self, account_id: Union[str, int]) -> list[dict]
 
 
 async def get_user_page_views(
-    self, user_id: Union[str, int], start_time: datetime.datetime, end_time: datetime.datetime
+    self,
+    user_id: Union[str, int],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    per_page: Union[int, None] = None,
 ) -> list[dict]:
     """
     Get the page views for a user.
@@ -51,6 +55,7 @@ async def get_user_page_views(
     :param user_id: Canvas ID for the user
     :param start_time: Start of the date range
     :param end_time: End of the date range
+    :param per_page: Optional - number of page views per response page (Canvas allows up to 100, default 10)
     :return: A list of page view objects
     """
     payload = {}
@@ -58,6 +63,8 @@ async def get_user_page_views(
         payload["start_time"] = start_time.isoformat()
     if end_time is not None:
         payload["end_time"] = end_time.isoformat()
+    if per_page is not None:
+        payload["per_page"] = per_page
 
     url = self._get_endpoint("get_user_page_views", {"<user_id>": user_id})
     query_params = urllib.parse.urlencode(payload, doseq=True)
@@ -415,7 +415,7 @@ def update_learner_status_history(payload={}):
     pass
 
 
-def update_student(session, salesforce, data: Dict = {}):
+def update_student(session, salesforce, data: Dict = {}, user=None, field_maps: Dict = None, flush: bool = True):
     """update_student is triggered by Wasat when a Student entity is saved in Anthology.
     This then updates the databaes and Salesforce record as appropriate.
 
@@ -423,11 +423,16 @@ def update_student(session, salesforce, data: Dict = {}):
         session (SQLAlchemy.session): session of the SQLAlchemy session connection
         salesforce (propus.RestAPIClient): Salesforce REST API Client
         data (dict): request's decoded JSON data
+        user (propus.sql.calbright.user.User, optional): the User the data belongs to, when the caller already loaded
+            it (e.g. for a batch of changes). Looked up from the data otherwise.
+        field_maps (dict, optional): {"suffix": {anthology_id: id}, "salutation": {anthology_id: id}}, when the caller
+            already built them. Built when needed otherwise.
+        flush (bool, optional): False to leave the database writes to the caller's next commit, see upsert_changes
     """
     from propus.helpers.salesforce import SF_CURRENT_ADDRESS_FIELD_MAP, SF_STUDENT_MAP, SF_USER_MAP
 
     try:
-        user = get_anthology_user(session, data)
+        user = user or get_anthology_user(session, data)
         student = user.student
     except EntryNotFoundError as e:
         logger.error(e)
@@ -450,11 +455,15 @@ def update_student(session, salesforce, data: Dict = {}):
     address_updates = {}
     if student_address:
         address = student_address.address
-        address_updates, address_updated = _update_address(session, address, data_mappings.get("address", {}))
+        address_updates, address_updated = _update_address(
+            session, address, data_mappings.get("address", {}), flush=flush
+        )
         logger.info(f"Student address updated {address_updated}: {address_updates}")
-    student_updates, student_updated = _update_student(session, student, data_mappings.get("student", {}))
+    student_updates, student_updated = _update_student(session, student, data_mappings.get("student", {}), flush=flush)
     logger.info(f"Student updated {student_updated}: {student_updates}")
-    user_updates, user_updated = _update_user(session, user, data_mappings.get("user", {}))
+    user_updates, user_updated = _update_user(
+        session, user, data_mappings.get("user", {}), field_maps=field_maps, flush=flush
+    )
     logger.info(f"User updated {user_updated}: {user_updates}")
 
     updated_data = address_updates | student_updates | user_updates
@@ -465,7 +474,7 @@ def update_student(session, salesforce, data: Dict = {}):
         logger.info(f"Update sent to Salesforce: {sf_response}")
 
 
-def update_student_course(session, salesforce, data: Dict = {}):
+def update_student_course(session, salesforce, data: Dict = {}, user=None, learner_status_map: Dict = None):
     """update_student_course is triggered by Wasat when a StudentCourse entity is saved in Anthology.
     This then updates the databaes and Salesforce record as appropriate.
 
@@ -473,25 +482,40 @@ def update_student_course(session, salesforce, data: Dict = {}):
         session (SQLAlchemy.session): session of the SQLAlchemy session connection
         salesforce (propus.RestAPIClient): Salesforce REST API Client
         data (dict): request's decoded JSON data
+        user (propus.sql.calbright.user.User, optional): the User the data belongs to, when the caller already loaded
+            it (e.g. for a batch of changes). Looked up from the data otherwise.
+        learner_status_map (dict, optional): result of create_learner_status_map, when the caller already built it.
+            Built on every call otherwise.
     """
     learner_status_number = data.get("status")
     previous_learner_status_number = data.get("previousStatus")
 
-    if learner_status_number == previous_learner_status_number:
+    # Webhooks carry the previous status; entities read from Anthology (see anthology_delta_sync) do not, and are
+    # compared with the user's stored status below
+    if "previousStatus" in data and learner_status_number == previous_learner_status_number:
         return
 
     try:
-        user = get_anthology_user(session, data)
+        user = user or get_anthology_user(session, data)
 
     except Exception as e:
         logger.error(f"Error getting user / student from Anthology data {data}: {e}")
         return
 
+    learner_status = ANTHOLOGY_LEARNER_STATUS_MAP.get(learner_status_number)
     try:
-        learner_status_map = create_learner_status_map(session)
-        learner_status = ANTHOLOGY_LEARNER_STATUS_MAP.get(learner_status_number)
-        user.learner_status_id = learner_status_map.get(learner_status, "<learner_status_id not found>")
-        user.save()
+        learner_status_map = (
+            learner_status_map if learner_status_map is not None else create_learner_status_map(session)
+        )
+        learner_status_id = learner_status_map.get(learner_status)
+        if learner_status_id is None:
+            logger.error(f"No learner status found for Anthology status {learner_status_number} of {user}, skipping")
+            return
+        if str(user.learner_status_id) == str(learner_status_id):
+            logger.info(f"Learner status of {user} is already {learner_status}")
+            return
+        user.learner_status_id = learner_status_id
+        session.add(user)
         logger.info(f"Learner status updated for {user} to {learner_status}")
 
     except Exception as e:
@@ -509,13 +533,14 @@ def update_student_course(session, salesforce, data: Dict = {}):
     return
 
 
-def _update_address(session, address, data):
+def _update_address(session, address, data, flush=True):
     """Helper method to upsert changes to an Address object.
 
     Args:
         session (SQLAlchemy.session): session of the SQLAlchemy session connection
         address (propus.sql.calbright.address.Address): SQLAlchemy Address object
         data (dict): data to be checked / upserted
+        flush (bool): see upsert_changes
 
     Returns:
         upserts (dict): Dictionary of upserted values
@@ -526,16 +551,17 @@ def _update_address(session, address, data):
     filters = dict(id=address.id)
     address_data = {v: data.get(k) for k, v in ANTHOLOGY_ADDRESS_FIELD_MAP.items() if data.get(k)}
 
-    return upsert_changes(session, Address, address, address_data, **filters)
+    return upsert_changes(session, Address, address, address_data, flush=flush, **filters)
 
 
-def _update_student(session, student, data):
+def _update_student(session, student, data, flush=True):
     """Helper method to upsert changes to an Student object.
 
     Args:
         session (SQLAlchemy.session): session of the SQLAlchemy session connection
         address (propus.sql.calbright.student.Student): SQLAlchemy Student object
         data (dict): data to be checked / upserted
+        flush (bool): see upsert_changes
 
     Returns:
         upserts (dict): Dictionary of upserted values
@@ -545,16 +571,18 @@ def _update_student(session, student, data):
 
     filters = dict(ccc_id=student.ccc_id)
     student_data = {k: v(data.get(k)) for k, v in ANTHOLOGY_CLEAN_FIELD_FUNCTIONS.items() if data.get(k)}
-    return upsert_changes(session, Student, student, student_data, **filters)
+    return upsert_changes(session, Student, student, student_data, flush=flush, **filters)
 
 
-def _update_user(session, user, data):
+def _update_user(session, user, data, field_maps=None, flush=True):
     """Helper method to upsert changes to an User object.
 
     Args:
         session (SQLAlchemy.session): session of the SQLAlchemy session connection
         address (propus.sql.calbright.user.User): SQLAlchemy User object
         data (dict): data to be checked / upserted
+        field_maps (dict): see update_student
+        flush (bool): see upsert_changes
 
     Returns:
         upserts (dict): Dictionary of upserted values
@@ -568,7 +596,9 @@ def _update_user(session, user, data):
     if data.get("suffixId"):
         from propus.calbright_sql.suffix import Suffix
 
-        suffix_map = create_field_map(session, Suffix, map_from="anthology_id", map_to="id")
+        suffix_map = (field_maps or {}).get("suffix") or create_field_map(
+            session, Suffix, map_from="anthology_id", map_to="id"
+        )
         suffix_id = suffix_map.get(data.get("suffixId"))
         if suffix_id:
             user_data["suffix_id"] = suffix_id
@@ -578,14 +608,16 @@ def _update_user(session, user, data):
     if data.get("titleId"):
         from propus.calbright_sql.salutation import Salutation
 
-        salutation_map = create_field_map(session, Salutation, map_from="anthology_id", map_to="id")
+        salutation_map = (field_maps or {}).get("salutation") or create_field_map(
+            session, Salutation, map_from="anthology_id", map_to="id"
+        )
         salutation_id = salutation_map.get(data.get("titleId"))
         if salutation_id:
             user_data["salutation_id"] = salutation_id
         else:
             logger.error(f"Salutation not found for Anthology title {data.get('titleId')}")
 
-    return upsert_changes(session, User, user, user_data, **filters)
+    return upsert_changes(session, User, user, user_data, flush=flush, **filters)
 
 
 def create_term(anthology, start_date: datetime, term_name: str):
@@ -611,4 +643,7 @@ def create_term(anthology, start_date: datetime, term_name: str):
 
     # Copy the class schedule from the most recent term to this new term
     asyncio.run(anthology.copy_class_schedule(most_recent_term.get("Id"), term_creation_response.get("id")))
+
+    # The cached term list no longer holds every term
+    anthology.invalidate_configurations("term")
     return term_creation_response.get("id")
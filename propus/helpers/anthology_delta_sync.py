@@ -0,0 +1,220 @@
+"""
+This module syncs Anthology changes into Postgres (and Salesforce) incrementally, instead of re-pulling every student
+and student course on each run.
+
+A high-water mark is kept per Anthology entity in the sync_watermark table. Each run only streams the entities whose
+LastModifiedDateTime moved past it (an OData delta query, see Anthology.stream_odata_changes), converts them into the
+shape of the Wasat webhook payloads and hands them to the existing update_student / update_student_course handlers.
+The users of a batch of changes are loaded with a single query, the lookup maps are built once per run and the session
+is committed once per batch, so a run costs in proportion to the number of changes rather than the size of Anthology.
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import or_, select
+
+from .anthology import (
+    ANTHOLOGY_ADDRESS_FIELD_MAP,
+    ANTHOLOGY_STUDENT_FIELD_MAP,
+    ANTHOLOGY_USER_FIELD_MAP,
+    update_student,
+    update_student_course,
+)
+from .field_maps import create_learner_status_map
+from .sql_calbright.sync_watermark import get_watermarks, set_watermarks
+
+from propus.anthology import Anthology
+from propus.calbright_sql.user import User
+
+from propus.logging_utility import Logging
+
+logger = Logging.get_logger("propus/helpers/anthology_delta_sync")
+
+ANTHOLOGY_DELTA_SOURCE = "anthology_delta"
+# Changes are re-read from slightly before the watermark, so that entities saved in the same instant as the last one
+# seen are not missed. The handlers only write what differs, so seeing a change twice is harmless.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def _camel_case(key: str) -> str:
+    return key[:1].lower() + key[1:]
+
+
+def _pascal_case(key: str) -> str:
+    return key[:1].upper() + key[1:]
+
+
+# Every field update_student reads, so that a change to any of them is synced
+ANTHOLOGY_DELTA_STUDENT_FIELDS = list(
+    dict.fromkeys(
+        ["Id", "StudentNumber", "SchoolStatusId", "LastModifiedDateTime"]
+        + [
+            _pascal_case(key)
+            for field_map in (ANTHOLOGY_ADDRESS_FIELD_MAP, ANTHOLOGY_STUDENT_FIELD_MAP, ANTHOLOGY_USER_FIELD_MAP)
+            for key in field_map
+        ]
+    )
+)
+# Anthology entity -> OData endpoint and $select/$expand profile or query options it is read with
+ANTHOLOGY_DELTA_ENTITIES = {
+    "student": {"endpoint": "student_search", "params": {"$select": ",".join(ANTHOLOGY_DELTA_STUDENT_FIELDS)}},
+    "student_course": {"endpoint": "course_search", "profile": "enrolled_courses"},
+}
+
+
+def to_webhook_payload(entity_type: str, entity: Dict) -> Dict:
+    """
+    Convert an OData entity into the payload Wasat posts for it, which the handlers expect: the same fields with a
+    lower camel case name (e.g. "StudentNumber" -> "studentNumber").
+    :param entity_type: A key of ANTHOLOGY_DELTA_ENTITIES
+    :param entity: The OData entity
+    :return: dict: the webhook payload
+    """
+    payload = {_camel_case(key): value for key, value in entity.items() if not isinstance(value, dict)}
+    if entity_type == "student_course":
+        # The student course payload identifies its student by studentId; the number comes from the expanded Student
+        payload["studentNumber"] = (entity.get("Student") or {}).get("StudentNumber")
+    return payload
+
+
+def _parse_modified(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    # Anthology returns up to 7 fractional digits, more than datetime parses
+    return datetime.fromisoformat(re.sub(r"(\.\d{6})\d+", r"\1", value).replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+def _batches(entities: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for entity in entities:
+        batch.append(entity)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_users(session, payloads: List[Dict], options: Iterable = ()) -> Dict:
+    """
+    Load the users of a batch of webhook payloads with a single query.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param payloads: Webhook payloads, identifying their user by studentNumber (ccc_id) and/or studentId / id
+    :param options: Loader options of the query, e.g. to eager load the users' students
+    :return: dict: ("ccc_id", value) and ("anthology_id", value) -> User
+    """
+    ccc_ids = {p.get("studentNumber") for p in payloads if p.get("studentNumber")}
+    anthology_ids = {p.get("studentId", p.get("id")) for p in payloads if p.get("studentId", p.get("id"))}
+    if not (ccc_ids or anthology_ids):
+        return {}
+    users = (
+        session.execute(
+            select(User).filter(or_(User.ccc_id.in_(ccc_ids), User.anthology_id.in_(anthology_ids))).options(*options)
+        )
+        .scalars()
+        .all()
+    )
+    users_by_key = {}
+    for user in users:
+        users_by_key[("ccc_id", user.ccc_id)] = user
+        users_by_key[("anthology_id", user.anthology_id)] = user
+    return users_by_key
+
+
+def sync_anthology_changes(
+    session,
+    anthology: Anthology,
+    salesforce,
+    entity_types: Optional[List[str]] = None,
+    initial_since: Optional[datetime] = None,
+    batch_size: int = 200,
+    page_size: int = 500,
+) -> Dict[str, int]:
+    """
+    Sync the Anthology entities modified since the last run through the update_student / update_student_course
+    handlers.
+    - An entity type without a watermark is synced from initial_since, or in full when it is not given.
+    - The watermark of an entity type only moves (to the latest LastModifiedDateTime seen) once all of its changes were
+      streamed and committed, so a failed run is retried from the same point. A batch failing to commit is rolled back
+      and logged, the other batches still run, and the watermark stays where it was.
+    - The Salesforce updates of a batch are buffered (see SalesforceWriteBuffer) and sent after its commit, so a batch
+      which is rolled back sends none.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param anthology: A Propus Anthology object.
+    :param salesforce: A Propus Salesforce object.
+    :param entity_types: Keys of ANTHOLOGY_DELTA_ENTITIES to sync. Defaults to all.
+    :param initial_since: Where to start an entity type which was never synced.
+    :param batch_size: Number of changes handled per database commit
+    :param page_size: Number of entities per Anthology request
+    :return: dict: entity type -> number of changes handled
+    """
+    from .anthology_webhook_batch import SalesforceWriteBuffer, resolve_salesforce_ids
+
+    handlers = {"student": update_student, "student_course": update_student_course}
+    entity_types = entity_types or list(ANTHOLOGY_DELTA_ENTITIES)
+    watermarks = get_watermarks(session, ANTHOLOGY_DELTA_SOURCE, entity_types)
+    learner_status_map = None
+    handled = {}
+
+    for entity_type in entity_types:
+        config = ANTHOLOGY_DELTA_ENTITIES[entity_type]
+        watermark = watermarks.get(entity_type)
+        since = watermark - WATERMARK_OVERLAP if watermark else initial_since
+        query = {"params": config.get("params"), "profile": config.get("profile"), "page_size": page_size}
+        if since:
+            entities = anthology.stream_odata_changes(config["endpoint"], since, **query)
+        else:
+            entities = anthology.stream_odata(config["endpoint"], **query)
+        logger.info(f"Syncing Anthology {entity_type} changes since {since or 'the beginning'}")
+
+        if entity_type == "student_course" and learner_status_map is None:
+            learner_status_map = create_learner_status_map(session)
+        extra = {"learner_status_map": learner_status_map} if entity_type == "student_course" else {}
+
+        handled[entity_type] = 0
+        latest = watermark
+        failed_batches = 0
+        for batch in _batches(entities, batch_size):
+            payloads = [to_webhook_payload(entity_type, entity) for entity in batch]
+            users = load_users(session, payloads)
+            changes = []
+            for payload in payloads:
+                user = users.get(("ccc_id", payload.get("studentNumber"))) or users.get(
+                    ("anthology_id", payload.get("studentId", payload.get("id")))
+                )
+                if user is None:
+                    logger.info(f"No user found for Anthology {entity_type} {payload.get('id')}, skipping")
+                    continue
+                changes.append((payload, user))
+            if entity_type == "student_course":
+                # update_student_course reads the Salesforce ID of the user, which the buffer expects to be set
+                resolve_salesforce_ids(salesforce, list({user: None for _, user in changes}))
+            # The Salesforce updates of the batch are only sent once its database changes are committed
+            buffer = SalesforceWriteBuffer(salesforce)
+            for payload, user in changes:
+                handlers[entity_type](session, buffer, payload, user=user, **extra)
+            try:
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                failed_batches += 1
+                logger.error(f"Failed to commit a batch of {len(payloads)} Anthology {entity_type} changes: {e}")
+                continue
+            if buffer.contacts:
+                buffer.flush()
+            handled[entity_type] += len(changes)
+            for payload in payloads:
+                modified = _parse_modified(payload.get("lastModifiedDateTime"))
+                if modified and (latest is None or modified > latest):
+                    latest = modified
+
+        if failed_batches:
+            # The changes of the failed batches are read again on the next run
+            logger.error(f"{failed_batches} batches of Anthology {entity_type} changes failed, watermark not moved")
+        elif latest and latest != watermark:
+            set_watermarks(session, ANTHOLOGY_DELTA_SOURCE, {entity_type: latest})
+            session.commit()
+        logger.info(f"Handled {handled[entity_type]} Anthology {entity_type} changes")
+    return handled
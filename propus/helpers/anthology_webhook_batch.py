@@ -0,0 +1,182 @@
+"""
+This module handles a burst of Anthology webhooks (Student and StudentCourse saves posted by Wasat) as one batch,
+instead of running update_student / update_student_course once per webhook.
+
+- Webhooks are coalesced per student: the Student saves of a student are merged in order (the latest value of a field
+  wins) and only the latest status of their StudentCourse saves is applied, so a student saved ten times in a burst is
+  written once.
+- The users of the batch are loaded with a single query, together with their students and addresses, and the lookup
+  maps (learner status, suffix, salutation) are built once per batch.
+- The database changes are applied to the loaded objects on the calling thread, in the order each student's webhooks
+  arrived, and written with a single commit. A SQLAlchemy session is not thread safe, so this part is not parallel.
+- The Salesforce work runs in parallel across students: the missing Salesforce IDs are fetched concurrently and
+  the contact updates are merged per contact and sent 200 at a time (update_contact_records), concurrently.
+
+Basic use:
+    handled = handle_anthology_webhooks(session, salesforce, [("student", payload_1), ("student_course", payload_2)])
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import configure_mappers, selectinload
+
+from .anthology import update_student, update_student_course
+from .anthology_delta_sync import load_users
+from .field_maps import create_field_map, create_learner_status_map
+
+from propus.logging_utility import Logging
+
+logger = Logging.get_logger("propus/helpers/anthology_webhook_batch")
+
+WEBHOOK_HANDLERS = {"student": update_student, "student_course": update_student_course}
+
+
+class SalesforceWriteBuffer:
+    """
+    Stands in for the Salesforce client in the webhook handlers: contact updates are merged per contact instead of
+    being sent, and are sent in bulk by flush().
+
+    :param salesforce: A Propus Salesforce object.
+    """
+
+    def __init__(self, salesforce):
+        self.salesforce = salesforce
+        self.contacts = {}
+
+    def get_sf_id_by_user(self, user):
+        # The Salesforce IDs of the batch are fetched beforehand, see resolve_salesforce_ids
+        return user.salesforce_id
+
+    def update_contact_record(self, salesforce_id, **kwargs):
+        if not salesforce_id:
+            logger.error(f"No Salesforce ID to update with {kwargs}, skipping")
+            return
+        self.contacts.setdefault(salesforce_id, {}).update(kwargs)
+
+    def flush(self, max_concurrency: int = 4, chunk_size: int = 200) -> List[Dict]:
+        """
+        Send the buffered contact updates, chunk_size contacts per request and max_concurrency requests at once.
+        :return: list: the result of each contact update, see Salesforce.update_contact_records
+        """
+        contacts = list(self.contacts.items())
+        self.contacts = {}
+        chunks = [dict(contacts[i:][:chunk_size]) for i in range(0, len(contacts), chunk_size)]
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            results = [
+                r for chunk_results in pool.map(self.salesforce.update_contact_records, chunks) for r in chunk_results
+            ]
+        for result in results:
+            if not result.get("success", True):
+                logger.error(f"Salesforce contact update failed for {result.get('id')}: {result.get('errors')}")
+        return results
+
+
+def coalesce_webhooks(events: List[Tuple[str, Dict]], users: Dict) -> Dict:
+    """
+    Group webhooks by user and coalesce them, keeping the order in which each user's webhooks arrived.
+    :param events: (entity type, payload) pairs, entity type being "student" or "student_course"
+    :param users: Result of load_users for the payloads
+    :return: dict: User -> list of (entity type, coalesced payload), ordered by the last webhook of each type
+    """
+    coalesced = {}
+    for entity_type, payload in events:
+        user = users.get(("ccc_id", payload.get("studentNumber"))) or users.get(
+            ("anthology_id", payload.get("studentId", payload.get("id")))
+        )
+        if user is None:
+            logger.info(f"No user found for Anthology {entity_type} webhook {payload.get('id')}, skipping")
+            continue
+        user_events = coalesced.setdefault(user, {})
+        previous = user_events.pop(entity_type, None)
+        if previous is None:
+            user_events[entity_type] = dict(payload)
+        elif entity_type == "student_course":
+            # The latest status wins, compared with the status before the burst
+            user_events[entity_type] = dict(payload, previousStatus=previous.get("previousStatus"))
+        else:
+            user_events[entity_type] = previous | payload
+    return {user: list(user_events.items()) for user, user_events in coalesced.items()}
+
+
+def resolve_salesforce_ids(salesforce, users: List, max_concurrency: int = 8):
+    """
+    Fetch the Salesforce IDs of the users which do not have one yet, concurrently, and set them on the users.
+    :param salesforce: A Propus Salesforce object.
+    :param users: User objects
+    :param max_concurrency: Maximum number of Salesforce requests at once
+    """
+    missing = [user for user in users if not user.salesforce_id]
+    if not missing:
+        return
+
+    def fetch(user):
+        try:
+            return salesforce.fetch_salesforce_id_by_ccc_id(user.ccc_id)
+        except Exception as e:
+            logger.error(f"Unable to find or fetch Salesforce ID for {user}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        for user, sf_id in zip(missing, pool.map(fetch, missing)):
+            if sf_id:
+                user.salesforce_id = sf_id
+
+
+def handle_anthology_webhooks(
+    session, salesforce, events: List[Tuple[str, Dict]], max_concurrency: int = 8
+) -> Dict[str, int]:
+    """
+    Handle a burst of Anthology webhooks as one batch, see the module docstring.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param salesforce: A Propus Salesforce object.
+    :param events: (entity type, payload) pairs in the order they were received, entity type being "student" or
+        "student_course"
+    :param max_concurrency: Maximum number of Salesforce requests at once
+    :return: dict: entity type -> number of coalesced webhooks handled
+    """
+    from propus.calbright_sql.salutation import Salutation
+    from propus.calbright_sql.student import Student
+    from propus.calbright_sql.student_address import StudentAddress
+    from propus.calbright_sql.suffix import Suffix
+    from propus.calbright_sql.user import User
+
+    configure_mappers()
+    # update_student reads the student and their addresses, loaded here for the whole batch rather than per student
+    student_addresses = selectinload(User.student).selectinload(Student.student_address)
+    users = load_users(
+        session,
+        [payload for _, payload in events],
+        options=[student_addresses.selectinload(StudentAddress.address)],
+    )
+    coalesced = coalesce_webhooks(events, users)
+    handled = {entity_type: 0 for entity_type in WEBHOOK_HANDLERS}
+    if not coalesced:
+        return handled
+
+    types = {entity_type for user_events in coalesced.values() for entity_type, _ in user_events}
+    extra = {}
+    if "student" in types:
+        extra["student"] = {
+            "field_maps": {
+                "suffix": create_field_map(session, Suffix, map_from="anthology_id", map_to="id"),
+                "salutation": create_field_map(session, Salutation, map_from="anthology_id", map_to="id"),
+            },
+            "flush": False,
+        }
+    if "student_course" in types:
+        extra["student_course"] = {"learner_status_map": create_learner_status_map(session)}
+        resolve_salesforce_ids(
+            salesforce,
+            [user for user, user_events in coalesced.items() if any(t == "student_course" for t, _ in user_events)],
+            max_concurrency=max_concurrency,
+        )
+
+    buffer = SalesforceWriteBuffer(salesforce)
+    for user, user_events in coalesced.items():
+        for entity_type, payload in user_events:
+            WEBHOOK_HANDLERS[entity_type](session, buffer, payload, user=user, **extra[entity_type])
+            handled[entity_type] += 1
+    session.commit()
+    buffer.flush(max_concurrency=max_concurrency)
+    logger.info(f"Handled Anthology webhooks of {len(coalesced)} students: {handled}")
+    return handled
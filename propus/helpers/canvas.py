@@ -7,14 +7,18 @@ import asyncio
 
 import sqlalchemy.exc
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.session import Session
 from typing import Literal, Optional, Union
 
+from .canvas_workflow import CanvasTask, CanvasWorkflowExecutor, WorkflowReport
 from .exceptions import MissingCourseLmsId, MissingCanvasUserId, NoEnrollmentFound, NoCourseEnrollmentsFound
 
 from propus.calbright_sql.course_version_section import CourseVersionSection
 from propus.calbright_sql.enrollment import LMS, Enrollment
+from propus.calbright_sql.enrollment_course_term import EnrollmentCourseTerm
 from propus.calbright_sql.enrollment_status import EnrollmentStatus
+from propus.calbright_sql.program_version_course import ProgramVersionCourse
 from propus.calbright_sql.user import User
 from propus.calbright_sql.user_lms import UserLms
 
@@ -251,7 +255,25 @@ def create_subsequent_course_enrollment(
     """
     logger.info(f"Creating subsequent course enrollment for {ccc_id=}...")
     student_enrollment = get_student_enrollment(ccc_id=ccc_id, session=session)
-    course_enrollments = student_enrollment.enrollment_enrollment_course_term
+    section_id = get_next_course_section_id(current_course_id, student_enrollment.enrollment_enrollment_course_term)
+    if section_id is None:
+        return False
+    created_enrollment = asyncio.run(
+        canvas.create_enrollment(section_id=section_id, user_id=canvas_user_id, enrollment_type="StudentEnrollment")
+    )
+    logger.debug(f"Created enrollment: {created_enrollment}")
+    # TODO: same as the initial enrollment, we should store the created enrollment ID somewhere...
+    return True
+
+
+def get_next_course_section_id(current_course_id: str, course_enrollments: list[EnrollmentCourseTerm]):
+    """
+    Find the Canvas section of the course following current_course_id in a student's program.
+    - The next course is determined by the next_program_version_course_record field on the ProgramVersionCourse record.
+    :param current_course_id: The LMS ID of the course the student just completed
+    :param course_enrollments: The student's enrollment_course_term records
+    :return: The LMS ID of the section of the next course, None if there is no next course
+    """
     next_course = None
     # Go through course term enrollments and see if there is a next course
     for course_enrollment in course_enrollments:
@@ -264,16 +286,8 @@ def create_subsequent_course_enrollment(
     if next_course:
         for course_enrollment in course_enrollments:
             if course_enrollment.course_version_section.program_version_course == next_course:
-                section_id = course_enrollment.course_version_section.lms_id
-                created_enrollment = asyncio.run(
-                    canvas.create_enrollment(
-                        section_id=section_id, user_id=canvas_user_id, enrollment_type="StudentEnrollment"
-                    )
-                )
-                logger.debug(f"Created enrollment: {created_enrollment}")
-                # TODO: same as the initial enrollment, we should store the created enrollment ID somewhere...
-                return True
-    return False
+                return course_enrollment.course_version_section.lms_id
+    return None
 
 
 def enroll_instructors_in_sections(session: Session, canvas: Canvas):
@@ -368,3 +382,243 @@ def conclude_student_enrollments(ccc_id: str, session: Session, canvas: Canvas):
             )
         )
     return True
+
+
+def conclude_student_enrollments_concurrently(
+    ccc_ids: list[str], session: Session, canvas: Canvas, executor: Optional[CanvasWorkflowExecutor] = None
+) -> WorkflowReport:
+    """
+    Concurrent version of conclude_student_enrollments for many students at once.
+    - The students' enrollments are listed concurrently, then all of them are concluded concurrently.
+    - A student failing (e.g. no Canvas user ID) does not stop the others, it is reported in the returned report.
+    :param ccc_ids: The students' CCC_IDs
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param canvas: A Propus Canvas object.
+    :param executor: Optional CanvasWorkflowExecutor, to control concurrency and pacing
+    :return: WorkflowReport: ccc_id -> number of enrollments concluded, or the exception raised for that student
+    """
+    logger.info(f"Concluding student enrollments for {len(ccc_ids)} students...")
+    executor = executor or CanvasWorkflowExecutor(canvas)
+    report = WorkflowReport()
+
+    list_tasks = []
+    for ccc_id in ccc_ids:
+        try:
+            student_enrollment = get_student_enrollment(ccc_id=ccc_id, session=session)
+            canvas_user_id = get_canvas_id_from_user_lms_list(student_enrollment.student.user.user_lms)
+            if not canvas_user_id:
+                raise MissingCanvasUserId(ccc_id=ccc_id)
+        except (NoEnrollmentFound, MissingCanvasUserId) as error:
+            report.fail(ccc_id, error)
+            continue
+        list_tasks.append(
+            CanvasTask(
+                key=ccc_id, method="list_enrollments", kwargs={"object_type": "user", "object_id": canvas_user_id}
+            )
+        )
+    listed = executor.run(list_tasks)
+    report.merge(WorkflowReport(failed=listed.failed))
+
+    conclude_tasks = []
+    for ccc_id, canvas_enrollments in listed.succeeded.items():
+        report.succeeded[ccc_id] = len(canvas_enrollments or [])
+        for enrollment in canvas_enrollments or []:
+            conclude_tasks.append(
+                CanvasTask(
+                    key=(ccc_id, enrollment["id"]),
+                    method="conclude_delete_deactivate_enrollment",
+                    kwargs={
+                        "course_id": enrollment["course_id"],
+                        "enrollment_id": enrollment["id"],
+                        "task": "conclude",
+                    },
+                )
+            )
+    concluded = executor.run(conclude_tasks)
+    # Report the failed conclusions against the student they belong to
+    for (ccc_id, _), error in concluded.failed.items():
+        report.fail(ccc_id, error)
+    return report
+
+
+def create_course_sections_concurrently(
+    session: Session, canvas: Canvas, executor: Optional[CanvasWorkflowExecutor] = None
+) -> WorkflowReport:
+    """
+    Concurrent version of create_course_sections, the batched step run after create_course_version_section_records.
+    - The sections without an LMS ID and their course versions are loaded with two queries.
+    - The Canvas sections are created concurrently and their IDs committed in batches by the executor.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param canvas: A Propus Canvas object.
+    :param executor: Optional CanvasWorkflowExecutor, to control concurrency, pacing and the commit batch size
+    :return: WorkflowReport: CourseVersionSection.id -> created Canvas section, or the exception raised for it
+    """
+    logger.info("Creating course sections...")
+    executor = executor or CanvasWorkflowExecutor(canvas)
+    sections = (
+        session.execute(
+            select(CourseVersionSection)
+            .filter_by(lms=LMS("Canvas"), lms_id=None)
+            .options(
+                selectinload(CourseVersionSection.program_version_course).selectinload(
+                    ProgramVersionCourse.course_version
+                )
+            )
+        )
+        .scalars()
+        .all()
+    )
+    report = WorkflowReport()
+    tasks = []
+    for section in sections:
+        course_version = section.program_version_course.course_version
+        if not course_version.lms_id:
+            report.fail(section.id, MissingCourseLmsId(course_version_id=course_version.id))
+            continue
+
+        def set_section_id(created_section, section=section):
+            section.lms_id = created_section.get("id")
+
+        tasks.append(
+            CanvasTask(
+                key=section.id,
+                method="create_section",
+                kwargs={
+                    "course_id": course_version.lms_id,
+                    "name": section.section_name,
+                    "sis_section_id": section.section_name,
+                },
+                on_success=set_section_id,
+            )
+        )
+    if tasks:
+        report.merge(executor.run(tasks, session=session))
+    return report
+
+
+def enroll_instructors_in_sections_concurrently(
+    session: Session, canvas: Canvas, executor: Optional[CanvasWorkflowExecutor] = None
+) -> WorkflowReport:
+    """
+    Concurrent version of enroll_instructors_in_sections.
+    - Missing instructor Canvas accounts are created first (once per instructor), then all instructor enrollments are
+      created concurrently.
+    - The new user_lms records and instructor_enrollment_lms_ids are committed in batches by the executor.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param canvas: A Propus Canvas object.
+    :param executor: Optional CanvasWorkflowExecutor, to control concurrency, pacing and the commit batch size
+    :return: WorkflowReport: CourseVersionSection.id -> created Canvas enrollment, or the exception raised for it
+    """
+    logger.info("Enrolling instructors in sections...")
+    executor = executor or CanvasWorkflowExecutor(canvas)
+    sections = (
+        session.execute(
+            select(CourseVersionSection)
+            .filter_by(
+                lms=LMS("Canvas"),
+                instructor_enrollment_lms_id=None,
+            )
+            .filter(CourseVersionSection.lms_id.isnot(None))
+        )
+        .scalars()
+        .all()
+    )
+    report = WorkflowReport()
+    if not sections:
+        return report
+
+    canvas_user_ids = {}
+    user_tasks = {}
+    for section in sections:
+        user = section.instructor.user
+        canvas_user_ids[user.id] = get_canvas_id_from_user_lms_list(user.user_lms)
+        if canvas_user_ids[user.id] or user.id in user_tasks:
+            continue
+
+        def add_user_lms(created_user, user=user):
+            canvas_user_ids[user.id] = created_user["id"]
+            session.add(UserLms(lms=LMS("Canvas"), lms_id=created_user["id"], user=user))
+
+        user_tasks[user.id] = CanvasTask(
+            key=user.id,
+            method="create_user",
+            kwargs={
+                "user_type": "staff",
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "email_address": user.calbright_email,
+                "sis_user_id": user.calbright_email,
+            },
+            on_success=add_user_lms,
+        )
+    created_users = executor.run(user_tasks.values(), session=session)
+
+    enrollment_tasks = []
+    for section in sections:
+        user_id = section.instructor.user.id
+        if user_id in created_users.failed:
+            report.fail(section.id, created_users.failed[user_id])
+            continue
+
+        def set_enrollment_id(created_enrollment, section=section):
+            section.instructor_enrollment_lms_id = created_enrollment["id"]
+
+        enrollment_tasks.append(
+            CanvasTask(
+                key=section.id,
+                method="create_enrollment",
+                kwargs={
+                    "section_id": section.lms_id,
+                    "user_id": canvas_user_ids[user_id],
+                    "enrollment_type": "TeacherEnrollment",
+                },
+                on_success=set_enrollment_id,
+            )
+        )
+    report.merge(executor.run(enrollment_tasks, session=session))
+    return report
+
+
+def create_subsequent_course_enrollments_concurrently(
+    completions: list[dict], session: Session, canvas: Canvas, executor: Optional[CanvasWorkflowExecutor] = None
+) -> WorkflowReport:
+    """
+    Concurrent version of create_subsequent_course_enrollment for many students at once.
+    :param completions: One dict per student who completed a course, with the same keys as the arguments of
+        create_subsequent_course_enrollment, e.g. [{"current_course_id": "12", "ccc_id": "A1", "canvas_user_id": "9"}]
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param canvas: A Propus Canvas object.
+    :param executor: Optional CanvasWorkflowExecutor, to control concurrency and pacing
+    :return: WorkflowReport: ccc_id -> created Canvas enrollment (None if there is no next course), or the exception
+        raised for that student
+    """
+    logger.info(f"Creating subsequent course enrollments for {len(completions)} students...")
+    executor = executor or CanvasWorkflowExecutor(canvas)
+    report = WorkflowReport()
+    tasks = []
+    for completion in completions:
+        ccc_id = completion["ccc_id"]
+        try:
+            student_enrollment = get_student_enrollment(ccc_id=ccc_id, session=session)
+        except NoEnrollmentFound as error:
+            report.fail(ccc_id, error)
+            continue
+        section_id = get_next_course_section_id(
+            completion["current_course_id"], student_enrollment.enrollment_enrollment_course_term
+        )
+        if section_id is None:
+            report.succeeded[ccc_id] = None
+            continue
+        tasks.append(
+            CanvasTask(
+                key=ccc_id,
+                method="create_enrollment",
+                kwargs={
+                    "section_id": section_id,
+                    "user_id": completion["canvas_user_id"],
+                    "enrollment_type": "StudentEnrollment",
+                },
+            )
+        )
+    report.merge(executor.run(tasks))
+    return report
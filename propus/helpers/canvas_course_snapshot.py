@@ -0,0 +1,144 @@
+"""
+This module caches the structure of Canvas courses (modules with their items, and assignment groups with their
+assignments and discussion topics), which seed and sync jobs otherwise re-crawl from Canvas on every run although it
+rarely changes.
+
+A snapshot is stored per course together with the course's updated_at. On every run only the course objects are
+fetched (concurrently) to compare their updated_at; courses which did not change are served from their snapshot, the
+others are re-crawled concurrently and their snapshot replaced.
+
+Basic use:
+    cache = CanvasCourseSnapshotCache(canvas, LocalStorage(".canvas_snapshots"))
+    snapshots = cache.get_many([115, 116])
+    modules = snapshots["115"]["modules"]
+"""
+
+import json
+from typing import Optional, Union
+
+from .canvas_workflow import CanvasTask, CanvasWorkflowExecutor
+from .storage import LocalStorage, S3Storage
+
+from propus.canvas import Canvas
+
+from propus.logging_utility import Logging
+
+logger = Logging.get_logger("propus/helpers/canvas_course_snapshot")
+
+MODULE_INCLUDE = "items"
+ASSIGNMENT_GROUP_INCLUDE = ["assignments", "discussion_topic"]
+
+
+class CanvasCourseSnapshotCache:
+    """
+    :param canvas: A Propus Canvas object.
+    :param storage: Where the snapshots are kept, a LocalStorage or S3Storage
+    :param prefix: Key prefix of the snapshots in the storage
+    :param executor: Optional CanvasWorkflowExecutor, to control concurrency and pacing
+    """
+
+    def __init__(
+        self,
+        canvas: Canvas,
+        storage: Union[LocalStorage, S3Storage],
+        prefix: str = "canvas_course_snapshots",
+        executor: Optional[CanvasWorkflowExecutor] = None,
+    ):
+        self.canvas = canvas
+        self.storage = storage
+        self.prefix = prefix
+        self.executor = executor or CanvasWorkflowExecutor(canvas)
+        # Snapshots validated by this instance, so repeated get() calls within a run don't hit Canvas again
+        self._validated = {}
+
+    def _key(self, course_id: str) -> str:
+        return f"{self.prefix}/course_{course_id}.json"
+
+    def read_snapshot(self, course_id: Union[str, int]) -> Optional[dict]:
+        body = self.storage.read(self._key(str(course_id)))
+        return json.loads(body) if body else None
+
+    def invalidate(self, course_id: Union[str, int]):
+        """Drop the snapshot of a course, so it is re-crawled on next access"""
+        self._validated.pop(str(course_id), None)
+        self.storage.delete(self._key(str(course_id)))
+
+    def get(self, course_id: Union[str, int]) -> dict:
+        """
+        Get the structure of a course. A snapshot already validated by get_many() on this instance is returned as is.
+        :param course_id: Canvas course ID
+        :return: The snapshot of the course, see get_many()
+        """
+        if str(course_id) in self._validated:
+            return self._validated[str(course_id)]
+        return self.get_many([course_id])[str(course_id)]
+
+    def get_many(self, course_ids: list[Union[str, int]]) -> dict[str, dict]:
+        """
+        Get the structure of many courses, re-crawling only the courses which changed since their snapshot.
+        :param course_ids: Canvas course IDs
+        :return: dict: course ID (str) -> snapshot, e.g.
+            {"115": {"course_id": "115", "updated_at": "2024-06-01T12:00:00Z", "modules": [...],
+                     "assignment_groups": [...]}}
+        :raises Exception: The error of the first Canvas request which failed
+        """
+        course_ids = list(dict.fromkeys(str(course_id) for course_id in course_ids))
+        courses = self.executor.run(
+            [
+                CanvasTask(key=course_id, method="get_course", kwargs={"course_id": course_id})
+                for course_id in course_ids
+            ]
+        )
+        if courses.failed:
+            raise next(iter(courses.failed.values()))
+
+        snapshots = {}
+        stale = {}
+        for course_id in course_ids:
+            course = courses.succeeded[course_id]
+            # make_request collects single objects into a list of pages
+            course = course[0] if isinstance(course, list) else course
+            updated_at = course.get("updated_at")
+            snapshot = self.read_snapshot(course_id)
+            if updated_at and snapshot and snapshot.get("updated_at") == updated_at:
+                snapshots[course_id] = snapshot
+            else:
+                stale[course_id] = updated_at
+        logger.info(f"Course snapshots: {len(snapshots)} unchanged, {len(stale)} to refetch")
+        if not stale:
+            self._validated.update(snapshots)
+            return snapshots
+
+        tasks = []
+        for course_id in stale:
+            tasks.append(
+                CanvasTask(
+                    key=(course_id, "modules"),
+                    method="get_course_modules",
+                    kwargs={"course_id": course_id, "include": MODULE_INCLUDE},
+                )
+            )
+            tasks.append(
+                CanvasTask(
+                    key=(course_id, "assignment_groups"),
+                    method="get_course_assignment_groups",
+                    kwargs={"course_id": course_id, "include": ASSIGNMENT_GROUP_INCLUDE},
+                )
+            )
+        crawled = self.executor.run(tasks)
+        if crawled.failed:
+            raise next(iter(crawled.failed.values()))
+
+        for course_id, updated_at in stale.items():
+            snapshot = {
+                "course_id": course_id,
+                "updated_at": updated_at,
+                "modules": crawled.succeeded[(course_id, "modules")] or [],
+                "assignment_groups": crawled.succeeded[(course_id, "assignment_groups")] or [],
+            }
+            # Without an updated_at there is nothing to validate the snapshot against next time, so don't keep one
+            if updated_at:
+                self.storage.write(self._key(course_id), json.dumps(snapshot))
+            snapshots[course_id] = snapshot
+        self._validated.update(snapshots)
+        return snapshots
@@ -0,0 +1,200 @@
+"""
+This module exports the Canvas page views of many users into partitioned CSV or Parquet files, on the local disk or in
+S3 (see propus/helpers/storage.py), for the engagement analysis.
+
+The export runs in windows of whole days. Within a window the users' page views are fetched concurrently through the
+CanvasWorkflowExecutor, and every user's page views are written to their own file as soon as they arrive, so memory
+does not grow with the number of users:
+
+    <prefix>/date=2024-06-01/user_1234.csv
+    <prefix>/date=2024-06-01/_SUCCESS
+
+A window is complete once its _SUCCESS marker is written; the end of the last complete window is then stored as the
+export's watermark in the sync_watermark table and the next run starts from there. If a run stops halfway through a
+window, the next run skips the users whose file already exists in that window.
+
+Basic use:
+    report = export_page_views(session, canvas, S3Storage(AWS_S3.build(), "calbright-etl"), user_ids=[1234, 5678])
+"""
+
+import csv
+import io
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Literal, Optional, Union
+
+from sqlalchemy.orm.session import Session
+
+from .canvas_workflow import CanvasTask, CanvasWorkflowExecutor, WorkflowReport
+from .sql_calbright.sync_watermark import get_watermarks, set_watermarks
+from .storage import LocalStorage, S3Storage
+
+from propus.canvas import Canvas
+
+from propus.logging_utility import Logging
+
+logger = Logging.get_logger("propus/helpers/canvas_page_view_export")
+
+PAGE_VIEW_EXPORT_SOURCE = "canvas_page_views"
+SUCCESS_MARKER = "_SUCCESS"
+# Canvas' maximum page size for page views, the default of 10 would multiply the number of requests by ten
+PAGE_VIEWS_PER_PAGE = 100
+# Output columns and their Parquet types. The "links" object of a page view is flattened into the *_id columns.
+PAGE_VIEW_COLUMNS = {
+    "id": "string",
+    "user_id": "string",
+    "context_id": "string",
+    "asset_id": "string",
+    "real_user_id": "string",
+    "account_id": "string",
+    "url": "string",
+    "context_type": "string",
+    "asset_type": "string",
+    "controller": "string",
+    "action": "string",
+    "http_method": "string",
+    "interaction_seconds": "float64",
+    "participated": "bool",
+    "contributed": "bool",
+    "user_request": "bool",
+    "render_time": "float64",
+    "user_agent": "string",
+    "remote_ip": "string",
+    "app_name": "string",
+    "created_at": "string",
+    "updated_at": "string",
+}
+LINK_COLUMNS = ["user", "context", "asset", "real_user", "account"]
+
+
+def flatten_page_view(page_view: dict, user_id: Union[str, int]) -> dict:
+    """
+    Flatten a Canvas page view object into a row of PAGE_VIEW_COLUMNS.
+    :param page_view: A page view as returned by Canvas.get_user_page_views
+    :param user_id: The Canvas user the page view was requested for, used when it has no user link
+    :return: dict: column -> value
+    """
+    links = page_view.get("links") or {}
+    row = {column: page_view.get(column) for column in PAGE_VIEW_COLUMNS}
+    row |= {f"{link}_id": links.get(link) for link in LINK_COLUMNS}
+    row["user_id"] = row["user_id"] or user_id
+    for column, column_type in PAGE_VIEW_COLUMNS.items():
+        if column_type == "string" and row[column] is not None:
+            row[column] = str(row[column])
+    return row
+
+
+def serialize_rows(rows: list[dict], file_format: Literal["csv", "parquet"]) -> Union[str, bytes]:
+    """
+    Serialize page view rows into a CSV or Parquet file.
+    - Parquet needs pyarrow, which is only imported when Parquet is asked for.
+    :param rows: Rows from flatten_page_view
+    :param file_format: "csv" or "parquet"
+    :return: The content of the file
+    """
+    if file_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(PAGE_VIEW_COLUMNS))
+        writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue()
+    if file_format != "parquet":
+        raise ValueError(f"Unsupported file format {file_format}, expected csv or parquet")
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"string": pa.string(), "float64": pa.float64(), "bool": pa.bool_()}
+    schema = pa.schema([(column, types[column_type]) for column, column_type in PAGE_VIEW_COLUMNS.items()])
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), buffer)
+    return buffer.getvalue()
+
+
+def export_page_views(
+    session: Session,
+    canvas: Canvas,
+    storage: Union[LocalStorage, S3Storage],
+    user_ids: Iterable[Union[str, int]],
+    start: Optional[date] = None,
+    until: Optional[date] = None,
+    window_days: int = 1,
+    file_format: Literal["csv", "parquet"] = "csv",
+    prefix: str = "canvas_page_views",
+    executor: Optional[CanvasWorkflowExecutor] = None,
+) -> WorkflowReport:
+    """
+    Export the page views of the users for every complete window between the watermark and until.
+    - The first run of an export (no watermark yet) starts at start, or exports the single window before until.
+    - The export stops at the first window in which a user failed, and does not move the watermark past it; the next
+      run resumes that window, skipping the users already exported.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param canvas: A Propus Canvas object.
+    :param storage: Where the files are written, a LocalStorage or S3Storage
+    :param user_ids: The Canvas IDs of the users to export
+    :param start: Optional - the first day to export, when the export has no watermark yet
+    :param until: Optional - day (exclusive) until which to export, defaults to today (UTC)
+    :param window_days: Number of days per window, i.e. per partition
+    :param file_format: "csv" or "parquet" (requires pyarrow)
+    :param prefix: Key prefix of the export in the storage, also the key of its watermark
+    :param executor: Optional CanvasWorkflowExecutor, to control concurrency and pacing
+    :return: WorkflowReport: window start date (ISO) -> number of page views exported by this run, or the first
+        exception raised in that window
+    """
+    if file_format not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported file format {file_format}, expected csv or parquet")
+    user_ids = [str(user_id) for user_id in user_ids]
+    executor = executor or CanvasWorkflowExecutor(canvas)
+    until = until or datetime.now(tz=timezone.utc).date()
+    window = timedelta(days=window_days)
+
+    watermark = get_watermarks(session, PAGE_VIEW_EXPORT_SOURCE, [prefix]).get(prefix)
+    window_start = watermark.date() if watermark else (start or until - window)
+    report = WorkflowReport()
+
+    while window_start + window <= until:
+        window_end = window_start + window
+        partition = f"{prefix}/date={window_start.isoformat()}"
+        exported = 0
+
+        if not storage.exists(f"{partition}/{SUCCESS_MARKER}"):
+            done = set(storage.list(f"{partition}/"))
+            logger.info(f"Exporting page views from {window_start} to {window_end}, {len(done)} users already done")
+
+            def write(user_id, key):
+                def on_success(page_views):
+                    nonlocal exported
+                    rows = [flatten_page_view(page_view, user_id) for page_view in page_views or []]
+                    # An empty file still marks the user as done, for a restart of the window
+                    storage.write(key, serialize_rows(rows, file_format))
+                    exported += len(rows)
+
+                return on_success
+
+            tasks = (
+                CanvasTask(
+                    key=user_id,
+                    method="get_user_page_views",
+                    kwargs={
+                        "user_id": user_id,
+                        "start_time": datetime.combine(window_start, time(), tzinfo=timezone.utc),
+                        "end_time": datetime.combine(window_end, time(), tzinfo=timezone.utc),
+                        "per_page": PAGE_VIEWS_PER_PAGE,
+                    },
+                    on_success=write(user_id, key),
+                )
+                for user_id in user_ids
+                if (key := f"{partition}/user_{user_id}.{file_format}") not in done
+            )
+            results = executor.run(tasks, keep_results=False)
+            if results.failed:
+                report.fail(window_start.isoformat(), next(iter(results.failed.values())))
+                break
+            storage.write(f"{partition}/{SUCCESS_MARKER}", "")
+
+        set_watermarks(session, PAGE_VIEW_EXPORT_SOURCE, {prefix: datetime.combine(window_end, time())})
+        session.commit()
+        report.succeeded[window_start.isoformat()] = exported
+        window_start = window_end
+
+    logger.info(f"Exported page views of {len(report.succeeded)} windows, {len(report.failed)} failed")
+    return report
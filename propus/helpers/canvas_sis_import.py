@@ -0,0 +1,454 @@
+"""
+This module provisions Canvas users, sections and enrollments for a whole cohort through a single Canvas SIS Import,
+instead of one API call (and one commit) per user, section and enrollment as done in propus/helpers/canvas.py.
+
+The flow is:
+    1. Stream the rows that need provisioning out of the Calbright database into users.csv, sections.csv and
+       enrollments.csv, zipped into a temporary file (write_sis_import_files)
+    2. Submit the zip as one SIS import and poll it until Canvas has finished (wait_for_sis_import)
+    3. Map the import errors back to the database rows they came from (map_sis_import_errors) and write the created
+       Canvas IDs back to user_lms / course_version_section in bulk (link_sis_import_results)
+
+provision_canvas_with_sis_import runs all of the above.
+"""
+
+import asyncio
+import csv
+import io
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from time import sleep
+from typing import IO, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm.session import Session
+
+from .exceptions import SisImportFailed
+
+from propus.calbright_sql.course_version import CourseVersion
+from propus.calbright_sql.course_version_section import CourseVersionSection
+from propus.calbright_sql.enrollment import LMS, Enrollment
+from propus.calbright_sql.enrollment_course_term import EnrollmentCourseTerm
+from propus.calbright_sql.enrollment_status import EnrollmentStatus
+from propus.calbright_sql.program_version_course import ProgramVersionCourse
+from propus.calbright_sql.user import User
+from propus.calbright_sql.user_lms import UserLms
+
+from propus.canvas import Canvas
+
+from propus.logging_utility import Logging
+
+logger = Logging.get_logger("propus/helpers/canvas_sis_import")
+
+SIS_IMPORT_COLUMNS = {
+    "users.csv": ["user_id", "login_id", "authentication_provider_id", "first_name", "last_name", "email", "status"],
+    "sections.csv": ["section_id", "course_id", "name", "status"],
+    "enrollments.csv": ["course_id", "user_id", "role", "section_id", "status"],
+}
+SIS_IMPORT_FINISHED_STATES = ["imported", "imported_with_messages", "failed", "failed_with_messages", "aborted"]
+SIS_IMPORT_FAILED_STATES = ["failed", "failed_with_messages", "aborted"]
+
+# Rows are streamed out of Postgres in chunks of this size rather than loaded all at once
+YIELD_PER = 1000
+
+
+@dataclass
+class SisImportManifest:
+    """
+    Keeps track of which database row every csv row was written from, so Canvas' results can be mapped back.
+    Row lists are in file order, i.e. users[0] is the first data row of users.csv.
+    """
+
+    # User.id for each row of users.csv
+    users: list = field(default_factory=list)
+    # CourseVersionSection.id for each row of sections.csv
+    sections: list = field(default_factory=list)
+    # ("course_version_section", CourseVersionSection.id) for instructor rows of enrollments.csv and
+    # ("enrollment_course_term", EnrollmentCourseTerm.id) for student rows
+    enrollments: list = field(default_factory=list)
+    # sis_user_id -> User.id for the users without a Canvas ID yet
+    user_ids_by_sis_id: dict = field(default_factory=dict)
+    # section_name -> CourseVersionSection.id for the sections created by the import
+    section_ids_by_name: dict = field(default_factory=dict)
+    # section_name -> CourseVersionSection.id for the sections waiting on an instructor enrollment
+    instructor_sections_by_name: dict = field(default_factory=dict)
+    # course lms_id -> set of section names touched by the import
+    sections_by_course: dict = field(default_factory=dict)
+    # Rows that could not be written, e.g. because the Canvas course has no sis_course_id
+    skipped: list = field(default_factory=list)
+
+    def track_section(self, course_lms_id, section_name):
+        self.sections_by_course.setdefault(course_lms_id, set()).add(section_name)
+
+
+def fetch_sis_course_ids(canvas: Canvas, course_lms_ids) -> dict:
+    """
+    SIS import files reference courses by their sis_course_id, which we do not store in the database. This fetches
+    it once per distinct Canvas course.
+    :param canvas: A Propus Canvas object.
+    :param course_lms_ids: An iterable of Canvas course IDs
+    :return: dict: course lms_id -> sis_course_id (None if the course does not have one)
+    """
+    sis_course_ids = {}
+    for course_lms_id in set(course_lms_ids):
+        course = asyncio.run(canvas.get_course(course_id=course_lms_id))
+        course = course[0] if isinstance(course, list) else course
+        sis_course_ids[course_lms_id] = course.get("sis_course_id")
+    return sis_course_ids
+
+
+def _canvas_user_exists():
+    return select(UserLms.id).where(UserLms.user_id == User.id, UserLms.lms == LMS("Canvas")).exists()
+
+
+def _instructor_rows(session: Session):
+    """Sections which are waiting on an instructor enrollment, along with the instructor's user data."""
+    return session.execute(
+        select(
+            CourseVersionSection.id.label("section_id"),
+            CourseVersionSection.section_name,
+            CourseVersionSection.lms_id.label("section_lms_id"),
+            CourseVersion.lms_id.label("course_lms_id"),
+            User.id.label("user_id"),
+            User.first_name,
+            User.last_name,
+            User.calbright_email,
+            _canvas_user_exists().label("has_canvas_user"),
+        )
+        .join(ProgramVersionCourse, CourseVersionSection.program_version_course_id == ProgramVersionCourse.id)
+        .join(CourseVersion, ProgramVersionCourse.course_version_id == CourseVersion.id)
+        .join(User, User.staff_id == CourseVersionSection.instructor_id)
+        .filter(
+            CourseVersionSection.lms == LMS("Canvas"),
+            CourseVersionSection.instructor_enrollment_lms_id.is_(None),
+        )
+        .execution_options(yield_per=YIELD_PER)
+    )
+
+
+def _student_rows(session: Session, ccc_ids: list):
+    """First course enrollments of the active program enrollments for the given students."""
+    return session.execute(
+        select(
+            EnrollmentCourseTerm.id.label("enrollment_course_term_id"),
+            CourseVersionSection.section_name,
+            CourseVersion.lms_id.label("course_lms_id"),
+            User.id.label("user_id"),
+            User.ccc_id,
+            User.first_name,
+            User.last_name,
+            User.calbright_email,
+            _canvas_user_exists().label("has_canvas_user"),
+        )
+        .join(Enrollment, EnrollmentCourseTerm.enrollment_id == Enrollment.id)
+        .join(EnrollmentStatus, Enrollment.enrollment_status_id == EnrollmentStatus.id)
+        .join(User, User.ccc_id == Enrollment.ccc_id)
+        .join(CourseVersionSection, EnrollmentCourseTerm.course_version_section_id == CourseVersionSection.id)
+        .join(ProgramVersionCourse, CourseVersionSection.program_version_course_id == ProgramVersionCourse.id)
+        .join(CourseVersion, ProgramVersionCourse.course_version_id == CourseVersion.id)
+        .filter(
+            Enrollment.ccc_id.in_(ccc_ids),
+            EnrollmentStatus.status.in_(["Enrolled", "Started"]),
+            ProgramVersionCourse.is_first_course_in_program.is_(True),
+            CourseVersionSection.lms == LMS("Canvas"),
+        )
+        .execution_options(yield_per=YIELD_PER)
+    )
+
+
+def _new_section_rows(session: Session):
+    """Sections which have not been created in Canvas yet."""
+    return session.execute(
+        select(
+            CourseVersionSection.id.label("section_id"),
+            CourseVersionSection.section_name,
+            CourseVersion.lms_id.label("course_lms_id"),
+        )
+        .join(ProgramVersionCourse, CourseVersionSection.program_version_course_id == ProgramVersionCourse.id)
+        .join(CourseVersion, ProgramVersionCourse.course_version_id == CourseVersion.id)
+        .filter(CourseVersionSection.lms == LMS("Canvas"), CourseVersionSection.lms_id.is_(None))
+        .execution_options(yield_per=YIELD_PER)
+    )
+
+
+def _open_csv(zip_file: zipfile.ZipFile, file_name: str):
+    handle = io.TextIOWrapper(zip_file.open(file_name, "w"), encoding="utf-8", newline="")
+    writer = csv.writer(handle)
+    writer.writerow(SIS_IMPORT_COLUMNS[file_name])
+    return handle, writer
+
+
+def write_sis_import_files(session: Session, canvas: Canvas, ccc_ids: list, file_obj: IO[bytes]) -> SisImportManifest:
+    """
+    Write users.csv, sections.csv and enrollments.csv into a zip archive for a Canvas SIS import.
+    - users.csv holds the instructors and students which do not have a Canvas ID in user_lms yet
+    - sections.csv holds the course_version_section records which do not have a Canvas section yet
+    - enrollments.csv holds the missing instructor enrollments and the first course enrollment of every student
+    Rows are streamed from the database, nothing but the IDs needed to map the results back is kept in memory.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param canvas: A Propus Canvas object.
+    :param ccc_ids: The students to enroll (e.g. the cohort starting this term)
+    :param file_obj: A writable binary file object the zip archive is written to
+    :return: SisImportManifest: The database rows each csv row was written from
+    """
+    manifest = SisImportManifest()
+    sis_course_ids = {}
+
+    def sis_course_id(course_lms_id):
+        if course_lms_id not in sis_course_ids:
+            sis_course_ids.update(fetch_sis_course_ids(canvas, [course_lms_id]))
+        return sis_course_ids[course_lms_id]
+
+    with zipfile.ZipFile(file_obj, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        logger.info("Writing users.csv...")
+        handle, writer = _open_csv(zip_file, "users.csv")
+        for row in _instructor_rows(session):
+            if row.has_canvas_user or row.calbright_email in manifest.user_ids_by_sis_id:
+                continue
+            writer.writerow(
+                [
+                    row.calbright_email,
+                    row.calbright_email,
+                    canvas.auth_providers["okta"],
+                    row.first_name,
+                    row.last_name,
+                    row.calbright_email,
+                    "active",
+                ]
+            )
+            manifest.users.append(row.user_id)
+            manifest.user_ids_by_sis_id[row.calbright_email] = row.user_id
+        for row in _student_rows(session, ccc_ids):
+            if row.has_canvas_user or row.ccc_id in manifest.user_ids_by_sis_id:
+                continue
+            writer.writerow(
+                [
+                    row.ccc_id,
+                    row.calbright_email,
+                    canvas.auth_providers["google"],
+                    row.first_name,
+                    row.last_name,
+                    row.calbright_email,
+                    "active",
+                ]
+            )
+            manifest.users.append(row.user_id)
+            manifest.user_ids_by_sis_id[row.ccc_id] = row.user_id
+        handle.close()
+
+        logger.info("Writing sections.csv...")
+        handle, writer = _open_csv(zip_file, "sections.csv")
+        for row in _new_section_rows(session):
+            course_id = sis_course_id(row.course_lms_id)
+            if not course_id:
+                logger.warning(f"Canvas course {row.course_lms_id} has no sis_course_id, skipping {row.section_name}")
+                manifest.skipped.append(("course_version_section", row.section_id))
+                continue
+            writer.writerow([row.section_name, course_id, row.section_name, "active"])
+            manifest.sections.append(row.section_id)
+            manifest.section_ids_by_name[row.section_name] = row.section_id
+            manifest.track_section(row.course_lms_id, row.section_name)
+        handle.close()
+
+        logger.info("Writing enrollments.csv...")
+        handle, writer = _open_csv(zip_file, "enrollments.csv")
+        for row in _instructor_rows(session):
+            course_id = sis_course_id(row.course_lms_id)
+            if not course_id:
+                manifest.skipped.append(("course_version_section", row.section_id))
+                continue
+            writer.writerow([course_id, row.calbright_email, "teacher", row.section_name, "active"])
+            manifest.enrollments.append(("course_version_section", row.section_id))
+            manifest.instructor_sections_by_name[row.section_name] = row.section_id
+            manifest.track_section(row.course_lms_id, row.section_name)
+        for row in _student_rows(session, ccc_ids):
+            course_id = sis_course_id(row.course_lms_id)
+            if not course_id:
+                manifest.skipped.append(("enrollment_course_term", row.enrollment_course_term_id))
+                continue
+            writer.writerow([course_id, row.ccc_id, "student", row.section_name, "active"])
+            manifest.enrollments.append(("enrollment_course_term", row.enrollment_course_term_id))
+            manifest.track_section(row.course_lms_id, row.section_name)
+        handle.close()
+
+    logger.info(
+        f"SIS import files written: {len(manifest.users)} users, {len(manifest.sections)} sections, "
+        f"{len(manifest.enrollments)} enrollments, {len(manifest.skipped)} skipped"
+    )
+    return manifest
+
+
+def wait_for_sis_import(canvas: Canvas, sis_import_id, wait: int = 5, max_tries: int = 120) -> dict:
+    """
+    Poll a SIS import until Canvas has finished processing it.
+    :param canvas: A Propus Canvas object.
+    :param sis_import_id: The ID of the SIS import
+    :param wait: Seconds to wait between status checks
+    :param max_tries: Maximum number of status checks before giving up
+    :return: dict: The finished SIS import object
+    :raises SisImportFailed: If the import failed, was aborted or did not finish in time
+    """
+    sis_import = asyncio.run(canvas.get_sis_import(sis_import_id=sis_import_id))
+    while sis_import.get("workflow_state") not in SIS_IMPORT_FINISHED_STATES and max_tries > 0:
+        logger.info(
+            f"Waiting {wait} seconds on SIS import {sis_import_id}: "
+            f"{sis_import.get('workflow_state')} ({sis_import.get('progress', 0)}%)"
+        )
+        sleep(wait)
+        max_tries -= 1
+        sis_import = asyncio.run(canvas.get_sis_import(sis_import_id=sis_import_id))
+
+    if sis_import.get("workflow_state") not in SIS_IMPORT_FINISHED_STATES:
+        raise SisImportFailed(sis_import_id, sis_import.get("workflow_state"), "maximum retries met")
+    if sis_import.get("workflow_state") in SIS_IMPORT_FAILED_STATES:
+        raise SisImportFailed(sis_import_id, sis_import.get("workflow_state"), sis_import.get("processing_errors"))
+    return sis_import
+
+
+def map_sis_import_errors(errors: list[dict], manifest: SisImportManifest) -> dict:
+    """
+    Map the errors of a SIS import back to the database rows they were written from.
+    Canvas reports the row as a 1-based line number including the header, so data row i is reported as row i + 2.
+    :param errors: The SIS import errors, as returned by Canvas.get_sis_import_errors
+    :param manifest: The SisImportManifest returned by write_sis_import_files
+    :return: dict: {"users": {User.id: [message]}, "sections": {CourseVersionSection.id: [message]},
+        "enrollments": {("enrollment_course_term", id): [message]}, "unmapped": [error]}
+    """
+    rows_by_file = {
+        "users.csv": ("users", manifest.users),
+        "sections.csv": ("sections", manifest.sections),
+        "enrollments.csv": ("enrollments", manifest.enrollments),
+    }
+    mapped = {"users": {}, "sections": {}, "enrollments": {}, "unmapped": []}
+    for error in errors:
+        key, rows = rows_by_file.get(error.get("file"), (None, []))
+        row = error.get("row")
+        if key is None or not isinstance(row, int) or not 0 <= row - 2 < len(rows):
+            mapped["unmapped"].append(error)
+            continue
+        mapped[key].setdefault(rows[row - 2], []).append(error.get("message"))
+    return mapped
+
+
+def link_sis_import_results(session: Session, canvas: Canvas, manifest: SisImportManifest, commit=True) -> dict:
+    """
+    Write the Canvas IDs created by a SIS import back to the database in bulk:
+    - user_lms records for the created users
+    - course_version_section.lms_id for the created sections
+    - course_version_section.instructor_enrollment_lms_id for the created instructor enrollments
+    The Canvas IDs are read from one (paginated) enrollment listing per course, filtered to the imported sections.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param canvas: A Propus Canvas object.
+    :param manifest: The SisImportManifest returned by write_sis_import_files
+    :param commit: Whether to commit the transaction
+    :return: dict: Number of user_lms records created, sections linked and instructor enrollments linked
+    """
+    user_lms_records = {}
+    section_updates = {}
+    for course_lms_id, section_names in manifest.sections_by_course.items():
+        canvas_enrollments = asyncio.run(
+            canvas.list_enrollments(object_type="course", object_id=course_lms_id, sis_section_id=sorted(section_names))
+        )
+        for enrollment in canvas_enrollments or []:
+            section_name = enrollment.get("sis_section_id")
+            if section_name in manifest.section_ids_by_name:
+                section_id = manifest.section_ids_by_name[section_name]
+                section_updates.setdefault(section_id, {"id": section_id})["lms_id"] = enrollment.get(
+                    "course_section_id"
+                )
+            if enrollment.get("type") == "TeacherEnrollment" and section_name in manifest.instructor_sections_by_name:
+                section_id = manifest.instructor_sections_by_name[section_name]
+                section_updates.setdefault(section_id, {"id": section_id})["instructor_enrollment_lms_id"] = str(
+                    enrollment.get("id")
+                )
+            user_id = manifest.user_ids_by_sis_id.get(enrollment.get("sis_user_id"))
+            if user_id and user_id not in user_lms_records:
+                user_lms_records[user_id] = {
+                    "lms": LMS("Canvas"),
+                    "lms_id": str(enrollment.get("user_id")),
+                    "user_id": user_id,
+                }
+
+    if user_lms_records:
+        session.execute(insert(UserLms), list(user_lms_records.values()))
+    # Bulk UPDATE by primary key requires every row to carry the same keys, so group them by their key set
+    updates_by_keys = {}
+    for section_update in section_updates.values():
+        updates_by_keys.setdefault(tuple(sorted(section_update)), []).append(section_update)
+    for grouped_updates in updates_by_keys.values():
+        session.execute(update(CourseVersionSection), grouped_updates)
+    if commit:
+        session.commit()
+
+    return {
+        "user_lms_created": len(user_lms_records),
+        "sections_linked": sum(1 for u in section_updates.values() if "lms_id" in u),
+        "instructor_enrollments_linked": sum(
+            1 for u in section_updates.values() if "instructor_enrollment_lms_id" in u
+        ),
+    }
+
+
+def provision_canvas_with_sis_import(
+    session: Session,
+    canvas: Canvas,
+    ccc_ids: list,
+    wait: int = 5,
+    max_tries: int = 120,
+    diffing_data_set_identifier: Optional[str] = None,
+) -> dict:
+    """
+    Provision Canvas users, sections and enrollments for a cohort of students with a single SIS import.
+    This is the bulk equivalent of running create_course_sections, enroll_instructors_in_sections and
+    create_initial_course_enrollment (propus/helpers/canvas.py) for every student.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param canvas: A Propus Canvas object.
+    :param ccc_ids: The students to enroll (e.g. the cohort starting this term)
+    :param wait: Seconds to wait between SIS import status checks
+    :param max_tries: Maximum number of SIS import status checks
+    :param diffing_data_set_identifier: Optional Canvas diffing data set, see Canvas.create_sis_import
+    :return: dict: Summary of the import, e.g.
+        {
+            "sis_import_id": 12,
+            "workflow_state": "imported_with_messages",
+            "counts": {"users": 120, "sections": 2, "enrollments": 122, "skipped": 0},
+            "linked": {"user_lms_created": 119, "sections_linked": 2, "instructor_enrollments_linked": 2},
+            "errors": {"users": {<User.id>: ["..."]}, "sections": {}, "enrollments": {}, "unmapped": []},
+        }
+    """
+    with tempfile.TemporaryFile() as file_obj:
+        manifest = write_sis_import_files(session, canvas, ccc_ids, file_obj)
+        summary = {
+            "sis_import_id": None,
+            "workflow_state": None,
+            "counts": {
+                "users": len(manifest.users),
+                "sections": len(manifest.sections),
+                "enrollments": len(manifest.enrollments),
+                "skipped": len(manifest.skipped),
+            },
+            "linked": {},
+            "errors": {"users": {}, "sections": {}, "enrollments": {}, "unmapped": []},
+        }
+        if not (manifest.users or manifest.sections or manifest.enrollments):
+            logger.info("Nothing to provision in Canvas")
+            return summary
+
+        file_obj.seek(0)
+        created_import = asyncio.run(
+            canvas.create_sis_import(
+                attachment=file_obj, extension="zip", diffing_data_set_identifier=diffing_data_set_identifier
+            )
+        )
+    summary["sis_import_id"] = created_import.get("id")
+    logger.info(f"Created SIS import {summary['sis_import_id']}")
+
+    sis_import = wait_for_sis_import(canvas, summary["sis_import_id"], wait=wait, max_tries=max_tries)
+    summary["workflow_state"] = sis_import.get("workflow_state")
+    if sis_import.get("workflow_state") == "imported_with_messages":
+        errors = asyncio.run(canvas.get_sis_import_errors(sis_import_id=summary["sis_import_id"]))
+        summary["errors"] = map_sis_import_errors(errors, manifest)
+
+    summary["linked"] = link_sis_import_results(session, canvas, manifest)
+    return summary
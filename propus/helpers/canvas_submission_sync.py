@@ -0,0 +1,300 @@
+"""
+This module syncs Canvas submissions into the assessment_submission table incrementally.
+
+Rather than pulling every submission of every course on each run, a high-water mark is kept per course in the
+sync_watermark table and only the submissions submitted or graded since then are fetched. The courses are fetched
+concurrently through the CanvasWorkflowExecutor, each course's submissions are upserted with a single
+INSERT ... ON CONFLICT as soon as they arrive, and the progress of the enrollment_course_term records they touch is
+recomputed with a single UPDATE. An hourly sync therefore costs in proportion to the activity since the last run
+instead of the size of the catalog.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import FLOAT, and_, cast, distinct, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm.session import Session
+
+from .canvas_workflow import CanvasTask, CanvasWorkflowExecutor, WorkflowReport
+from .sql_calbright.sync_watermark import get_watermarks, set_watermarks
+
+from propus.calbright_sql.assessment import Assessment, AssessmentType, LmsType
+from propus.calbright_sql.assessment_submission import AssessmentSubmission, AssessmentSubmissionStatus
+from propus.calbright_sql.competency import Competency, CompetencyType
+from propus.calbright_sql.course_version import CourseVersion
+from propus.calbright_sql.enrollment import LMS, Enrollment
+from propus.calbright_sql.enrollment_course_term import EnrollmentCourseTerm
+from propus.calbright_sql.enrollment_status import EnrollmentStatus
+from propus.calbright_sql.user import User
+from propus.calbright_sql.user_lms import UserLms
+
+from propus.canvas import Canvas
+
+from propus.logging_utility import Logging
+
+logger = Logging.get_logger("propus/helpers/canvas_submission_sync")
+
+SUBMISSION_SYNC_SOURCE = "canvas_submissions"
+# Submissions are re-read from slightly before the watermark, to cover clock drift between Canvas and us. The upsert
+# is idempotent, so reading a submission twice is harmless.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# Columns of assessment_submission refreshed when a submission already exists
+UPSERT_COLUMNS = ["enrollment_id", "assessment_id", "attempt", "score", "grade", "submission_timestamp", "status"]
+
+
+def _parse_canvas_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    # Canvas returns UTC timestamps such as 2024-06-01T12:00:00Z, the database stores naive UTC timestamps
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def get_submission_status(submission: dict, required_percentage_to_pass: float) -> AssessmentSubmissionStatus:
+    """
+    Derive the status of a submission from its Canvas workflow_state and score.
+    :param submission: A Canvas submission object, including its assignment
+    :param required_percentage_to_pass: The assessment's required_percentage_to_pass (0.0 - 1.0)
+    :return: AssessmentSubmissionStatus
+    """
+    if submission.get("workflow_state") != "graded":
+        return AssessmentSubmissionStatus.submitted
+    if submission.get("grade") in ("complete", "pass"):
+        return AssessmentSubmissionStatus.passed
+    if submission.get("grade") in ("incomplete", "fail"):
+        return AssessmentSubmissionStatus.failed
+    points_possible = (submission.get("assignment") or {}).get("points_possible")
+    if submission.get("score") is None or not points_possible:
+        return AssessmentSubmissionStatus.submitted
+    if submission["score"] / points_possible >= (required_percentage_to_pass or 0.0):
+        return AssessmentSubmissionStatus.passed
+    return AssessmentSubmissionStatus.failed
+
+
+def build_submission_rows(session: Session, submissions: list[dict]) -> list[dict]:
+    """
+    Turn Canvas submissions into assessment_submission rows.
+    The assessments and enrollments of all submissions are resolved with one query each. Submissions which were never
+    submitted, or whose assignment / student is unknown to the database, are skipped.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param submissions: Canvas submission objects
+    :return: list[dict]: Rows ready to be upserted into assessment_submission
+    """
+    submissions = [s for s in submissions if s.get("submitted_at")]
+    if not submissions:
+        return []
+
+    assessments = {
+        row.lms_id: row
+        for row in session.execute(
+            select(Assessment.id, Assessment.lms_id, Assessment.required_percentage_to_pass).filter(
+                Assessment.lms_id.in_({str(s["assignment_id"]) for s in submissions}),
+                Assessment.lms_type == LmsType.assignment,
+            )
+        )
+    }
+    enrollment_ids = {
+        row.lms_id: row.enrollment_id
+        for row in session.execute(
+            select(UserLms.lms_id, Enrollment.id.label("enrollment_id"))
+            .join(User, UserLms.user_id == User.id)
+            .join(Enrollment, Enrollment.ccc_id == User.ccc_id)
+            .join(EnrollmentStatus, Enrollment.enrollment_status_id == EnrollmentStatus.id)
+            .filter(
+                UserLms.lms == LMS("Canvas"),
+                UserLms.lms_id.in_({str(s["user_id"]) for s in submissions}),
+                EnrollmentStatus.status.in_(["Enrolled", "Started"]),
+            )
+            # If a student has more than one active enrollment, the most recent one wins
+            .order_by(Enrollment.created_at)
+        )
+    }
+
+    rows = {}
+    for submission in submissions:
+        assessment = assessments.get(str(submission["assignment_id"]))
+        enrollment_id = enrollment_ids.get(str(submission["user_id"]))
+        if not (assessment and enrollment_id):
+            logger.debug(f"Skipping submission {submission['id']}: unknown assignment or student")
+            continue
+        rows[str(submission["id"])] = {
+            "enrollment_id": enrollment_id,
+            "assessment_id": assessment.id,
+            "attempt": submission.get("attempt") or 0,
+            "score": submission.get("score"),
+            "grade": str(submission["grade"])[:10] if submission.get("grade") else None,
+            "submission_timestamp": _parse_canvas_datetime(submission["submitted_at"]),
+            "lms": LMS("Canvas"),
+            "lms_id": str(submission["id"]),
+            "status": get_submission_status(submission, assessment.required_percentage_to_pass),
+        }
+    # A submission can come back from both the submitted_since and graded_since queries, keep one row per lms_id
+    return list(rows.values())
+
+
+def upsert_submission_rows(session: Session, rows: list[dict]) -> int:
+    """
+    Insert or update assessment_submission rows with a single INSERT ... ON CONFLICT (lms_id) DO UPDATE.
+    Rows identical to what is already stored are left untouched.
+    Note: You must commit the session after calling this function to persist the changes to the database!
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param rows: Rows as returned by build_submission_rows
+    :return: int: Number of rows sent to the database
+    """
+    if not rows:
+        return 0
+    stmt = insert(AssessmentSubmission).values(rows)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[AssessmentSubmission.lms_id],
+            set_={column: stmt.excluded[column] for column in UPSERT_COLUMNS} | {"modified_at": func.now()},
+            where=or_(
+                *[
+                    getattr(AssessmentSubmission, column).is_distinct_from(stmt.excluded[column])
+                    for column in UPSERT_COLUMNS
+                ]
+            ),
+        )
+    )
+    return len(rows)
+
+
+def update_course_progress(session: Session, course_lms_id: str, enrollment_ids: set):
+    """
+    Recompute enrollment_course_term.progress of the given enrollments in a course with a single UPDATE.
+    Progress is the share of the course's active competencies with a passed summative assessment, as in the
+    progress_by_course view.
+    Note: You must commit the session after calling this function to persist the changes to the database!
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param course_lms_id: The Canvas course ID
+    :param enrollment_ids: The enrollments whose submissions changed
+    """
+    if not enrollment_ids:
+        return
+    competency_filter = and_(
+        Competency.course_version_id == EnrollmentCourseTerm.course_version_id,
+        Competency.competency_type == CompetencyType.competency,
+        Competency.is_active.is_(True),
+        Competency.lms == LMS("Canvas"),
+    )
+    competencies = select(func.count(Competency.id)).filter(competency_filter).scalar_subquery()
+    competencies_passed = (
+        select(func.count(distinct(Competency.id)))
+        .join(Assessment, Assessment.competency_id == Competency.id)
+        .join(AssessmentSubmission, AssessmentSubmission.assessment_id == Assessment.id)
+        .filter(
+            competency_filter,
+            Assessment.assessment_type == AssessmentType.summative,
+            AssessmentSubmission.enrollment_id == EnrollmentCourseTerm.enrollment_id,
+            AssessmentSubmission.status == AssessmentSubmissionStatus.passed,
+        )
+        .scalar_subquery()
+    )
+    session.execute(
+        update(EnrollmentCourseTerm)
+        .filter(
+            EnrollmentCourseTerm.enrollment_id.in_(enrollment_ids),
+            EnrollmentCourseTerm.course_version_id.in_(
+                select(CourseVersion.id).filter(CourseVersion.lms_id == str(course_lms_id))
+            ),
+        )
+        .values(
+            progress=func.coalesce(cast(competencies_passed, FLOAT) / func.nullif(competencies, 0), 0.0),
+            modified_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_canvas_course_ids(session: Session) -> list[str]:
+    """
+    Get the Canvas IDs of all course versions taught in Canvas.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :return: list[str]: Canvas course IDs
+    """
+    return (
+        session.execute(
+            select(distinct(CourseVersion.lms_id)).filter(
+                CourseVersion.lms == LMS("Canvas"), CourseVersion.lms_id.isnot(None)
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+
+def sync_canvas_submissions(
+    session: Session,
+    canvas: Canvas,
+    course_lms_ids: Optional[list[str]] = None,
+    executor: Optional[CanvasWorkflowExecutor] = None,
+) -> WorkflowReport:
+    """
+    Sync the Canvas submissions submitted or graded since the last run into assessment_submission, and refresh the
+    progress of the enrollment_course_term records they belong to.
+    - The first run of a course (no watermark yet) pulls all of its submissions.
+    - A course's watermark only moves forward when all of its requests and database writes succeeded, so a failed
+      course is simply retried from the same point on the next run.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param canvas: A Propus Canvas object.
+    :param course_lms_ids: The Canvas courses to sync. Defaults to all course versions taught in Canvas.
+    :param executor: Optional CanvasWorkflowExecutor, to control concurrency and pacing
+    :return: WorkflowReport: course lms_id -> number of submissions upserted, or the exception raised for that course
+    """
+    course_lms_ids = [
+        str(c) for c in (course_lms_ids if course_lms_ids is not None else get_canvas_course_ids(session))
+    ]
+    executor = executor or CanvasWorkflowExecutor(canvas, commit_batch_size=1)
+    watermarks = get_watermarks(session, SUBMISSION_SYNC_SOURCE, course_lms_ids)
+    # The new watermark is taken before fetching, anything changed while the sync runs is picked up by the next one
+    sync_started = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    logger.info(f"Syncing Canvas submissions for {len(course_lms_ids)} courses, {len(watermarks)} incrementally...")
+
+    upserted = {course_lms_id: 0 for course_lms_id in course_lms_ids}
+
+    def store(course_lms_id):
+        def on_success(submissions):
+            rows = build_submission_rows(session, submissions or [])
+            upserted[course_lms_id] += upsert_submission_rows(session, rows)
+            update_course_progress(session, course_lms_id, {row["enrollment_id"] for row in rows})
+
+        return on_success
+
+    tasks = []
+    for course_lms_id in course_lms_ids:
+        base_kwargs = {"object_type": "course", "object_id": course_lms_id, "include": ["assignment"]}
+        watermark = watermarks.get(course_lms_id)
+        if watermark is None:
+            tasks.append(
+                CanvasTask(
+                    key=(course_lms_id, "all"),
+                    method="list_assignment_submissions_for_multiple_assignments",
+                    kwargs=base_kwargs,
+                    on_success=store(course_lms_id),
+                )
+            )
+            continue
+        since = (watermark - WATERMARK_OVERLAP).replace(tzinfo=timezone.utc)
+        for changed in ("submitted_since", "graded_since"):
+            tasks.append(
+                CanvasTask(
+                    key=(course_lms_id, changed),
+                    method="list_assignment_submissions_for_multiple_assignments",
+                    kwargs=base_kwargs | {changed: since},
+                    on_success=store(course_lms_id),
+                )
+            )
+
+    results = executor.run(tasks, session=session)
+
+    report = WorkflowReport()
+    for (course_lms_id, _), error in results.failed.items():
+        report.fail(course_lms_id, error)
+    for course_lms_id in course_lms_ids:
+        if course_lms_id not in report.failed:
+            report.succeeded[course_lms_id] = upserted[course_lms_id]
+    set_watermarks(session, SUBMISSION_SYNC_SOURCE, {course_lms_id: sync_started for course_lms_id in report.succeeded})
+    session.commit()
+
+    logger.info(f"Upserted {sum(report.succeeded.values())} submissions, {len(report.failed)} courses failed")
+    return report
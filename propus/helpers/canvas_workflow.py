@@ -0,0 +1,236 @@
+"""
+This module contains an executor for running many Canvas API calls concurrently, used by the bulk helpers in
+propus/helpers/canvas.py.
+
+The Canvas client methods are coroutines wrapping blocking requests, so calling asyncio.run() per item both creates a
+new event loop every time and serializes all network I/O. The executor instead runs the calls on a bounded thread pool
+where every worker thread keeps a single event loop for its lifetime, and paces the calls so that Canvas' rate limit
+is respected.
+
+Anything touching the database (on_success callbacks, commits) runs on the calling thread only, since a Session is
+not thread safe.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from time import monotonic, sleep
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from sqlalchemy.orm.session import Session
+
+from propus.api_client import FailedRequest, TooManyRequests
+from propus.canvas import Canvas
+from propus.canvas.throttle import CANVAS_RATE_LIMIT_MESSAGE
+
+from propus.logging_utility import Logging
+
+logger = Logging.get_logger("propus/helpers/canvas_workflow")
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Whether an exception raised by the Canvas client means the request was throttled by Canvas"""
+    return isinstance(error, TooManyRequests) or (
+        isinstance(error, FailedRequest) and CANVAS_RATE_LIMIT_MESSAGE in str(error)
+    )
+
+
+@dataclass
+class CanvasTask:
+    """
+    A single Canvas API call to be run by the CanvasWorkflowExecutor.
+    :param key: Identifies the item the call was made for in the WorkflowReport, e.g. a ccc_id or a section ID
+    :param method: The name of the Canvas method to call, e.g. "create_enrollment"
+    :param kwargs: The keyword arguments for the Canvas method
+    :param on_success: Optional callback receiving the Canvas response. It is run on the calling thread, so it is the
+        place to update database records; the executor commits them in batches.
+    """
+
+    key: Hashable
+    method: str
+    kwargs: dict = field(default_factory=dict)
+    on_success: Optional[Callable[[Any], None]] = None
+
+
+@dataclass
+class WorkflowReport:
+    """
+    Outcome of a workflow, per item.
+    :param succeeded: key -> result of the item
+    :param failed: key -> the exception raised for the item
+    """
+
+    succeeded: dict = field(default_factory=dict)
+    failed: dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def fail(self, key: Hashable, error: Exception):
+        logger.error(f"Canvas workflow item {key} failed: {error}")
+        self.succeeded.pop(key, None)
+        self.failed[key] = error
+
+    def merge(self, other: "WorkflowReport"):
+        for key, result in other.succeeded.items():
+            if key not in self.failed:
+                self.succeeded[key] = result
+        for key, error in other.failed.items():
+            self.fail(key, error)
+
+
+class CanvasWorkflowExecutor:
+    """
+    Runs batches of Canvas API calls concurrently.
+
+    Basic use:
+        executor = CanvasWorkflowExecutor(canvas, max_concurrency=8)
+        report = executor.run(
+            [CanvasTask(key=s.id, method="create_enrollment", kwargs={...}, on_success=...) for s in sections],
+            session=session,
+        )
+        print(report.failed)
+
+    :param canvas: A Propus Canvas object.
+    :param max_concurrency: Maximum number of Canvas calls in flight at once
+    :param min_interval: Minimum number of seconds between the start of two Canvas calls
+    :param max_retries: How many times a call throttled by Canvas is retried before it is reported as failed
+    :param retry_wait: Seconds all workers pause after a throttled call, doubled on every retry of that call
+    :param commit_batch_size: Number of successful on_success callbacks after which the session is committed
+    """
+
+    def __init__(
+        self,
+        canvas: Canvas,
+        max_concurrency: int = 8,
+        min_interval: float = 0.05,
+        max_retries: int = 3,
+        retry_wait: float = 2,
+        commit_batch_size: int = 100,
+    ):
+        self.canvas = canvas
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.retry_wait = retry_wait
+        self.commit_batch_size = commit_batch_size
+
+        self._pace_lock = threading.Lock()
+        self._next_slot = 0.0
+        self._local = threading.local()
+        self._loops = []
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        loop = getattr(self._local, "loop", None)
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._local.loop = loop
+            with self._pace_lock:
+                self._loops.append(loop)
+        return loop
+
+    def _wait_for_slot(self):
+        with self._pace_lock:
+            now = monotonic()
+            wait = max(0.0, self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + self.min_interval
+        if wait:
+            sleep(wait)
+
+    def _back_off(self, seconds: float):
+        # Pause every worker, not only the throttled one, since the rate limit is shared by the whole token
+        with self._pace_lock:
+            self._next_slot = max(self._next_slot, monotonic() + seconds)
+
+    def _call(self, task: CanvasTask):
+        loop = self._get_loop()
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot()
+            try:
+                return loop.run_until_complete(getattr(self.canvas, task.method)(**task.kwargs))
+            except Exception as error:
+                if not is_rate_limited(error) or attempt == self.max_retries:
+                    raise
+                wait = self.retry_wait * 2**attempt
+                logger.info(f"Canvas rate limit hit on {task.method} for {task.key}, backing off {wait} seconds")
+                self._back_off(wait)
+
+    def run(
+        self, tasks: Iterable[CanvasTask], session: Optional[Session] = None, keep_results: bool = True
+    ) -> WorkflowReport:
+        """
+        Run the Canvas calls concurrently and apply their on_success callbacks as they complete.
+        :param tasks: The CanvasTasks to run. They are consumed lazily, a few ahead of the workers, so a generator
+            of tasks is never held in memory all at once.
+        :param session: Session to commit the changes made by the on_success callbacks with, in batches of
+            commit_batch_size. If a batch fails to commit, or a callback fails, the batch is rolled back and every item
+            in it is reported as failed.
+        :param keep_results: Whether to keep the Canvas responses in the report. Streaming jobs, which handle the
+            responses in on_success, turn it off so memory does not grow with the number of tasks.
+        :return: WorkflowReport: The result (or the exception) of every task by its key. The result is None when
+            keep_results is off.
+        """
+        report = WorkflowReport()
+        pending_commit = []
+
+        def flush():
+            if not (session and pending_commit):
+                pending_commit.clear()
+                return
+            try:
+                session.commit()
+            except Exception as error:
+                session.rollback()
+                for key in pending_commit:
+                    report.fail(key, error)
+            pending_commit.clear()
+
+        def complete(task: CanvasTask, future: Future):
+            try:
+                result = future.result()
+            except Exception as error:
+                report.fail(task.key, error)
+                return
+            try:
+                if task.on_success:
+                    task.on_success(result)
+                    pending_commit.append(task.key)
+                report.succeeded[task.key] = result if keep_results else None
+            except Exception as error:
+                report.fail(task.key, error)
+                if session:
+                    # The uncommitted changes of the batch are lost with the rollback, so are its items
+                    session.rollback()
+                    for key in pending_commit:
+                        report.fail(key, error)
+                    pending_commit.clear()
+                return
+            if len(pending_commit) >= self.commit_batch_size:
+                flush()
+
+        tasks = iter(tasks)
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+
+            def submit():
+                for task in islice(tasks, 2 * self.max_concurrency - len(in_flight)):
+                    in_flight[pool.submit(self._call, task)] = task
+
+            submit()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    complete(in_flight.pop(future), future)
+                submit()
+            flush()
+
+        for loop in self._loops:
+            loop.close()
+        self._loops.clear()
+        self._local = threading.local()
+
+        logger.info(f"Canvas workflow finished: {len(report.succeeded)} succeeded, {len(report.failed)} failed")
+        return report
@@ -232,3 +232,16 @@ class NoCourseEnrollmentsFound(Exception):
 
     def __init__(self, ccc_id):
         super().__init__(f"No enrollments found for ccc_id: {ccc_id}")
+
+
+class SisImportFailed(Exception):
+    """Exception raised for a Canvas SIS import which failed or did not finish
+
+    Attributes:
+        sis_import_id: id of the SIS import
+        workflow_state: last known workflow state of the SIS import
+        reason: errors reported by Canvas or why we stopped waiting
+    """
+
+    def __init__(self, sis_import_id, workflow_state, reason):
+        super().__init__(f"SIS import {sis_import_id} ended in state {workflow_state}: {reason}")
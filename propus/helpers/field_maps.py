@@ -1,7 +1,68 @@
+import threading
+from functools import wraps
+from time import time
+
 from propus.helpers.sql_alchemy import create_field_map
 
+# Seconds a lookup map is reused before its table is read again
+FIELD_MAP_TTL = 3600
+
+# Kept at module level so the maps are shared by every session and thread of the process, e.g. across the students of
+# a batch. Keyed by (map type, database URL); each key has its own lock so a map is built once even when requested by
+# several threads at the same time.
+_field_map_cache = {}
+_field_map_cache_lock = threading.Lock()
+_field_map_build_locks = {}
+
+
+def _database_url(session):
+    try:
+        return session.get_bind().url.render_as_string(hide_password=True)
+    except Exception:
+        return None
+
+
+def cached_field_map(builder):
+    """Cache the lookup map returned by builder(session) for FIELD_MAP_TTL seconds, per map type and database URL.
+
+    Callers get a copy of the cached map, so changing it does not change the cache.
+    """
+
+    @wraps(builder)
+    def wrapper(session):
+        key = (builder.__name__, _database_url(session))
+        with _field_map_cache_lock:
+            build_lock = _field_map_build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            cached = _field_map_cache.get(key)
+            if cached is None or time() - cached[0] >= FIELD_MAP_TTL:
+                cached = (time(), builder(session))
+                _field_map_cache[key] = cached
+        return dict(cached[1])
+
+    return wrapper
+
+
+def invalidate_field_maps(map_type=None, session=None):
+    """Drop cached lookup maps, e.g. after adding a row to one of their tables.
+
+    Arguments:
+        map_type: Name of the map builder, e.g. "create_gender_map". Its Salesforce variant (create_gender_map_sf),
+            built from it, is dropped too. Defaults to every map.
+        session: SQL Alchemy Session; only the maps of its database are dropped. Defaults to every database.
+    """
+    database_url = _database_url(session) if session is not None else None
+    with _field_map_cache_lock:
+        for key in list(_field_map_cache):
+            if map_type and not key[0].startswith(map_type):
+                continue
+            if session is not None and key[1] != database_url:
+                continue
+            del _field_map_cache[key]
+
 
 # Map out string values to object ID for ingestion
+@cached_field_map
 def create_contact_method_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -18,6 +79,7 @@ def create_contact_method_map(session):
     return contact_method_map
 
 
+@cached_field_map
 def create_contact_method_map_sf(session):
     """Creates mapping of strings to ID fields.
 
@@ -37,6 +99,7 @@ def create_contact_method_map_sf(session):
     return contact_method_map
 
 
+@cached_field_map
 def create_contact_time_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -53,6 +116,7 @@ def create_contact_time_map(session):
     return contact_time_map
 
 
+@cached_field_map
 def create_ethnicity_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -69,6 +133,7 @@ def create_ethnicity_map(session):
     return ethnicity_map
 
 
+@cached_field_map
 def create_ethnicity_map_sf(session):
     """Creates mapping of strings to ID fields.
 
@@ -90,6 +155,7 @@ def create_ethnicity_map_sf(session):
     return ethnicity_map
 
 
+@cached_field_map
 def create_gender_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -107,6 +173,7 @@ def create_gender_map(session):
     return gender_map
 
 
+@cached_field_map
 def create_lead_source_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -122,6 +189,7 @@ def create_lead_source_map(session):
     return create_field_map(session, LeadSource, map_from="lead_source")
 
 
+@cached_field_map
 def create_learner_status_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -138,6 +206,7 @@ def create_learner_status_map(session):
     return learner_status_map
 
 
+@cached_field_map
 def create_program_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -153,6 +222,7 @@ def create_program_map(session):
     return create_field_map(session, Program, map_from="short_name")
 
 
+@cached_field_map
 def create_program_map_sf(session):
     """Creates mapping of strings to ID fields.
 
@@ -169,6 +239,49 @@ def create_program_map_sf(session):
     return {k: _program_map.get(v, None) for k, v in SF_PROGRAMS_OF_INTEREST_MAP.items()}
 
 
+@cached_field_map
+def create_program_version_signature_map(session):
+    """Creates mapping of program version signatures to program version ID fields.
+
+    A signature is the program short name and the frozenset of (course_code, version) of the program version's
+    courses, e.g. ("Data Analysis", frozenset({("BUS500", 3.0), ("BUS501", 3.0)})).
+
+    Arguments:
+        session: SQL Alchemy Session
+
+    Returns:
+        map_dict: Dictionary of signatures mapped to program version IDs.
+    """
+    from sqlalchemy import select
+
+    from propus.calbright_sql.course import Course
+    from propus.calbright_sql.course_version import CourseVersion
+    from propus.calbright_sql.program import Program
+    from propus.calbright_sql.program_version import ProgramVersion
+    from propus.calbright_sql.program_version_course import ProgramVersionCourse
+
+    rows = session.execute(
+        select(
+            Program.short_name, ProgramVersionCourse.program_version_id, Course.course_code, CourseVersion.version_id
+        )
+        .join(ProgramVersion, ProgramVersionCourse.program_version_id == ProgramVersion.id)
+        .join(Program, ProgramVersion.program_id == Program.id)
+        .join(CourseVersion, ProgramVersionCourse.course_version_id == CourseVersion.id)
+        .join(Course, CourseVersion.course_id == Course.id)
+        .execution_options(use_replica=True)
+    ).all()
+    program_version_courses = {}
+    for short_name, program_version_id, course_code, version_id in rows:
+        program_version_courses.setdefault((short_name, program_version_id), set()).add(
+            (course_code, float(version_id))
+        )
+    return {
+        (short_name, frozenset(courses)): program_version_id
+        for (short_name, program_version_id), courses in program_version_courses.items()
+    }
+
+
+@cached_field_map
 def create_pronoun_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -185,6 +298,7 @@ def create_pronoun_map(session):
     return pronoun_map
 
 
+@cached_field_map
 def create_pronoun_map_sf(session):
     """Creates mapping of strings to ID fields.
 
@@ -204,6 +318,7 @@ def create_pronoun_map_sf(session):
     return pronoun_map
 
 
+@cached_field_map
 def create_salutation_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -220,6 +335,7 @@ def create_salutation_map(session):
     return salutation_map
 
 
+@cached_field_map
 def create_suffix_map(session):
     """Creates mapping of strings to ID fields.
 
@@ -236,6 +352,7 @@ def create_suffix_map(session):
     return suffix_map
 
 
+@cached_field_map
 def create_suffix_map_sf(session):
     """Creates mapping of strings to ID fields.
 
@@ -1,13 +1,20 @@
 import enum
-from typing import Dict
-
-from sqlalchemy import inspect, select
-from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from decimal import Decimal
+from functools import lru_cache
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import JSON, Text, Uuid, cast, func, inspect, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.exc import NoResultFound
 
 from propus.helpers.input_validations import validate_uuid
 from propus.helpers.exceptions import MappingError, InvalidKeyList
+from propus.logging_utility import Logging
+
+logger = Logging.get_logger("propus/helpers/sql_alchemy")
 
 
 def _extract_model_params(defaults, **kwargs):
@@ -92,7 +99,7 @@ def update_or_create(session, model, defaults: Dict = None, **kwargs) -> (Dict,
     return obj, False
 
 
-def upsert_changes(session, model, object, defaults, **kwargs) -> (Dict, bool):
+def upsert_changes(session, model, object, defaults, flush: bool = True, **kwargs) -> (Dict, bool):
     """
     This function checks if values in the defaults dictionary are different from
     existing values in the object, and if so upserts the changes.
@@ -101,6 +108,9 @@ def upsert_changes(session, model, object, defaults, **kwargs) -> (Dict, bool):
         model: SQLAlchemy Model Object
         object: SQLAlchemy object instance to be checked / upserted
         defaults (Dict): This should a dictionary of data to be upserted.
+        flush (bool): When False and the object was loaded by the session, the changes are only set on the object and
+            written by the session's next flush / commit, together with other pending changes, instead of being
+            re-selected and flushed right away.
         kwargs: dictionary of items to attempt a match on (i.e. {"id": "1234", "ccc_id": "56784"})
 
     Returns:
@@ -111,13 +121,203 @@ def upsert_changes(session, model, object, defaults, **kwargs) -> (Dict, bool):
     upserted = False
     upserts = {k: v for k, v in defaults.items() if original_data.get(k) != v}
 
-    if upserts:
+    if upserts and not flush and inspect(object).persistent:
+        for k, v in upserts.items():
+            setattr(object, k, v)
+        session.add(object)
+        upserted = True
+    elif upserts:
         _, upserted = update_or_create(session, model, upserts, **kwargs)
         upserted = True
 
     return upserts, upserted
 
 
+# Rows per INSERT ... ON CONFLICT statement of bulk_upsert
+UPSERT_ROWS_PER_STATEMENT = 1000
+
+# Columns never overwritten by bulk_upsert when a row already exists
+UPSERT_IMMUTABLE_COLUMNS = ("id", "created_at")
+
+
+def get_conflict_columns(model, conflict_target: Union[str, List[str]]) -> List[str]:
+    """Columns of a conflict target: a list of columns, or the name of a unique constraint / index of the model"""
+    if not isinstance(conflict_target, str):
+        return list(conflict_target)
+    table = getattr(model, "__table__", model)
+    for constraint in list(table.constraints) + list(table.indexes):
+        if constraint.name == conflict_target:
+            return [column.key for column in constraint.columns]
+    raise ValueError(f"{conflict_target} is not a constraint or index of {table.name}")
+
+
+def bulk_upsert(
+    session,
+    model,
+    rows: Iterable[Dict],
+    conflict_target: Union[str, List[str]],
+    update_columns: List[str] = None,
+    skip_unchanged: bool = True,
+    chunk_size: int = UPSERT_ROWS_PER_STATEMENT,
+) -> Dict[str, int]:
+    """
+    Set-based version of update_or_create for many rows: rows are written with chunked PostgreSQL
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING statements instead of a savepoint, SELECT ... FOR UPDATE
+    and flush per row. Like update_or_create, the changes are not committed.
+
+    Args:
+        session: SQLAlchemy Session Connection
+        model: SQLAlchemy Model Object
+        rows (Iterable[Dict]): column -> value of each row. When several rows share a conflict key, the last one wins.
+        conflict_target (str or List[str]): name of a unique constraint / index, or list of columns with a unique
+            index, identifying existing rows (i.e. ["ccc_id"])
+        update_columns (List[str]): columns overwritten on existing rows. Defaults to every column of the rows,
+            except the conflict columns, id and created_at
+        skip_unchanged (bool): when True, existing rows whose update_columns already hold the new values are not
+            updated (no new row version, modified_at untouched)
+        chunk_size (int): rows per statement
+
+    Returns:
+        Dict: number of rows "inserted", "updated" and "unchanged"
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    for stmt, statement_rows in _upsert_statements(
+        model, rows, conflict_target, update_columns, skip_unchanged, chunk_size
+    ):
+        _count_upserted(counts, session.execute(stmt).all(), statement_rows)
+    return counts
+
+
+def _upsert_statements(model, rows, conflict_target, update_columns, skip_unchanged, chunk_size):
+    """INSERT ... ON CONFLICT statements of bulk_upsert, with the number of rows of each"""
+    table = model.__table__
+    conflict_columns = get_conflict_columns(model, conflict_target)
+
+    # Multi-row VALUES need the same columns in every row, and Postgres refuses to update a row twice in a statement
+    groups = {}
+    for row in rows:
+        group = groups.setdefault(tuple(sorted(row)), {})
+        key = tuple(row.get(column) for column in conflict_columns)
+        group.pop(key, None)
+        group[key] = row
+
+    for columns, group in groups.items():
+        group = list(group.values())
+        for i in range(0, len(group), chunk_size):
+            chunk = group[i:][:chunk_size]
+            stmt = on_conflict_update(
+                pg_insert(table).values(chunk), model, conflict_target, columns, update_columns, skip_unchanged
+            )
+            # xmax is 0 on a row version created by an insert, and set on one created by an update
+            yield stmt.returning(literal_column("xmax = 0").label("inserted")), len(chunk)
+
+
+def _count_upserted(counts: Dict[str, int], returned: List, statement_rows: int):
+    inserted = sum(1 for row in returned if row.inserted)
+    counts["inserted"] += inserted
+    counts["updated"] += len(returned) - inserted
+    counts["unchanged"] += statement_rows - len(returned)
+
+
+async def async_get_or_create(session, model, defaults: Dict = None, **kwargs) -> (Dict, bool):
+    """
+    Async version of get_or_create, for a SQLAlchemy AsyncSession (e.g. AsyncCalbright.session_factory()).
+
+    Args:
+        session: SQLAlchemy AsyncSession
+        model: SQLAlchemy Model Object
+        defaults (Dict): This should a dictionary of data to be inserted. Defaults to None for empty inserts
+        kwargs: dictionary of items to attempt a match on (i.e. {"id": "1234", "ccc_id": "56784"})
+
+    Returns:
+        Dict: SQLAlchemy of the object that was found or created
+        Boolean: True if item was created, False if it already existed
+    """
+    try:
+        return (await session.execute(select(model).filter_by(**kwargs))).scalars().one(), False
+    except NoResultFound:
+        obj = model(**_extract_model_params(defaults, **kwargs))
+        session.add(obj)
+        try:
+            async with session.begin_nested():
+                await session.flush()
+        except IntegrityError:
+            # Created concurrently: the savepoint is rolled back (expunging obj), the rest of the transaction is kept
+            return (await session.execute(select(model).filter_by(**kwargs))).scalars().one(), False
+        return obj, True
+
+
+async def async_bulk_upsert(
+    session,
+    model,
+    rows: Iterable[Dict],
+    conflict_target: Union[str, List[str]],
+    update_columns: List[str] = None,
+    skip_unchanged: bool = True,
+    chunk_size: int = UPSERT_ROWS_PER_STATEMENT,
+) -> Dict[str, int]:
+    """
+    Async version of bulk_upsert, for a SQLAlchemy AsyncSession. The changes are not committed.
+
+    Returns:
+        Dict: number of rows "inserted", "updated" and "unchanged"
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    for stmt, statement_rows in _upsert_statements(
+        model, rows, conflict_target, update_columns, skip_unchanged, chunk_size
+    ):
+        _count_upserted(counts, (await session.execute(stmt)).all(), statement_rows)
+    return counts
+
+
+def _distinct_from(current, new):
+    # json has no equality operator in PostgreSQL, its values are compared as text
+    if isinstance(current.type, JSON) and not isinstance(current.type, JSONB):
+        return cast(current, Text).is_distinct_from(cast(new, Text))
+    return current.is_distinct_from(new)
+
+
+def on_conflict_update(
+    stmt,
+    model,
+    conflict_target: Union[str, List[str]],
+    columns: List[str],
+    update_columns: List[str] = None,
+    skip_unchanged: bool = True,
+):
+    """
+    Add the ON CONFLICT DO UPDATE clause of bulk_upsert to a PostgreSQL insert statement.
+
+    Args:
+        stmt: sqlalchemy.dialects.postgresql.insert statement of the model
+        model: SQLAlchemy Model Object or Table
+        conflict_target (str or List[str]): see bulk_upsert
+        columns (List[str]): columns inserted by the statement
+        update_columns (List[str]): see bulk_upsert
+        skip_unchanged (bool): see bulk_upsert
+
+    Returns:
+        The statement, doing nothing on conflict when there is no column to update
+    """
+    table = getattr(model, "__table__", model)
+    conflict_columns = get_conflict_columns(model, conflict_target)
+    conflict = (
+        {"constraint": conflict_target} if isinstance(conflict_target, str) else {"index_elements": conflict_columns}
+    )
+    updated = [
+        c
+        for c in (update_columns or columns)
+        if c in columns and c not in conflict_columns + list(UPSERT_IMMUTABLE_COLUMNS)
+    ]
+    if not updated:
+        return stmt.on_conflict_do_nothing(**conflict)
+    set_ = {c: stmt.excluded[c] for c in updated}
+    if "modified_at" in table.c and "modified_at" not in set_:
+        set_["modified_at"] = func.now()
+    where = or_(*[_distinct_from(table.c[c], stmt.excluded[c]) for c in updated]) if skip_unchanged else None
+    return stmt.on_conflict_do_update(set_=set_, where=where, **conflict)
+
+
 def build_query(table, fields, filters=None):
     """Builds a query string, e.g., SELECT fields FROM table WHERE FILTERS
 
@@ -159,6 +359,115 @@ def build_query(table, fields, filters=None):
     return qry
 
 
+# Keys resolved per query by the create_field_map* functions, well below PostgreSQL's limit of bind parameters
+KEYS_PER_QUERY = 10000
+
+
+@lru_cache(maxsize=None)
+def get_column_validators(model) -> Dict[str, Callable]:
+    """Validation functions of a model's columns, built once per model from its SQLAlchemy metadata.
+    Currently limited to UUID columns, as non-UUID values break the query of the whole key list.
+
+    Arguments:
+        model: SQL Alchemy model
+
+    Returns:
+        dict: column name -> validation function, raising on an invalid value
+    """
+    return {column.key: validate_uuid for column in model.__table__.columns if isinstance(column.type, Uuid)}
+
+
+def _column_normalizer(column) -> Optional[Callable]:
+    if isinstance(column.type, Uuid):
+        return lambda value: value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    if python_type is int:
+        return _to_int
+    if python_type in (float, Decimal, str):
+        return lambda value: value if isinstance(value, python_type) else python_type(value)
+    return None
+
+
+def _to_int(value) -> int:
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"{value} is not an integer")
+    return int(value)
+
+
+@lru_cache
+def get_column_normalizers(model) -> Dict[str, Callable]:
+    """Functions converting a value to the Python type a model's columns are returned as (e.g. "5" -> 5 for an INTEGER
+    column), so keys given with another type still match the rows of the database, like when Postgres casts them.
+    Built once per model, for UUID, integer, numeric and string columns.
+
+    Arguments:
+        model: SQL Alchemy model
+
+    Returns:
+        dict: column name -> normalization function, raising ValueError on a value of the wrong type
+    """
+    normalizers = {}
+    for column in model.__table__.columns:
+        normalizer = _column_normalizer(column)
+        if normalizer:
+            normalizers[column.key] = normalizer
+    return normalizers
+
+
+def _normalize_key(normalizers: Dict, fields: List[str], key):
+    # Keys are matched against the values returned by the database, e.g. a UUID string against a uuid.UUID
+    return tuple(
+        normalizers[field](value) if field in normalizers and value is not None else value
+        for field, value in zip(fields, key)
+    )
+
+
+def _valid_key(validators: Dict, fields: List[str], key) -> bool:
+    try:
+        for field, value in zip(fields, key):
+            if validators.get(field):
+                validators[field](value)
+    except Exception:
+        return False
+    return True
+
+
+def _select_by_keys(session, model, map_from: List[str], map_to: List[str], keys: List[tuple]):
+    """Yield the (*map_from, *map_to) rows of the model matching the composite keys, KEYS_PER_QUERY keys per query"""
+    from_columns = [getattr(model, field) for field in map_from]
+    to_columns = [getattr(model, field) for field in map_to]
+    target = from_columns[0] if len(from_columns) == 1 else tuple_(*from_columns)
+    for i in range(0, len(keys), KEYS_PER_QUERY):
+        chunk = keys[i:][:KEYS_PER_QUERY]
+        values = [key[0] for key in chunk] if len(from_columns) == 1 else chunk
+        yield from session.execute(select(*from_columns, *to_columns).where(target.in_(values))).all()
+
+
+def _resolve_keys(session, model, map_from: List[str], map_to: List[str], key_list: List[tuple]) -> Dict:
+    """Resolve composite keys to the map_to values of their first matching row, in as few queries as possible"""
+    validators = get_column_validators(model)
+    normalizers = get_column_normalizers(model)
+    by_normalized = {}
+    for key in key_list:
+        if not _valid_key(validators, map_from, key):
+            continue
+        try:
+            normalized = _normalize_key(normalizers, map_from, key)
+        except (TypeError, ValueError, ArithmeticError):
+            continue
+        by_normalized.setdefault(normalized, []).append(key)
+
+    resolved = {}
+    n = len(map_from)
+    for row in _select_by_keys(session, model, map_from, map_to, list(by_normalized)):
+        for key in by_normalized.get(_normalize_key(normalizers, map_from, tuple(row)[:n]), []):
+            resolved.setdefault(key, []).append(list(row)[n:])
+    return resolved
+
+
 def create_field_map(session, model, map_from="name", map_to="id", key_list=None, one_to_many=False):
     """
     Create a mapping from one field to another in a one-to-many relationship.
@@ -168,6 +477,10 @@ def create_field_map(session, model, map_from="name", map_to="id", key_list=None
     in the 'map_to' field. The mapping can be performed for a specific set of keys
     provided in 'key_list', or for all records if 'key_list' is not provided.
 
+    Keys are resolved with a single query, selecting only the two columns. Keys failing the
+    validation of their column (e.g. a non-UUID for a UUID column) or without a match map to
+    None ([] when one_to_many).
+
     Args:
         session (object): Database session object.
         model (class): SQLAlchemy model class.
@@ -201,59 +514,20 @@ def create_field_map(session, model, map_from="name", map_to="id", key_list=None
     mapping_multiple = create_field_map(session, MyModel, "field1", "field2", key_list, one_to_many=True)
     # 'mapping_multiple' will be a dictionary with keys from 'field1' and lists of 'field2' values
     """
-    map_dict = {}
-    query_pk = True
-    validation_function = get_validation_function_by_model_field(session, model, map_from)
     if not key_list:
-        for obj in session.execute(select(model)).scalars().all():
-            obj_dict = obj.__dict__
-            k = obj_dict.get(map_from, None)
+        map_dict = {}
+        for k, v in session.execute(select(getattr(model, map_from), getattr(model, map_to))).all():
             if one_to_many:
-                if k not in map_dict:
-                    map_dict[k] = []
-                map_dict[k].append(obj_dict.get(map_to, None))
+                map_dict.setdefault(k, []).append(v)
             else:
-                map_dict[k] = obj_dict.get(map_to, None)
-
+                map_dict[k] = v
         return map_dict
 
+    resolved = _resolve_keys(session, model, [map_from], [map_to], [(key,) for key in key_list])
+    map_dict = {}
     for key in key_list:
-        if not validation_function or validation_function(key) is None:
-            filters = {map_from: key}
-            if query_pk:
-                try:
-                    instance = session.execute(select(model).filter_by(**filters).limit(1)).scalars().first()
-                except Exception:
-                    query_pk = False
-
-            if not query_pk:
-                try:
-                    if one_to_many:
-                        instance = session.execute(select(model).filter_by(**filters)).scalars().all()
-                    else:
-                        instance = session.execute(select(model).filter_by(**filters).limit(1)).scalars().first()
-                except Exception:
-                    instance = {map_to: None}
-
-            if isinstance(instance, model):
-                map_dict[key] = instance.__dict__.get(map_to)
-            elif isinstance(instance, dict):
-                map_dict[key] = instance.get(map_to)
-            elif isinstance(instance, list):
-                for obj in instance:
-                    if isinstance(obj, model):
-                        map_dict[key] = map_dict[key] if key in map_dict else []
-                        map_dict[key].append(obj.__dict__.get(map_to))
-                    elif isinstance(obj, dict):
-                        map_dict[key] = map_dict[key] if key in map_dict else []
-                        map_dict[key].append(obj.get(map_to))
-                    else:
-                        raise Exception(f"Error mapping key {key}. Unable to map instance ({obj})")
-            else:
-                raise Exception(f"Error mapping key {key}. Unable to map instance ({instance})")
-        else:
-            map_dict[key] = [] if one_to_many else None
-
+        values = [row[0] for row in resolved.get((key,), [])]
+        map_dict[key] = values if one_to_many else (values[0] if values else None)
     return map_dict
 
 
@@ -306,66 +580,36 @@ def create_field_map_many_to_many(session, model, map_from=["name"], map_to=["id
         ('Industry Training an...Experience', 400737): ['WF', 550]
     }
     """
-    values_dict = {}
-    query_pk = True
-
     if not key_list:
         # If key_list is not provided, retrieve values for all records
-        for obj in session.scalars(select(model)).all():
-            obj_dict = obj.__dict__
-            k = tuple(obj_dict.get(field, None) for field in map_from)
-            values_dict[k] = [obj_dict.get(field, None) for field in map_to]
-
+        values_dict = {}
+        columns = [getattr(model, field) for field in map_from + map_to]
+        n = len(map_from)
+        for row in session.execute(select(*columns)).all():
+            row = list(row)
+            values_dict[tuple(row[:n])] = row[n:]
         return values_dict
 
-    # Fetch validation functions for each column
-    validation_functions = [
-        get_validation_function_by_model_field(session, model, column_name) for column_name in map_from
-    ]
-
-    # Validate keys using validation functions
+    validators = get_column_validators(model)
     for composite_key in key_list:
-        try:
-            # Iterate over each key in the composite key and apply corresponding validation functions,
-            # validation functions raise an exception on failure and return None if valid
-            [
-                validation_function(key)
-                for key, validation_function in zip(composite_key, validation_functions)
-                if validation_function
-            ]
-        except Exception:
+        if not _valid_key(validators, map_from, composite_key):
             raise InvalidKeyList(composite_key)
 
-    for composite_key in key_list:
-        filters = {col: val for col, val in zip(map_from, composite_key)}
-        if query_pk:
-            try:
-                instance = session.execute(select(model).filter_by(**filters).limit(1)).scalars().first()
-            except Exception:
-                query_pk = False
-
-        if not query_pk:
-            try:
-                instance = session.execute(select(model).filter_by(**filters).limit(1)).scalars().first()
-            except Exception:
-                instance = {field: None for field in map_to}
-
-        if isinstance(instance, model):
-            values_dict[composite_key] = [instance.__dict__.get(field, None) for field in map_to]
-        elif isinstance(instance, dict):
-            values_dict[composite_key] = [instance.get(field, None) for field in map_to]
-
-    return values_dict
+    # All keys are resolved with a single query; keys without a match are left out
+    resolved = _resolve_keys(session, model, map_from, map_to, [tuple(k) for k in key_list])
+    return {
+        composite_key: resolved[tuple(composite_key)][0]
+        for composite_key in key_list
+        if tuple(composite_key) in resolved
+    }
 
 
 def get_validation_function_by_model_field(session, model, field):
     """Return the validation function appropriate for a specified
-    model and field. Currently limited to UUID fields because
-    non-UUID values were breaking create_field_map when querying
-    the db.
+    model and field, see get_column_validators.
 
     Arguments:
-        session: SQL Alchemy Session
+        session: SQL Alchemy Session, kept for compatibility; the validators come from the model's metadata
         model: SQL Alchemy model to build the map from
         field: name of the column / attribute to be validated
 
@@ -373,15 +617,7 @@ def get_validation_function_by_model_field(session, model, field):
         validation_function: Function appropriate for checking
         data prior to ingestion / querying into the model's field.
     """
-    engine = session.get_bind()
-    insp = inspect(engine)
-    table_name = model.__table__.name
-    columns_dict = {c["name"]: c["type"] for c in insp.get_columns(table_name)}
-    column_type = columns_dict.get(field)
-    if isinstance(column_type, UUID):
-        return validate_uuid
-    else:
-        return None
+    return get_column_validators(model).get(field)
 
 
 def map_value_to_foreign_key(
@@ -436,6 +672,9 @@ def create_field_map_from_composite_key(session, model, map_from=["name"], map_t
     values in the 'map_to' field. The mapping can be performed for a specific set of keys
     provided in 'key_list', or for all records if 'key_list' is not provided.
 
+    Keys are resolved with a single query. Keys failing the validation of their columns map
+    to None, keys without a match are left out.
+
     Args:
         session (object): Database session object.
         model (class): SQLAlchemy model class.
@@ -465,51 +704,35 @@ def create_field_map_from_composite_key(session, model, map_from=["name"], map_t
     mapping = create_field_map_from_composite_key(session, MyModel, ["field1", "field2"], "id", key_list)
 
     # 'mapping' will be a dictionary with composite keys as keys and corresponding 'id' values
-
     """
-    map_dict = {}
-    query_pk = True
-
     if not key_list:
-        for obj in session.scalars(select(model)).all():
-            obj_dict = obj.__dict__
-            k = obj_dict.get(map_from, None)
-            map_dict[k] = obj_dict.get(map_to, None)
-
+        map_dict = {}
+        from_fields = [map_from] if isinstance(map_from, str) else list(map_from)
+        columns = [getattr(model, field) for field in from_fields] + [getattr(model, map_to)]
+        for row in session.execute(select(*columns)).all():
+            row = list(row)
+            k = row[0] if isinstance(map_from, str) else tuple(row[:-1])
+            map_dict[k] = row[-1]
         return map_dict
 
+    validators = get_column_validators(model)
+    resolved = _resolve_keys(session, model, map_from, [map_to], [tuple(keys) for keys in key_list])
+    map_dict = {}
     for keys in key_list:
-        validation_function = get_validation_function_by_model_field(session, model, keys)
-        valid_key_list = False
-        if validation_function and (
-            all(get_validation_function_by_model_field(session, model, key) for key in keys) is None
-        ):
-            valid_key_list = True
-
-        if not validation_function or valid_key_list:
-            filters = {col: val for col, val in zip(map_from, keys)}
-            if query_pk:
-                try:
-                    instance = session.execute(select(model).filter_by(**filters).limit(1)).scalars().first()
-                except Exception:
-                    query_pk = False
-
-            if not query_pk:
-                try:
-                    instance = session.execute(select(model).filter_by(**filters).limit(1)).scalars().first()
-                except Exception:
-                    instance = {map_to: None}
-
-            if isinstance(instance, model):
-                map_dict[keys] = instance.__dict__.get(map_to)
-            elif isinstance(instance, dict):
-                map_dict[keys] = instance.get(map_to)
-        else:
+        if not _valid_key(validators, map_from, keys):
             map_dict[keys] = None
-
+        elif tuple(keys) in resolved:
+            map_dict[keys] = resolved[tuple(keys)][0][0]
     return map_dict
 
 
+def _nested_record(record, parent):
+    if parent:
+        for key in parent.split("."):
+            record = record.get(key, None)
+    return record
+
+
 def resolve_mappings(
     session,
     data,
@@ -522,11 +745,16 @@ def resolve_mappings(
     replace_old_key=True,
     is_required=False,
     parent=None,
+    timings=None,
 ):
     """
     Maps old_key in data to the new_key based on map_from, map_to values of
     the model class.
 
+    Runs in linear time: the distinct values of old_key are collected first, resolved with a
+    single query (see create_field_map), then applied in one pass building new lists of valid and
+    failed records. The duration of each step is logged.
+
     Args:
         session (object): Database session.
         data (list): List of dictionaries representing records.
@@ -535,24 +763,39 @@ def resolve_mappings(
         model (object): Database model for mapping.
         map_from (str): Field to map from.
         map_to (str, optional): Field to map to. Defaults to "id".
-        return_map (bool, optional): Whether to return the mapping. Defaults to False.
+        return_map (bool, optional): Whether to return the mapping of the values found in data. Defaults to False.
         replace_old_key (bool, optional): If False, retains 'old_key' in 'record'. Defaults to True.
         is_required (bool, optional): If True, raises an error for missing mappings. Defaults to False.
         parent (str, optional): Parent key if the record is nested in a dictionary. Defaults to None.
+        timings (dict, optional): When provided, the seconds spent collecting, resolving and applying
+            the mapping are added to it under new_key.
 
     Returns:
         list or tuple: Updated data with resolved mappings and optional
         mapping dictionary.
 
     """
-    map = create_field_map(session, model, map_from, map_to)
+    started = perf_counter()
+    keys = set()
+    for record in data:
+        try:
+            record = _nested_record(record, parent)
+            if old_key in record:
+                keys.add(record[old_key])
+        except Exception:
+            # Left to the apply step, which reports the record as failed
+            pass
+    collected = perf_counter()
+
+    map = create_field_map(session, model, map_from, map_to, key_list=list(keys)) if keys else {}
+    resolved = perf_counter()
+
+    valid_records = []
     failed_records = []
     for record in data:
         current_record = record
-        if parent:
-            for key in parent.split("."):
-                record = record.get(key, None)
         try:
+            record = _nested_record(record, parent)
             if old_key in record:
                 if replace_old_key:
                     value = record.pop(old_key)
@@ -562,28 +805,41 @@ def resolve_mappings(
                 if is_required and id is None:
                     raise MappingError(old_key, value, model.__tablename__)
                 record[new_key] = id
+            if parent and new_key in record:
+                current_record[new_key] = record[new_key]
         except Exception as e:
             failed_records.append({"record": current_record, "error": str(e)})
-        if parent and new_key in record:
-            current_record[new_key] = record[new_key]
-            record = current_record
-    for record in failed_records:
-        data.remove(record.get("record"))
+        else:
+            valid_records.append(current_record)
+    applied = perf_counter()
+
+    steps = {"collect": collected - started, "resolve": resolved - collected, "apply": applied - resolved}
+    if timings is not None:
+        timings[new_key] = steps
+    logger.info(
+        f"Mapped {old_key} to {new_key} for {len(data)} records ({len(keys)} distinct, {len(failed_records)} failed): "
+        + ", ".join(f"{step} {seconds:.3f}s" for step, seconds in steps.items())
+    )
     if return_map:
-        return data, failed_records, map
+        return valid_records, failed_records, map
     else:
-        return data, failed_records
+        return valid_records, failed_records
 
 
-def apply_mappings(session, data, mappings):
+def apply_mappings(session, data, mappings, timings=None):
     """
     Applies mappings to incoming data. These old_key in data to the new_key
     based on map_from, map_to values of the model class.
 
+    Each mapping is resolved once for the whole batch, and records failing a mapping are
+    not passed to the next ones (see resolve_mappings).
+
     Args:
         session (object): Database session.
         data (list): List of dictionaries representing records.
         mappings (list): List of dictionaries containing mapping details.
+        timings (dict, optional): When provided, filled with the duration of each step of each
+            mapping, see resolve_mappings.
 
     Example:
         data = {"cfg_Learner_Status__c": "Expressed Interest"}
@@ -608,19 +864,34 @@ def apply_mappings(session, data, mappings):
     """
     maps = {}
     failed_records = []
+    valid_data = data
     for mapping in mappings:
         if mapping.get("return_map"):
-            valid_data, failed_batch, map = resolve_mappings(session, data, **mapping)
+            valid_data, failed_batch, map = resolve_mappings(session, valid_data, timings=timings, **mapping)
             maps[mapping["new_key"]] = map
         else:
-            valid_data, failed_batch = resolve_mappings(session, data, **mapping)
+            valid_data, failed_batch = resolve_mappings(session, valid_data, timings=timings, **mapping)
         failed_records.extend(failed_batch)
     return valid_data, failed_records, maps
 
 
+def _normalize_enum_value(value) -> str:
+    return str(value).strip().lower()
+
+
+@lru_cache(maxsize=None)
+def _enum_index(enum: enum) -> Dict:
+    # Built once per enum: normalized value -> member, the first member winning like the previous linear scan
+    index = {}
+    for key, member in enum._value2member_map_.items():
+        index.setdefault(_normalize_enum_value(key), member)
+    return index
+
+
 def find_enum_value(enum: enum, value: str):
     """
     Fetches the enum ID from the supplied enum based on the provided value.
+    The match ignores case and surrounding whitespace, and is a dictionary lookup.
 
     Args:
         value (str): The lead source data to be converted to an enum ID.
@@ -631,7 +902,4 @@ def find_enum_value(enum: enum, value: str):
     """
     if not value:
         return None
-    for key, enum in enum._value2member_map_.items():
-        if key.lower() == value.lower():
-            return enum
-    return None
+    return _enum_index(enum).get(_normalize_enum_value(value))
@@ -1,8 +1,10 @@
-from sqlalchemy import func
+from sqlalchemy import and_, exists, func, insert, select
+from sqlalchemy.orm import aliased
 from propus.calbright_sql.course import Course
 from propus.calbright_sql.course_version import CourseVersion
 from propus.calbright_sql.course_version_section import CourseVersionSection
 from propus.calbright_sql.enrollment import LMS
+from propus.calbright_sql.instructor_course import InstructorCourse
 from propus.calbright_sql.program_version_course import ProgramVersionCourse
 
 from propus.logging_utility import Logging
@@ -10,16 +12,65 @@ from propus.logging_utility import Logging
 logger = Logging.get_logger("propus/helpers/sql_calbright/course_version_sections.py", debug=True)
 
 
+def get_missing_course_version_sections(session):
+    """
+    Get the (program_version_course, instructor) pairs which should have a course_version_section but do not, with a
+    single query.
+    - The desired sections are the Canvas course_versions' program_version_courses crossed with the Canvas
+      instructors of their course
+    - They are diffed against the existing sections with an anti-join: a course_version already having a section for
+      the instructor, through any of its program_version_courses, is skipped
+    :param session: A Calbright database session
+    :return: list: (program_version_course_id, course_version_id, instructor_id, course_code) rows
+    """
+    section_program_version_course = aliased(ProgramVersionCourse)
+    existing_section = (
+        select(CourseVersionSection.id)
+        .join(
+            section_program_version_course,
+            CourseVersionSection.program_version_course_id == section_program_version_course.id,
+        )
+        .where(
+            section_program_version_course.course_version_id == CourseVersion.id,
+            CourseVersionSection.instructor_id == InstructorCourse.instructor_id,
+        )
+    )
+    return session.execute(
+        select(
+            ProgramVersionCourse.id,
+            CourseVersion.id,
+            InstructorCourse.instructor_id,
+            Course.course_code,
+        )
+        .join(CourseVersion, ProgramVersionCourse.course_version_id == CourseVersion.id)
+        .join(Course, CourseVersion.course_id == Course.id)
+        .join(
+            InstructorCourse,
+            and_(InstructorCourse.course_id == Course.id, InstructorCourse.canvas_instructor.is_(True)),
+        )
+        .where(CourseVersion.lms == LMS("Canvas"), ~exists(existing_section))
+        .order_by(Course.course_code, CourseVersion.id, ProgramVersionCourse.id, InstructorCourse.instructor_id)
+    ).all()
+
+
 def create_course_version_section_records(session):
     """
     This function will create course_version_section records for each instructor associated with a course_version
     - This will only create sections for course_versions that are associated with the LMS "Canvas"
     - The section name will be the course_code and the section_id, e.g. "BUS500-1"
     - The section_id will increment for each new section created for a course_code, e.g. BUS500-2, BUS500-3, etc.
+    - The missing sections are found with one query (see get_missing_course_version_sections) and inserted with one
+      statement. Their Canvas sections are created afterwards, in a batch, by
+      propus.helpers.canvas.create_course_sections_concurrently
     :param session:
     :return: bool: True if sections were created, False if no sections were created
     """
     logger.info("Creating course version sections...")
+    missing_sections = get_missing_course_version_sections(session)
+    if not missing_sections:
+        logger.info("No course version sections to create")
+        return False
+
     # Get the max section_id for each course_code, we will use this to increment the section_id for each new section
     max_section_id_by_course = (
         session.query(Course.course_code, func.max(CourseVersionSection.section_id).label("max_section_id"))
@@ -31,54 +82,25 @@ def create_course_version_section_records(session):
     )
     course_section_ids = {result.course_code: int(result.max_section_id) for result in max_section_id_by_course}
 
-    # Get all course_versions that are associated with Canvas, go through each course and check the instructors
-    # associated with the course, if a course_version_section does not exist for the instructor, create one
-    sections_created = False
-    course_versions = session.query(CourseVersion).filter(CourseVersion.lms == "canvas").all()
-    for course_version in course_versions:
-        logger.debug(f"course_version: {course_version}")
-        program_version_courses = course_version.course_program_version
-        logger.debug(f"program_version_courses: {program_version_courses}")
-        for program_version_course in program_version_courses:
-            course_code = program_version_course.course_version.course.course_code
-            logger.debug(f"Instructor course: {course_version.course.course_instructor}")
-            for instructor_course in course_version.course.course_instructor:
-                # TODO: This is what I did to skip instructors who aren't set as Canvas instructors... Review?
-                if not instructor_course.canvas_instructor:
-                    logger.debug(f"Skipping instructor {instructor_course.instructor}")
-                    continue
-                instructor = instructor_course.instructor
-                course_version_section = (
-                    session.query(CourseVersionSection)
-                    .join(
-                        ProgramVersionCourse, CourseVersionSection.program_version_course_id == ProgramVersionCourse.id
-                    )
-                    .filter(
-                        ProgramVersionCourse.course_version_id == course_version.id,
-                        CourseVersionSection.instructor_id == instructor.id,
-                    )
-                    .first()
-                )
-                if not course_version_section:
-                    logger.debug(
-                        f"creating section for course_version: {course_version.id} and instructor: {instructor.id}"
-                    )
-                    course_section_id = course_section_ids[course_code] = course_section_ids.get(course_code, 0) + 1
-                    course_version_section = CourseVersionSection(
-                        program_version_course_id=program_version_course.id,
-                        instructor_id=instructor.id,
-                        lms=LMS("Canvas"),
-                        section_id=course_section_id,
-                        section_name=f"{course_code}-{course_section_id}",
-                    )
-                    session.add(course_version_section)
-                    sections_created = True
-
-                else:
-                    logger.debug(
-                        f"course version section found for {course_version.id} and {instructor.id}, skipping..."
-                    )
-                    continue
+    sections = []
+    created_pairs = set()
+    for program_version_course_id, course_version_id, instructor_id, course_code in missing_sections:
+        # One section per course_version and instructor, on the first of the course_version's program_version_courses
+        if (course_version_id, instructor_id) in created_pairs:
+            continue
+        created_pairs.add((course_version_id, instructor_id))
+        course_section_id = course_section_ids[course_code] = course_section_ids.get(course_code, 0) + 1
+        sections.append(
+            {
+                "program_version_course_id": program_version_course_id,
+                "instructor_id": instructor_id,
+                "lms": LMS("Canvas"),
+                "section_id": course_section_id,
+                "section_name": f"{course_code}-{course_section_id}",
+            }
+        )
 
+    session.execute(insert(CourseVersionSection), sections)
     session.commit()
-    return sections_created
+    logger.info(f"Created {len(sections)} course version sections")
+    return True
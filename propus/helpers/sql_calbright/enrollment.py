@@ -1,9 +1,11 @@
+import heapq
 from datetime import timedelta
 from dateutil.parser import parse as parse_date
-from sqlalchemy import and_, select, or_, func
+from sqlalchemy import and_, select, or_, func, update
 from zoneinfo import ZoneInfo
 
 from propus.helpers.calbright import PROGRAM_TO_COURSE_VERSION_MAP, CURRENT_COURSE_VERSION_MAP
+from propus.helpers.field_maps import create_program_version_signature_map
 from propus.helpers.sql_alchemy import update_or_create
 
 from propus.calbright_sql.course import Course
@@ -12,15 +14,20 @@ from propus.calbright_sql.course_version_section import CourseVersionSection
 from propus.calbright_sql.enrollment import Enrollment, LMS
 from propus.calbright_sql.enrollment_course_term import EnrollmentCourseTerm
 from propus.calbright_sql.enrollment_status import EnrollmentStatus
+from propus.calbright_sql.instructor_course import InstructorCourse
 from propus.calbright_sql.program import Program
 from propus.calbright_sql.program_version import ProgramVersion
 from propus.calbright_sql.program_version_course import ProgramVersionCourse
 from propus.calbright_sql.term import Term
+from propus.helpers.sql_calbright.term_calendar import TermCalendar
 
 from propus.logging_utility import Logging
 
 logger = Logging.get_logger("propus/helpers/sql_calbright/enrollment.py", debug=True)
 
+# Key of the PostgreSQL advisory lock serializing section assignments, so concurrent runs never read the same loads
+SECTION_ASSIGNMENT_LOCK_KEY = 4501
+
 
 class NoMatchingProgramVersion(Exception):
     pass
@@ -56,8 +63,10 @@ def fetch_program_version_by_course_versions(session, program_name: str, program
 
     This function queries the database to find the program version that
     contains the given courses. It first maps the course codes and versions
-    from the program version string. Then it builds a SQL query with AND
-    statements to filter on each course version.
+    from the program version string. The program version whose courses are
+    exactly these course versions is looked up in the cached program version
+    signature map (see create_program_version_signature_map); if there is none,
+    it builds a SQL query with AND statements to filter on each course version.
 
     Args:
         session (SQLAlchemy Session): Database Session
@@ -81,8 +90,13 @@ def fetch_program_version_by_course_versions(session, program_name: str, program
                 return {k.split(" - v")[0]: k.split(" - v")[1] for k in course_list if len(k.split(" - v")) >= 2}
         return PROGRAM_TO_COURSE_VERSION_MAP.get(program, {})
 
-    and_stmts = []
     course_version_map = fetch_course_versions_for_program(program_name, program_version)
+    signature = frozenset((course_code, float(version_id)) for course_code, version_id in course_version_map.items())
+    program_version_id = create_program_version_signature_map(session).get((program_name, signature))
+    if program_version_id:
+        return program_version_id
+
+    and_stmts = []
     for course_code, version_id in course_version_map.items():
         and_stmts.append(
             and_(
@@ -97,6 +111,7 @@ def fetch_program_version_by_course_versions(session, program_name: str, program
         .outerjoin(CourseVersion)
         .join(Course)
         .where(or_(*and_stmts), Program.short_name == program_name)
+        .execution_options(use_replica=True)
     )
     program_version_ids = session.scalars(stmt).unique().all()
     if program_version_ids:
@@ -126,6 +141,7 @@ def check_enrollment_before_upsert(enrollment, new_data):
     """
 
     if new_data.get("enrollment_status").status not in ["Started", "Enrolled"]:
+        enrollment.load_profile("enrollment-with-courses")
         term_to_grades = {}
         for course_term in enrollment.enrollment_enrollment_course_term:
             if not course_term.grade:
@@ -144,7 +160,7 @@ def check_enrollment_before_upsert(enrollment, new_data):
                 )
 
 
-def upsert_enrollment(session, user, enrollment_data: dict):
+def upsert_enrollment(session, user, enrollment_data: dict, term_calendar: TermCalendar = None):
     """
     Upsert an enrollment record.
     This function checks if an enrollment record already exists for the given user
@@ -156,11 +172,13 @@ def upsert_enrollment(session, user, enrollment_data: dict):
         session: The database session.
         user: The user object.
         enrollment_data: A dictionary containing enrollment data.
+        term_calendar: Optional TermCalendar, e.g. Calbright.term_calendar(), to find the first term without a query.
 
     Raises:
         MultipleInProgressEnrollments: If the user already has an active enrollment.
         NoMatchingFirstTerm: If no matching term is found for the enrollment date.
     """
+    user.load_profile("user-with-enrollments")
     existing_enrollment = None
     active_enrollment = False
     for enrollment in user.student.enrollment_student:
@@ -196,14 +214,21 @@ def upsert_enrollment(session, user, enrollment_data: dict):
 
     if active_enrollment:
         raise MultipleInProgressEnrollments(f"Multiple In Progress Enrollments for student {user.student.ccc_id}")
-    first_term = session.scalars(
-        select(Term).filter(Term.start_date >= enrollment_data.get("enrollment_date")).order_by(Term.start_date)
-    ).first()
+    if term_calendar is not None:
+        first_term = term_calendar.first_term_on_or_after(enrollment_data.get("enrollment_date"))
+    else:
+        first_term = session.scalars(
+            select(Term).filter(Term.start_date >= enrollment_data.get("enrollment_date")).order_by(Term.start_date)
+        ).first()
     if not first_term:
         raise NoMatchingFirstTerm(
             f"No Matching Term for enrollment of  {enrollment_data.get('enrollment_date')} - {user.student.ccc_id}"
         )
-    enrollment_data["first_term"] = first_term
+    if term_calendar is not None:
+        # Calendar terms are shared rows, not objects of this session
+        enrollment_data["first_term_id"] = first_term.id
+    else:
+        enrollment_data["first_term"] = first_term
     enrollment = Enrollment(**enrollment_data)
     session.add(enrollment)
     return enrollment
@@ -243,9 +268,9 @@ def fetch_course_version(session, course: Course, sf_course_versions: str = None
         course_version_list = [c for c in sf_course_versions.split(", ") if course.course_code in c].pop()
         course_version = course_version_list.split(" - v")[1]
     cv = session.scalars(
-        select(CourseVersion).filter(
-            CourseVersion.course_id == course.id, CourseVersion.version_id == float(course_version)
-        )
+        select(CourseVersion)
+        .filter(CourseVersion.course_id == course.id, CourseVersion.version_id == float(course_version))
+        .execution_options(use_replica=True)
     ).first()
     if not cv:
         raise MissingCourseVersion(
@@ -279,10 +304,13 @@ def fetch_matching_enrollment(user, term_start_date: str, grade_id: str, course_
     Raises:
         MissingEnrollment: If no matching enrollment is found.
     """
+    user.load_profile("user-with-enrollments")
     enrollments = user.student.enrollment_student
     if not enrollments:
         raise MissingEnrollment(f"EnrollmentNotFound: {user.student.ccc_id} - GradeId: {grade_id}")
 
+    CourseVersion.eager_load(course_versions, "course-version-with-program-versions")
+
     matching_programs = set(
         [cpv.program_version.program_id for i in course_versions for cpv in i.course_program_version]
     )
@@ -350,6 +378,7 @@ def get_instructors_to_assign(session):
         session.query(ProgramVersionCourse)
         .join(CourseVersion, ProgramVersionCourse.course_version_id == CourseVersion.id)
         .filter(CourseVersion.lms == LMS("Canvas"))
+        .options(*ProgramVersionCourse.loader_options("program-version-course-with-instructors"))
         .all()
     )
     section_to_assign_for_each_program_version_course = {}
@@ -395,6 +424,7 @@ def assign_enrollment_course_term_sections(
     logger.debug(f"Assigning sections to enrollment_course_term_list: {enrollment_course_term_list}")
     assigned_sections = False
     sections_to_assign = get_instructors_to_assign(session=session)
+    EnrollmentCourseTerm.eager_load(enrollment_course_term_list, "enrollment-course-term-with-program")
     # TODO: Need to add logic to also assign the instructor to ALL courses if possible.
     #    E.g. - if the instructor is assigned to BUS501, then they should also be assigned to BUS502
     #    Right now it is assigning to the instructor with the lowest enrollment, but that could be different by course.
@@ -422,3 +452,97 @@ def assign_enrollment_course_term_sections(
         session.commit()
 
     return assigned_sections
+
+
+def _pop_least_loaded(heap, instructor_loads):
+    """Pop the section of the least loaded instructor, refreshing entries whose load changed since they were pushed"""
+    while heap:
+        load, instructor_key, section_id, instructor_id = heapq.heappop(heap)
+        if load == instructor_loads.get(instructor_id, 0):
+            return section_id, instructor_id
+        heapq.heappush(heap, (instructor_loads.get(instructor_id, 0), instructor_key, section_id, instructor_id))
+    return None, None
+
+
+def assign_sections_batch(session, enrollment_course_term_list: list[EnrollmentCourseTerm], commit=True):
+    """
+    Batch version of assign_enrollment_course_term_sections, for a whole cohort of enrollment course terms.
+    - The instructor loads are read once, under an advisory lock held until the end of the transaction, so
+      concurrent runs assign one after the other from up to date loads
+    - The Canvas sections of the cohort's program version courses are loaded with a single query and kept in a
+      min-heap (by instructor load) per program version course
+    - Each enrollment course term gets the section of the least loaded instructor, the instructor's load being
+      increased right away for the next assignments
+    - The assignments are written with one bulk update
+    :param session: A Calbright database session
+    :param enrollment_course_term_list: EnrollmentCourseTerm objects, of any number of students
+    :param commit: Whether to commit the transaction, releasing the lock
+    :return: dict: EnrollmentCourseTerm ID to the assigned CourseVersionSection ID
+    """
+    session.execute(select(func.pg_advisory_xact_lock(SECTION_ASSIGNMENT_LOCK_KEY)))
+    instructor_loads = get_instructor_loads(session=session)
+
+    EnrollmentCourseTerm.eager_load(enrollment_course_term_list, "enrollment-course-term-with-program")
+    to_assign = {}
+    for enrollment_course_term in enrollment_course_term_list:
+        if enrollment_course_term.course_version_section_id or enrollment_course_term.course_version_section:
+            continue
+        for program_course_version in enrollment_course_term.enrollment.program_version.program_course_version:
+            if program_course_version.course_version_id == enrollment_course_term.course_version_id:
+                to_assign[enrollment_course_term] = program_course_version.id
+                break
+        else:
+            logger.error(f"No program version course found for {enrollment_course_term}, skipping...")
+
+    heaps = {}
+    if to_assign:
+        sections = session.execute(
+            select(
+                CourseVersionSection.id,
+                CourseVersionSection.program_version_course_id,
+                CourseVersionSection.instructor_id,
+            )
+            .join(ProgramVersionCourse, CourseVersionSection.program_version_course_id == ProgramVersionCourse.id)
+            .join(CourseVersion, ProgramVersionCourse.course_version_id == CourseVersion.id)
+            .join(
+                InstructorCourse,
+                and_(
+                    InstructorCourse.course_id == CourseVersion.course_id,
+                    InstructorCourse.instructor_id == CourseVersionSection.instructor_id,
+                ),
+            )
+            .where(
+                CourseVersion.lms == LMS("Canvas"),
+                CourseVersionSection.program_version_course_id.in_(set(to_assign.values())),
+            )
+        ).all()
+        for section_id, program_version_course_id, instructor_id in sections:
+            load = instructor_loads.get(instructor_id, 0)
+            heapq.heappush(
+                heaps.setdefault(program_version_course_id, []), (load, str(instructor_id), section_id, instructor_id)
+            )
+
+    assignments = {}
+    counted = set()
+    for enrollment_course_term, program_version_course_id in to_assign.items():
+        heap = heaps.get(program_version_course_id, [])
+        section_id, instructor_id = _pop_least_loaded(heap, instructor_loads)
+        if section_id is None:
+            logger.error(f"No section found for {enrollment_course_term}, skipping...")
+            continue
+        assignments[enrollment_course_term.id] = section_id
+        # Loads count distinct enrollments per instructor
+        if (instructor_id, enrollment_course_term.enrollment_id) not in counted:
+            counted.add((instructor_id, enrollment_course_term.enrollment_id))
+            instructor_loads[instructor_id] = instructor_loads.get(instructor_id, 0) + 1
+        heapq.heappush(heap, (instructor_loads[instructor_id], str(instructor_id), section_id, instructor_id))
+
+    if assignments:
+        session.execute(
+            update(EnrollmentCourseTerm),
+            [{"id": ect_id, "course_version_section_id": section_id} for ect_id, section_id in assignments.items()],
+        )
+        logger.info(f"Assigned sections to {len(assignments)} of {len(enrollment_course_term_list)} course terms")
+    if commit:
+        session.commit()
+    return assignments
@@ -6,7 +6,9 @@ from propus.helpers.sql_alchemy import find_enum_value
 
 
 def fetch_programs_by_name(session, program_name_list):
-    return session.scalars(select(Program).filter(Program.short_name.in_(program_name_list))).all()
+    return session.scalars(
+        select(Program).filter(Program.short_name.in_(program_name_list)).execution_options(use_replica=True)
+    ).all()
 
 
 def create_expressed_interest_record(session, user, expressed_interest_data: dict):
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from propus.calbright_sql.sync_watermark import SyncWatermark
+
+
+def get_watermarks(session, source: str, keys: list) -> dict:
+    """
+    Get the high-water marks of an incremental sync for the given keys in one query.
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param source: The name of the sync, e.g. "canvas_submissions"
+    :param keys: The objects the sync runs for, e.g. course lms_ids
+    :return: dict: key -> watermark (datetime). Keys which were never synced are missing from the result.
+    """
+    rows = session.execute(
+        select(SyncWatermark.key, SyncWatermark.watermark).filter(
+            SyncWatermark.source == source, SyncWatermark.key.in_([str(key) for key in keys])
+        )
+    ).all()
+    return {row.key: row.watermark for row in rows}
+
+
+def set_watermarks(session, source: str, watermarks: dict[str, datetime]):
+    """
+    Insert or move the high-water marks of an incremental sync, in a single statement.
+    Note: You must commit the session after calling this function to persist the changes to the database!
+    :param session: A Propus Calbright session object. E.g. Calbright.build().session
+    :param source: The name of the sync, e.g. "canvas_submissions"
+    :param watermarks: key -> new watermark
+    """
+    if not watermarks:
+        return
+    stmt = insert(SyncWatermark).values(
+        [{"source": source, "key": str(key), "watermark": watermark} for key, watermark in watermarks.items()]
+    )
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[SyncWatermark.source, SyncWatermark.key],
+            set_={"watermark": stmt.excluded.watermark, "modified_at": func.now()},
+        )
+    )
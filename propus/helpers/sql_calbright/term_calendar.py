@@ -0,0 +1,80 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time
+
+from dateutil.parser import parse as parse_date
+from sqlalchemy import select
+
+from propus.calbright_sql.term import Term
+
+from propus.logging_utility import Logging
+
+logger = Logging.get_logger("propus/helpers/sql_calbright/term_calendar.py", debug=True)
+
+
+def _to_date(day):
+    if isinstance(day, str):
+        day = parse_date(day)
+    if isinstance(day, datetime):
+        return day.date()
+    return day
+
+
+class TermCalendar:
+    """
+    Sorted, in memory calendar of the Term table, resolving the term of a date with a binary search instead of a query.
+    - Terms are kept as rows (id, term_name, start_date, end_date, add_drop_date, anthology_id), not ORM objects, so a
+      calendar can be shared by several sessions.
+    - Dates can be date or datetime objects, or strings, e.g. "2024-01-05T10:00:00".
+    Basic use:
+        calendar = TermCalendar.load(session)
+        calendar.first_term_on_or_after("2024-01-05").id
+    :param terms: Term rows, in any order
+    """
+
+    def __init__(self, terms):
+        self.terms = sorted(terms, key=lambda term: term.start_date)
+        self._start_dates = [term.start_date for term in self.terms]
+
+    @classmethod
+    def load(cls, session):
+        """
+        Load the whole Term table with a single query.
+        :param session: A Calbright database session
+        :return: TermCalendar
+        """
+        logger.debug("Loading the term calendar...")
+        return cls(
+            session.execute(
+                select(
+                    Term.id, Term.term_name, Term.start_date, Term.end_date, Term.add_drop_date, Term.anthology_id
+                ).order_by(Term.start_date)
+            ).all()
+        )
+
+    def __len__(self):
+        return len(self.terms)
+
+    def first_term_on_or_after(self, day):
+        """
+        Same rule as the Term.start_date >= day query of upsert_enrollment. Postgres compares the DATE start with a
+        timestamp as midnight of that day, so a datetime after midnight only matches the terms starting the next day or
+        later. A string is cast to a DATE, its time ignored.
+        :param day: A date
+        :return: The first term starting on or after the date, None if there is none
+        """
+        if isinstance(day, datetime) and day.time() != time.min:
+            index = bisect_right(self._start_dates, day.date())
+        else:
+            index = bisect_left(self._start_dates, _to_date(day))
+        return self.terms[index] if index < len(self.terms) else None
+
+    def term_covering_or_following(self, day):
+        """
+        :param day: A date
+        :return: The term whose dates cover the date, or else the first term starting after it, None if there is none
+        """
+        day = _to_date(day)
+        index = bisect_right(self._start_dates, day)
+        if index and self.terms[index - 1].end_date >= day:
+            return self.terms[index - 1]
+        return self.terms[index] if index < len(self.terms) else None
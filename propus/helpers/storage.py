@@ -0,0 +1,116 @@
+"""
+This module contains small key/value file stores, so jobs can keep their snapshots and exports either on the local disk
+(development, one-off runs) or in S3 (scheduled jobs) behind the same interface.
+
+Basic use:
+    storage = LocalStorage("/tmp/snapshots")  # or S3Storage(AWS_S3.build(), bucket="calbright-etl", prefix="snapshots")
+    storage.write("course_115.json", json.dumps(data))
+    data = json.loads(storage.read("course_115.json"))
+"""
+
+import os
+from typing import Iterator, Optional, Union
+
+from botocore.exceptions import ClientError
+
+from propus.aws.s3 import AWS_S3
+
+
+class LocalStorage:
+    """
+    Store files in a local directory.
+    :param directory: Root directory of the store, created on first write
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def read(self, key: str) -> Optional[str]:
+        """
+        :param key: Key of the file, relative to the store root. "/" separates directories.
+        :return: The content of the file, None if it does not exist
+        """
+        if not self.exists(key):
+            return None
+        with open(self._path(key), encoding="utf-8") as file:
+            return file.read()
+
+    def write(self, key: str, body: Union[str, bytes]):
+        """
+        Write a file atomically: it is written next to its destination and renamed, so a reader (or a restarted job)
+        never sees a partially written file.
+        :param key: Key of the file, relative to the store root. "/" separates directories.
+        :param body: Content of the file
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(body.encode("utf-8") if isinstance(body, str) else body)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str):
+        if self.exists(key):
+            os.remove(self._path(key))
+
+    def list(self, prefix: str = "") -> Iterator[str]:
+        """
+        :param prefix: Only list the keys starting with this prefix
+        :return: The keys in the store, relative to its root
+        """
+        # Only walk the directory the prefix points into, not the whole store
+        base = os.path.join(self.directory, *prefix.split("/")[:-1])
+        for root, _, files in os.walk(base):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                key = os.path.relpath(os.path.join(root, name), self.directory).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    yield key
+
+
+class S3Storage:
+    """
+    Store files in an S3 bucket, under a prefix.
+    :param s3: A Propus AWS_S3 object
+    :param bucket: The bucket to store the files in
+    :param prefix: Prefix prepended to every key, e.g. "canvas/snapshots"
+    """
+
+    def __init__(self, s3: AWS_S3, bucket: str, prefix: str = ""):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def exists(self, key: str) -> bool:
+        return self.s3.s3_file_exists(self.bucket, self._key(key))
+
+    def read(self, key: str) -> Optional[str]:
+        # Not read_from_s3, which retries every ClientError with backoff, including the NoSuchKey of a missing key
+        try:
+            response = self.s3.s3_client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as err:
+            if err.response.get("Error", {}).get("Code") in ["NoSuchKey", "404"]:
+                return None
+            raise err
+        return response["Body"].read().decode("utf-8")
+
+    def write(self, key: str, body: Union[str, bytes]):
+        # S3 puts are atomic, a reader sees either the previous or the new object
+        self.s3.write_to_s3(self.bucket, self._key(key), body)
+
+    def delete(self, key: str):
+        self.s3.delete_objects(self.bucket, [self._key(key)])
+
+    def list(self, prefix: str = "") -> Iterator[str]:
+        for item in self.s3.list_objects(self.bucket, self._key(prefix)):
+            yield item["Key"].removeprefix(f"{self.prefix}/") if self.prefix else item["Key"]
@@ -46,6 +46,7 @@ class Salesforce(RestAPIClient):
                 ["<sfid>"],
             ),
             "create_contact": f"/services/data/{self.version}/sobjects/Contact/",
+            "composite_sobjects": f"/services/data/{self.version}/composite/sobjects",
             # _veteran_record.py
             "create_vet_record": f"/services/data/{self.version}/sobjects/Veteran_Service_Record__c/",
             "update_vet_record": (
@@ -234,6 +235,7 @@ class Salesforce(RestAPIClient):
         fetch_contact_record_by_sf_id,
         fetch_salesforce_id_by_ccc_id,
         update_contact_record,
+        update_contact_records,
         create_contact_record,
     )
     from ._event import create_event
@@ -1,8 +1,11 @@
 import json
-from typing import AnyStr
+from typing import AnyStr, Dict, List
 
 from propus.salesforce.exceptions import CreateContactMissingFields, CreateContactUnknownRecordType
 
+# Maximum number of records per sObject Collections request
+COMPOSITE_SOBJECTS_LIMIT = 200
+
 
 def fetch_contact_details_record_by_ccc_id(self, ccc_id):
     return self.custom_query(
@@ -81,6 +84,32 @@ def update_contact_record(self, salesforce_id: AnyStr, **kwargs):
     self.make_request(url, data=json.dumps(kwargs), req_type="patch")
 
 
+def update_contact_records(self, records: Dict[AnyStr, Dict], all_or_none: bool = False) -> List[Dict]:
+    """
+    Update many contact records with the sObject Collections API, 200 records per request instead of one request per
+    record.
+
+    Args:
+        records (Dict[AnyStr, Dict]): Salesforce ID -> fields to update, e.g. {"0033k00003XYZ": {"FirstName": "Foo"}}
+        all_or_none (bool): roll back all the records of a request when one of them fails. Defaults to False.
+
+    Returns:
+        List[Dict]: the result of each record, in order, e.g. {"id": "0033k00003XYZ", "success": True, "errors": []}
+    """
+    items = [{"attributes": {"type": "Contact"}, "id": sf_id} | fields for sf_id, fields in records.items()]
+    results = []
+    for chunk in (items[i:][:COMPOSITE_SOBJECTS_LIMIT] for i in range(0, len(items), COMPOSITE_SOBJECTS_LIMIT)):
+        results.extend(
+            self.make_request(
+                self._get_endpoint("composite_sobjects"),
+                data=json.dumps({"allOrNone": all_or_none, "records": chunk}),
+                req_type="patch",
+            )
+            or []
+        )
+    return results
+
+
 def create_contact_record(self, record_type: AnyStr, **kwargs) -> dict:
     """
     Method used to create a contact record in Salesforce
@@ -20,6 +20,7 @@ def fetch_dependencies():
         "api_handler": [requests_sevice],
         "anthology": [requests_sevice],
         "aws": ["backoff==1.10", "boto3~=1.14", "botocore~=1.18", "ssm_cache<3.0"],
+        "canvas_export": ["pyarrow>=14.0.0"],
         "dialpad": [requests_sevice, "python-dialpad>=2.2.2"],
         "geolocator": ["geopy>=2.4.0"],
         "gsuite": ["PyDrive>=1.3.1", "gspread>=5.10.0"],
@@ -32,6 +33,7 @@ def fetch_dependencies():
             "alembic-utils>=0.8.2",
             "alembic-postgresql-enum<=2.0.0",
         ],
+        "sql_async": ["SQLAlchemy[asyncio]>=2.0.0", "asyncpg>=0.29.0"],
         "slack": [requests_sevice, "slack_sdk>=3.27.0", "certifi>=2024.6.2"],
         "twilio": [requests_sevice, "twilio>=8.13.0"],
     }
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from time import sleep
+from unittest.mock import Mock
+
+from propus.anthology import Anthology
+from propus.anthology.configuration import _cache
+from tests.api_client import TestAPIClient
+
+
+class TestAnthologyConfigurationCache(TestAPIClient):
+    def setUp(self) -> None:
+        super().setUp()
+        _cache._configuration_cache.clear()
+        self.anthology = Anthology(application_key=self.application_key, base_url=self.url)
+        self.calls = []
+        self.anthology.make_request = Mock(side_effect=self.mock_make_request)
+
+    def tearDown(self) -> None:
+        _cache._configuration_cache.clear()
+
+    def mock_make_request(self, url):
+        self.calls.append(url)
+        return {"value": [{"Id": 175, "Code": "2023-24-TERM-19", "Name": "2023-24-TERM-19"}, {"Id": 176, "Name": "B"}]}
+
+    def test_fetch_cached_configurations(self):
+        first = asyncio.run(self.anthology.fetch_cached_configurations("term"))
+        second = asyncio.run(self.anthology.fetch_cached_configurations("term"))
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 1)
+
+        # Shared by other Anthology objects of the same tenant
+        other = Anthology(application_key=self.application_key, base_url=self.url)
+        other.make_request = self.anthology.make_request
+        asyncio.run(other.fetch_cached_configurations("term"))
+        self.assertEqual(len(self.calls), 1)
+
+        # Parameters are part of the key
+        asyncio.run(self.anthology.fetch_cached_configurations("program_version", program_id=1))
+        asyncio.run(self.anthology.fetch_cached_configurations("program_version", program_id=2))
+        self.assertEqual(len(self.calls), 3)
+
+    def test_ttl(self):
+        self.anthology.configuration_ttl = 0
+        asyncio.run(self.anthology.fetch_cached_configurations("term"))
+        asyncio.run(self.anthology.fetch_cached_configurations("term"))
+        self.assertEqual(len(self.calls), 2)
+
+    def test_fetch_configuration_indexes(self):
+        indexes = asyncio.run(self.anthology.fetch_configuration_indexes("term"))
+        self.assertEqual(indexes["code"], {"2023-24-TERM-19": 175})
+        self.assertEqual(indexes["name"], {"2023-24-TERM-19": 175, "B": 176})
+
+    def test_invalidate_configurations(self):
+        asyncio.run(self.anthology.fetch_cached_configurations("term"))
+        asyncio.run(self.anthology.fetch_cached_configurations("gender"))
+        self.anthology.invalidate_configurations("term")
+        asyncio.run(self.anthology.fetch_cached_configurations("term"))
+        asyncio.run(self.anthology.fetch_cached_configurations("gender"))
+        self.assertEqual(len(self.calls), 3)
+
+        self.anthology.invalidate_configurations()
+        asyncio.run(self.anthology.fetch_cached_configurations("gender"))
+        self.assertEqual(len(self.calls), 4)
+
+    def test_snapshot(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "configurations.json")
+            self.anthology.configuration_snapshot = path
+            asyncio.run(self.anthology.fetch_cached_configurations("term"))
+            self.assertTrue(os.path.isfile(path))
+
+            # A cold start restores the cache from the snapshot
+            _cache._configuration_cache.clear()
+            indexes = asyncio.run(self.anthology.fetch_configuration_indexes("term"))
+            self.assertEqual(indexes["code"], {"2023-24-TERM-19": 175})
+            self.assertEqual(len(self.calls), 1)
+
+    def test_preload_configurations(self):
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_request(url):
+            with lock:
+                in_flight.append(url)
+                peak.append(len(in_flight))
+            sleep(0.05)
+            with lock:
+                in_flight.remove(url)
+            if "Genders" in url:
+                raise Exception("Anthology timeout")
+            return {"value": []}
+
+        self.anthology.make_request = Mock(side_effect=slow_request)
+        failures = self.anthology.preload_configurations(max_concurrency=4)
+        self.assertEqual(list(failures), ["gender"])
+        self.assertEqual(max(peak), 4)
+        self.assertEqual(len(_cache._configuration_cache[self.url]), len(_cache.PRELOADABLE_CONFIGURATIONS) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
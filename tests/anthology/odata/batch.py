@@ -0,0 +1,105 @@
+import asyncio
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+
+from propus.anthology import Anthology
+from propus.anthology.configuration import _cache
+from propus.api_client import FailedRequest
+from tests.api_client import TestAPIClient
+
+
+class TestAnthologyODataBatch(TestAPIClient):
+    def setUp(self) -> None:
+        super().setUp()
+        _cache._configuration_cache.clear()
+        self.anthology = Anthology(application_key=self.application_key, base_url=self.url)
+        self.batches = []
+        self.anthology.make_request = Mock(side_effect=self.mock_make_request)
+
+    def tearDown(self) -> None:
+        _cache._configuration_cache.clear()
+
+    def mock_make_request(self, url, req_type="get", data=None):
+        if not url.endswith("/$batch"):
+            # A program list, read on its own
+            return {"value": [{"Id": 4, "Code": "IT"}, {"Id": 5, "Code": "CONED"}, {"Id": 6, "Code": "CRM"}]}
+        requests = json.loads(data)["requests"]
+        self.batches.append((url, requests))
+        # Answered out of order, as the $batch format allows
+        return {
+            "responses": [
+                {
+                    "id": request["id"],
+                    "status": 404 if "Missing" in request["url"] else 200,
+                    "body": {"value": [{"Id": int(request["id"]), "Code": "V", "Name": "V", "TotalWeeks": 4}]},
+                }
+                for request in reversed(requests)
+            ]
+        }
+
+    def test_odata_batch(self):
+        responses = asyncio.run(
+            self.anthology.odata_batch(
+                [
+                    {"url": self.anthology._get_endpoint("term")},
+                    {"url": self.anthology._get_endpoint("gender")},
+                    {"url": self.anthology._get_endpoint("grade_level")},
+                    {"url": f"{self.url}/ds/odata/Missing"},
+                ]
+            )
+        )
+        self.assertEqual([r["status"] for r in responses], [200, 200, 200, 404])
+        self.assertEqual([r["body"]["value"][0]["Id"] for r in responses], [0, 1, 2, 3])
+
+        # One $batch per OData service root
+        self.assertEqual(
+            [(url, [r["id"] for r in requests]) for url, requests in self.batches],
+            [(f"{self.url}/ds/odata/$batch", ["0", "1", "3"]), (f"{self.url}/ds/campusnexus/$batch", ["2"])],
+        )
+        self.assertEqual(
+            self.batches[0][1][0],
+            {
+                "id": "0",
+                "method": "GET",
+                "url": "/ds/odata/Terms?$orderby=StartDate&$select=Code,StartDate,EndDate,AddDropDate,Id",
+                "headers": {"accept": "application/json"},
+            },
+        )
+
+    def test_odata_batch_chunks(self):
+        urls = [self.anthology._get_endpoint("term")] * 5
+        self.assertEqual(len(asyncio.run(self.anthology.odata_batch_get(urls, max_operations=2))), 5)
+        self.assertEqual([len(requests) for _, requests in self.batches], [2, 2, 1])
+
+    def test_odata_batch_errors(self):
+        with self.assertRaises(FailedRequest):
+            asyncio.run(self.anthology.odata_batch_get([f"{self.url}/ds/odata/Missing"]))
+        with self.assertRaises(ValueError):
+            asyncio.run(self.anthology.odata_batch([{"url": self.anthology._get_endpoint("create_term")}]))
+
+    def test_fetch_cached_configurations_batch(self):
+        configurations = [("program_version", {"program_id": 4}), ("program_version", {"program_id": 6})]
+        first = asyncio.run(self.anthology.fetch_cached_configurations_batch(configurations))
+        second = asyncio.run(self.anthology.fetch_cached_configurations_batch(configurations))
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.batches), 1)
+
+        # Only the configuration missing from the cache is read
+        asyncio.run(self.anthology.fetch_cached_configurations_batch(configurations + [("term", {})]))
+        self.assertEqual([len(requests) for _, requests in self.batches], [2, 1])
+
+    def test_add_programs_to_start_date(self):
+        asyncio.run(self.anthology.add_programs_to_start_date("2023-24-TERM-19", datetime(2023, 6, 6)))
+
+        # The program versions of IT and CRM (CONED is skipped) are read in one $batch
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0][1]), 2)
+        save = self.anthology.make_request.call_args_list[-1]
+        start_dates = json.loads(save.kwargs["data"])["payload"]["SchoolStartDateList"]
+        self.assertEqual([s["ProgramCode"] for s in start_dates], ["IT", "CRM"])
+
+
+if __name__ == "__main__":
+    unittest.main()
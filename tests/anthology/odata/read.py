@@ -0,0 +1,104 @@
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+
+from propus.anthology import Anthology
+from propus.anthology.odata._profiles import ODATA_PROFILES
+from tests.api_client import TestAPIClient
+
+
+class TestAnthologyODataRead(TestAPIClient):
+    def setUp(self) -> None:
+        super().setUp()
+        self.anthology = Anthology(application_key=self.application_key, base_url=self.url)
+        self.entities = [{"Id": i} for i in range(1, 12)]
+        self.mode = "count"
+        self.calls = []
+        self.anthology.make_request = Mock(side_effect=self.mock_make_request)
+
+    def mock_make_request(self, url, params=None):
+        self.calls.append((url, params))
+        if params is None:
+            # Following a next link
+            skip = int(url.split("$skip=")[1])
+            return self.page(skip, 5)
+        return self.page(params["$skip"], params["$top"], first=params.get("$count") == "true")
+
+    def page(self, skip, top, first=False):
+        response = {"@odata.context": f"{self.url}/ds/odata/$metadata", "value": self.entities[skip : skip + top]}
+        if self.mode == "count" and first:
+            response["@odata.count"] = len(self.entities)
+        if self.mode == "next_link" and skip + top < len(self.entities):
+            response["@odata.nextLink"] = f"{self.url}/ds/odata/StudentCourses?$skip={skip + top}"
+        return response
+
+    def test_stream_odata_with_count(self):
+        result = list(self.anthology.stream_odata("course_search", page_size=3, max_concurrency=2))
+        self.assertEqual(result, self.entities)
+        self.assertEqual(len(self.calls), 4)
+        self.assertEqual(
+            self.calls[0],
+            (f"{self.url}/ds/odata/StudentCourses", {"$orderby": "Id", "$top": 3, "$skip": 0, "$count": "true"}),
+        )
+        self.assertEqual(sorted(params["$skip"] for _, params in self.calls), [0, 3, 6, 9])
+
+    def test_stream_odata_with_next_link(self):
+        self.mode = "next_link"
+        result = list(self.anthology.stream_odata("course_search", page_size=5))
+        self.assertEqual(result, self.entities)
+        self.assertEqual([params for _, params in self.calls[1:]], [None, None])
+
+    def test_stream_odata_without_count(self):
+        self.mode = "none"
+        result = list(self.anthology.stream_odata("course_search", page_size=4))
+        self.assertEqual(result, self.entities)
+        self.assertEqual([params["$skip"] for _, params in self.calls], [0, 4, 8])
+
+    def test_stream_odata_is_lazy(self):
+        stream = self.anthology.stream_odata("course_search", page_size=3)
+        self.assertEqual(next(stream), {"Id": 1})
+        self.assertEqual(len(self.calls), 1)
+
+    def test_stream_odata_profile(self):
+        list(
+            self.anthology.stream_odata(
+                "course_search", profile="enrolled_courses", params={"$filter": "Status eq 'C'"}, page_size=20
+            )
+        )
+        params = self.calls[0][1]
+        self.assertEqual(params["$select"], ODATA_PROFILES["enrolled_courses"]["$select"])
+        self.assertEqual(params["$expand"], ODATA_PROFILES["enrolled_courses"]["$expand"])
+        self.assertEqual(params["$filter"], "Status eq 'C'")
+
+    def test_stream_odata_unexpected_response(self):
+        self.anthology.make_request = Mock(return_value={"error": "timeout"})
+        with self.assertRaises(ValueError):
+            list(self.anthology.stream_odata("course_search"))
+
+    def test_stream_odata_changes(self):
+        list(self.anthology.stream_odata_changes("student_search", datetime(2024, 1, 19, 15, 43, 38), page_size=20))
+        self.assertEqual(self.calls[0][1]["$filter"], "LastModifiedDateTime gt 2024-01-19T15:43:38Z")
+        self.calls.clear()
+        list(
+            self.anthology.stream_odata_changes(
+                "student_search", datetime(2024, 1, 19), params={"$filter": "IsActive eq true"}, page_size=20
+            )
+        )
+        self.assertEqual(
+            self.calls[0][1]["$filter"], "(IsActive eq true) and LastModifiedDateTime gt 2024-01-19T00:00:00Z"
+        )
+
+    def test_stream_wrappers(self):
+        self.assertEqual(len(list(self.anthology.stream_all_enrolled_courses(page_size=5))), 11)
+        self.assertEqual(self.calls[0][0], f"{self.url}/ds/odata/StudentCourses")
+        self.assertIn("$expand", self.calls[0][1])
+        self.calls.clear()
+        list(self.anthology.stream_all_courses())
+        self.assertEqual(self.calls[0][0], f"{self.url}/ds/odata/Courses")
+        self.calls.clear()
+        list(self.anthology.stream_all_enrollments())
+        self.assertEqual(self.calls[0][0], f"{self.url}/ds/odata/StudentEnrollmentPeriods")
+
+
+if __name__ == "__main__":
+    unittest.main()
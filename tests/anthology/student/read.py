@@ -1,5 +1,8 @@
 import asyncio
+import re
 import unittest
+from unittest.mock import Mock
+from urllib.parse import urlencode
 
 from propus.anthology import Anthology
 from tests.api_client import TestAPIClient
@@ -46,6 +49,25 @@ class TestAnthologyStudentRead(TestAPIClient):
             self.success_response,
         )
 
+    def test_student_search_many(self):
+        calls = []
+
+        def mock_make_request(url, params):
+            calls.append(f"{url}?{urlencode(params)}")
+            numbers = re.findall(r"StudentNumber eq '([^']+)'", params["$filter"])
+            # STUDENT_7 is unknown to Anthology
+            return {"value": [{"Id": i, "StudentNumber": n} for i, n in enumerate(numbers) if n != "STUDENT_7"]}
+
+        self.anthology.make_request = Mock(side_effect=mock_make_request)
+        numbers = [f"STUDENT_{i}" for i in range(40)] + ["STUDENT_1", None]
+        students = asyncio.run(self.anthology.student_search_many(numbers, max_url_length=400, max_concurrency=2))
+
+        self.assertEqual(set(students), {f"STUDENT_{i}" for i in range(40)} - {"STUDENT_7"})
+        self.assertEqual(students["STUDENT_3"]["StudentNumber"], "STUDENT_3")
+        self.assertGreater(len(calls), 1)
+        self.assertTrue(all(len(call) <= 400 for call in calls))
+        self.assertEqual(asyncio.run(self.anthology.student_search_many([])), {})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import Mock
+from tests.api_client import TestAPIClient
+from propus.canvas import Canvas
+from propus.canvas.graphql import CanvasGraphQLError
+
+
+class TestCanvasGraphQLRead(TestAPIClient):
+    def setUp(self) -> None:
+        super().setUp()
+        auth_providers = {"okta": 105, "google": 105}
+        self.canvas = Canvas(
+            application_key=self.application_key,
+            base_url=self.url,
+            additional_headers=None,
+            auth_providers=auth_providers,
+        )
+        self.canvas.request_service = self._req_mock
+        self.canvas.make_request = Mock(side_effect=self.mock_make_request)
+
+        self.test_url = f"{self.url}/api/graphql"
+        self.requests = []
+        self.responses = []
+
+    def mock_make_request(self, **kwargs):
+        self.assertEqual(kwargs.get("req_type"), "post")
+        self.assertEqual(kwargs.get("url"), self.test_url)
+        self.requests.append(json.loads(kwargs.get("data")))
+        return self.responses.pop(0)
+
+    @staticmethod
+    def page(path, nodes, cursor=None):
+        connection = {"nodes": nodes, "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor}}
+        for key in reversed(path):
+            connection = {key: connection}
+        return {"data": connection}
+
+    def test_graphql_query(self):
+        self.responses = [{"data": {"course": {"_id": "1"}}}]
+        self.assertEqual(
+            asyncio.run(self.canvas.graphql_query("query { course(id: 1) { _id } }")),
+            {"course": {"_id": "1"}},
+        )
+        self.assertEqual(self.requests[0], {"query": "query { course(id: 1) { _id } }", "variables": {}})
+
+    def test_graphql_query_errors(self):
+        self.responses = [{"errors": [{"message": "Field 'foo' doesn't exist"}]}]
+        with self.assertRaises(CanvasGraphQLError):
+            asyncio.run(self.canvas.graphql_query("query { foo }"))
+
+    def test_get_course_enrollments_with_grades(self):
+        path = ["course", "enrollmentsConnection"]
+        self.responses = [
+            self.page(path, [{"_id": "1"}, {"_id": "2"}], cursor="MQ"),
+            self.page(path, [{"_id": "3"}]),
+        ]
+        enrollments = asyncio.run(self.canvas.get_course_enrollments_with_grades(course_id=115, page_size=2))
+        self.assertEqual([e["_id"] for e in enrollments], ["1", "2", "3"])
+        self.assertEqual(
+            [(r["variables"]["first"], r["variables"]["after"]) for r in self.requests], [(2, None), (2, "MQ")]
+        )
+        self.assertEqual(self.requests[0]["variables"]["course_id"], "115")
+
+    def test_get_course_submissions_graphql(self):
+        self.responses = [self.page(["course", "submissionsConnection"], [{"_id": "900"}])]
+        submissions = asyncio.run(self.canvas.get_course_submissions_graphql(course_id=115, student_ids=[42]))
+        self.assertEqual(submissions, [{"_id": "900"}])
+        self.assertEqual(self.requests[0]["variables"]["student_ids"], ["42"])
+        self.assertIsNone(self.requests[0]["variables"]["filter"])
+
+    def test_get_user_enrollments_with_submissions(self):
+        enrollments = [
+            {"_id": "1", "course": {"_id": "115"}},
+            {"_id": "2", "course": {"_id": "116"}},
+        ]
+        self.responses = [
+            {"data": {"legacyNode": {"_id": "42", "enrollments": enrollments}}},
+            self.page(["course", "submissionsConnection"], [{"_id": "900"}]),
+            self.page(["course", "submissionsConnection"], []),
+        ]
+        result = asyncio.run(self.canvas.get_user_enrollments_with_submissions(user_id=42))
+        self.assertEqual([e["submissions"] for e in result], [[{"_id": "900"}], []])
+        self.assertEqual(len(self.requests), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
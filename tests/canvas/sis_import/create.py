@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+from tests.api_client import TestAPIClient
+from propus.canvas import Canvas
+
+
+class TestCanvasSisImportCreate(TestAPIClient):
+    def setUp(self) -> None:
+        super().setUp()
+        auth_providers = {"okta": 105, "google": 105}
+        self.canvas = Canvas(
+            application_key=self.application_key,
+            base_url=self.url,
+            additional_headers=None,
+            auth_providers=auth_providers,
+        )
+        self.canvas.request_service = self._req_mock
+        self.canvas.make_request = Mock(side_effect=self.mock_make_request)
+
+        self.test_data = {"account_id": 1, "attachment": b"PK\x03\x04"}
+        self.test_urls = {
+            "create_sis_import": f"{self.url}/api/v1/accounts/{self.test_data['account_id']}/sis_imports"
+            "?import_type=instructure_csv&extension=zip",
+            "create_sis_import_csv": f"{self.url}/api/v1/accounts/{self.test_data['account_id']}/sis_imports"
+            "?import_type=instructure_csv&extension=csv&diffing_data_set_identifier=spring",
+        }
+        self.content_types = {"create_sis_import": "application/zip", "create_sis_import_csv": "text/csv"}
+
+    def test_create_sis_import(self):
+        self.test_name = "create_sis_import"
+        self.assertEqual(
+            asyncio.run(self.canvas.create_sis_import(attachment=self.test_data["attachment"])),
+            self.success_response,
+        )
+
+    def test_create_sis_import_csv(self):
+        self.test_name = "create_sis_import_csv"
+        self.assertEqual(
+            asyncio.run(
+                self.canvas.create_sis_import(
+                    attachment=self.test_data["attachment"], extension="csv", diffing_data_set_identifier="spring"
+                )
+            ),
+            self.success_response,
+        )
+
+    def mock_make_request(self, **kwargs):
+        self.assertEqual(kwargs.get("req_type"), "post")
+        self.assertEqual(kwargs.get("url"), self.test_urls.get(self.test_name))
+        self.assertEqual(kwargs.get("data"), self.test_data["attachment"])
+        self.assertEqual(kwargs.get("headers").get("Content-Type"), self.content_types.get(self.test_name))
+        return self.success_response
+
+
+if __name__ == "__main__":
+    unittest.main()
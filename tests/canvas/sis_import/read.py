@@ -0,0 +1,60 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+from tests.api_client import TestAPIClient
+from propus.canvas import Canvas
+
+
+class TestCanvasSisImportRead(TestAPIClient):
+    def setUp(self) -> None:
+        super().setUp()
+        auth_providers = {"okta": 105, "google": 105}
+        self.canvas = Canvas(
+            application_key=self.application_key,
+            base_url=self.url,
+            additional_headers=None,
+            auth_providers=auth_providers,
+        )
+        self.canvas.request_service = self._req_mock
+        self.canvas.make_request = Mock(side_effect=self.mock_make_request)
+
+        self.test_data = {"account_id": 1, "sis_import_id": 12}
+        self.test_urls = {
+            "get_sis_import": f"{self.url}/api/v1/accounts/1/sis_imports/{self.test_data['sis_import_id']}",
+            "get_sis_import_errors": f"{self.url}/api/v1/accounts/1/sis_imports/"
+            f"{self.test_data['sis_import_id']}/errors",
+        }
+        self.test_errors = [
+            {"file": "users.csv", "message": "Invalid login", "row": 2},
+            {"file": "enrollments.csv", "message": "Unknown section", "row": 4},
+        ]
+        self.test_responses = {
+            "get_sis_import": [{"id": 12, "workflow_state": "imported", "progress": 100}],
+            "get_sis_import_errors": [
+                {"sis_import_errors": self.test_errors[:1]},
+                {"sis_import_errors": self.test_errors[1:]},
+            ],
+        }
+
+    def test_get_sis_import(self):
+        self.test_name = "get_sis_import"
+        self.assertEqual(
+            asyncio.run(self.canvas.get_sis_import(sis_import_id=self.test_data["sis_import_id"])),
+            self.test_responses["get_sis_import"][0],
+        )
+
+    def test_get_sis_import_errors(self):
+        self.test_name = "get_sis_import_errors"
+        self.assertEqual(
+            asyncio.run(self.canvas.get_sis_import_errors(sis_import_id=self.test_data["sis_import_id"])),
+            self.test_errors,
+        )
+
+    def mock_make_request(self, **kwargs):
+        self.assertEqual(kwargs.get("req_type"), "get")
+        self.assertEqual(kwargs.get("url"), self.test_urls.get(self.test_name))
+        return self.test_responses.get(self.test_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
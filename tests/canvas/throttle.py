@@ -0,0 +1,98 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from propus.api_client import FailedRequest
+from propus.canvas import Canvas
+from propus.canvas.throttle import CanvasThrottle
+
+
+class TestCanvasThrottle(unittest.TestCase):
+    def setUp(self) -> None:
+        self.throttle = CanvasThrottle(max_concurrency=8, reserve=100)
+
+    def report(self, remaining, cost=1):
+        self.throttle.acquire()
+        self.throttle.release({"X-Rate-Limit-Remaining": str(remaining), "X-Request-Cost": str(cost)})
+
+    def test_shared(self):
+        throttle = CanvasThrottle.shared("https://calbright.instructure.com", "token_1")
+        self.assertIs(throttle, CanvasThrottle.shared("https://calbright.instructure.com", "token_1"))
+        self.assertIsNot(throttle, CanvasThrottle.shared("https://calbright.instructure.com", "token_2"))
+
+        canvas_1 = Canvas(base_url="https://calbright.instructure.com", application_key="token_1", auth_providers={})
+        canvas_2 = Canvas(base_url="https://calbright.instructure.com", application_key="token_1", auth_providers={})
+        self.assertIs(canvas_1.throttle, canvas_2.throttle)
+
+    @patch("propus.canvas.throttle.monotonic", return_value=100.0)
+    def test_concurrency_and_interval_follow_remaining_quota(self, _):
+        self.assertEqual(self.throttle.concurrency, 8)
+        self.assertEqual(self.throttle.interval, 0)
+
+        self.report(700)
+        self.assertEqual(self.throttle.concurrency, 8)
+        self.assertEqual(self.throttle.interval, 0)
+
+        self.report(250)
+        # (250 - 100 reserved) // (1 + 50 pre-flight penalty)
+        self.assertEqual(self.throttle.concurrency, 2)
+        self.assertGreater(self.throttle.interval, 0)
+
+        self.report(20)
+        self.assertEqual(self.throttle.concurrency, 1)
+
+    def test_remaining_refills_over_time(self):
+        with patch("propus.canvas.throttle.monotonic", return_value=100.0):
+            self.report(200)
+        with patch("propus.canvas.throttle.monotonic", return_value=110.0):
+            self.assertEqual(self.throttle.remaining, 300)
+        with patch("propus.canvas.throttle.monotonic", return_value=1000.0):
+            self.assertEqual(self.throttle.remaining, CanvasThrottle.BUCKET_SIZE)
+
+    def test_ignores_missing_headers(self):
+        self.throttle.acquire()
+        self.throttle.release({})
+        self.assertIsNone(self.throttle.remaining)
+        self.assertEqual(self.throttle._in_flight, 0)
+
+    def test_rate_limited_pauses(self):
+        with patch("propus.canvas.throttle.monotonic", return_value=100.0):
+            self.throttle.acquire()
+            self.throttle.release(rate_limited=True)
+            self.assertEqual(self.throttle.remaining, 0)
+            self.assertEqual(self.throttle.concurrency, 1)
+            self.assertEqual(self.throttle._paused_until, 105.0)
+
+    def test_acquire_blocks_until_release(self):
+        self.throttle.max_concurrency = 1
+        self.throttle.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (self.throttle.acquire(), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        self.throttle.release()
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+    def test_make_request_reports_to_throttle(self):
+        canvas = Canvas(base_url="https://throttle.instructure.com", application_key="token", auth_providers={})
+        canvas.throttle = MagicMock()
+        response = MagicMock(headers={"X-Rate-Limit-Remaining": "650.5", "X-Request-Cost": "2.1"}, links={})
+        response.json.return_value = {"id": 1}
+        canvas._make_request = MagicMock(return_value=response)
+
+        self.assertEqual(
+            canvas.make_request(req_type="get", url="https://throttle.instructure.com/api/v1/courses/1"), [{"id": 1}]
+        )
+        canvas.throttle.acquire.assert_called_once()
+        canvas.throttle.release.assert_called_once_with(response.headers)
+
+        canvas.throttle.reset_mock()
+        canvas._make_request.side_effect = FailedRequest(403, "403 Forbidden (Rate Limit Exceeded)")
+        with self.assertRaises(FailedRequest):
+            canvas.make_request(req_type="get", url="https://throttle.instructure.com/api/v1/courses/1")
+        canvas.throttle.release.assert_called_once_with(rate_limited=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from propus.calbright_sql.user import User
+from propus.helpers.anthology import (
+    ANTHOLOGY_ADDRESS_FIELD_MAP,
+    ANTHOLOGY_STUDENT_FIELD_MAP,
+    ANTHOLOGY_USER_FIELD_MAP,
+    update_student_course,
+)
+from propus.helpers.anthology_delta_sync import (
+    ANTHOLOGY_DELTA_ENTITIES,
+    ANTHOLOGY_DELTA_SOURCE,
+    WATERMARK_OVERLAP,
+    load_users,
+    sync_anthology_changes,
+    to_webhook_payload,
+)
+
+
+class TestAnthologyDeltaSync(unittest.TestCase):
+    def setUp(self) -> None:
+        self.session = MagicMock()
+        self.anthology = MagicMock()
+        self.salesforce = MagicMock()
+        self.user = User(ccc_id="FOOBAR1", anthology_id=17557)
+        self.session.execute.return_value.scalars.return_value.all.return_value = [self.user]
+        self.students = [
+            {
+                "Id": 17557,
+                "StudentNumber": "FOOBAR1",
+                "FirstName": "Foo",
+                "LastModifiedDateTime": "2024-01-19T15:43:38.65",
+            },
+            {"Id": 1, "StudentNumber": "UNKNOWN", "LastModifiedDateTime": "2024-01-20T10:00:00.1234567"},
+        ]
+        self.student_courses = [
+            {
+                "Id": 6933,
+                "StudentId": 17557,
+                "Status": 10,
+                "LastModifiedDateTime": "2024-01-18T09:00:00",
+                "Student": {"Id": 17557, "StudentNumber": "FOOBAR1"},
+            }
+        ]
+        self.anthology.stream_odata.side_effect = lambda endpoint, **_: iter(
+            self.students if endpoint == "student_search" else self.student_courses
+        )
+        self.anthology.stream_odata_changes.side_effect = lambda endpoint, since, **_: iter(
+            self.students if endpoint == "student_search" else self.student_courses
+        )
+        self.watermarks = {}
+        patches = {
+            "get_watermarks": patch(
+                "propus.helpers.anthology_delta_sync.get_watermarks",
+                side_effect=lambda session, source, keys: dict(self.watermarks),
+            ),
+            "set_watermarks": patch("propus.helpers.anthology_delta_sync.set_watermarks"),
+            "status_map": patch(
+                "propus.helpers.anthology_delta_sync.create_learner_status_map", return_value={"baz": 1}
+            ),
+            "update_student": patch("propus.helpers.anthology_delta_sync.update_student"),
+            "update_student_course": patch("propus.helpers.anthology_delta_sync.update_student_course"),
+        }
+        self.mocks = {name: p.start() for name, p in patches.items()}
+        self.addCleanup(patch.stopall)
+
+    def test_to_webhook_payload(self):
+        self.assertEqual(
+            to_webhook_payload("student", self.students[0]),
+            {
+                "id": 17557,
+                "studentNumber": "FOOBAR1",
+                "firstName": "Foo",
+                "lastModifiedDateTime": "2024-01-19T15:43:38.65",
+            },
+        )
+        payload = to_webhook_payload("student_course", self.student_courses[0])
+        self.assertEqual(payload["studentId"], 17557)
+        self.assertEqual(payload["studentNumber"], "FOOBAR1")
+        self.assertEqual(payload["status"], 10)
+        self.assertNotIn("student", payload)
+
+    def test_student_fields_selected(self):
+        # Every field update_student maps is read by the delta query, so a change to any of them is synced
+        selected = ANTHOLOGY_DELTA_ENTITIES["student"]["params"]["$select"].split(",")
+        payload = to_webhook_payload("student", dict.fromkeys(selected, "value"))
+        for field_map in (ANTHOLOGY_ADDRESS_FIELD_MAP, ANTHOLOGY_STUDENT_FIELD_MAP, ANTHOLOGY_USER_FIELD_MAP):
+            for key in field_map:
+                self.assertIn(key, payload)
+        self.assertIn("lastModifiedDateTime", payload)
+
+    def test_load_users(self):
+        users = load_users(self.session, [{"studentNumber": "FOOBAR1"}, {"studentId": 17557}])
+        self.assertIs(users[("ccc_id", "FOOBAR1")], self.user)
+        self.assertIs(users[("anthology_id", 17557)], self.user)
+        self.session.execute.assert_called_once()
+        self.assertEqual(load_users(self.session, [{}]), {})
+
+    def test_sync_full_first_run(self):
+        handled = sync_anthology_changes(self.session, self.anthology, self.salesforce)
+
+        self.assertEqual(handled, {"student": 1, "student_course": 1})
+        self.anthology.stream_odata_changes.assert_not_called()
+        self.mocks["update_student"].assert_called_once()
+        self.assertIs(self.mocks["update_student"].call_args.kwargs["user"], self.user)
+        self.assertEqual(self.mocks["update_student_course"].call_args.kwargs["learner_status_map"], {"baz": 1})
+        self.mocks["set_watermarks"].assert_any_call(
+            self.session, ANTHOLOGY_DELTA_SOURCE, {"student": datetime(2024, 1, 20, 10, 0, 0, 123456)}
+        )
+        self.mocks["set_watermarks"].assert_any_call(
+            self.session, ANTHOLOGY_DELTA_SOURCE, {"student_course": datetime(2024, 1, 18, 9)}
+        )
+
+    def test_sync_changes_since_watermark(self):
+        self.watermarks["student"] = datetime(2024, 1, 19)
+        self.student_courses.clear()
+        handled = sync_anthology_changes(self.session, self.anthology, self.salesforce, entity_types=["student"])
+
+        self.assertEqual(handled, {"student": 1})
+        self.anthology.stream_odata_changes.assert_called_once_with(
+            "student_search",
+            datetime(2024, 1, 19) - WATERMARK_OVERLAP,
+            params=ANTHOLOGY_DELTA_ENTITIES["student"]["params"],
+            profile=None,
+            page_size=500,
+        )
+        self.mocks["status_map"].assert_not_called()
+
+    def test_sync_batches_commits(self):
+        self.students = [dict(self.students[0], Id=i) for i in range(5)]
+        sync_anthology_changes(self.session, self.anthology, self.salesforce, entity_types=["student"], batch_size=2)
+        self.assertEqual(self.mocks["update_student"].call_count, 5)
+        # One query for the users of each batch, one commit per batch and one for the watermark
+        self.assertEqual(self.session.execute.call_count, 3)
+        self.assertEqual(self.session.commit.call_count, 4)
+
+    def test_sync_student_course_changes(self):
+        # The real handler, with the entities of the delta query, which carry no previousStatus
+        self.mocks["status_map"].return_value = {
+            "Enrolled in Program Pathway": "LS10",
+            "Started Program Pathway": "LS11",
+        }
+        self.user.learner_status_id = "LS10"
+        self.user.salesforce_id = "SF1"
+        self.student_courses += [
+            dict(self.student_courses[0], Id=6934, Status=11),
+            dict(self.student_courses[0], Id=6935, Status=99),
+        ]
+        with patch("propus.helpers.anthology_delta_sync.update_student_course", update_student_course):
+            handled = sync_anthology_changes(
+                self.session, self.anthology, self.salesforce, entity_types=["student_course"], batch_size=1
+            )
+
+        self.assertEqual(handled, {"student_course": 3})
+        # Status 10 is already stored and status 99 has no learner status: only the change to 11 is written
+        self.assertEqual(self.user.learner_status_id, "LS11")
+        self.salesforce.update_contact_records.assert_called_once_with(
+            {"SF1": {"cfg_Learner_Status__c": "Started Program Pathway"}}
+        )
+        self.salesforce.update_contact_record.assert_not_called()
+
+    def test_sync_failed_commit(self):
+        self.students = [dict(self.students[0], Id=i) for i in range(3)]
+        self.session.commit.side_effect = [None, Exception("invalid input syntax for type uuid"), None]
+        self.mocks["update_student"].side_effect = lambda session, salesforce, payload, **_: (
+            salesforce.update_contact_record(f"SF{payload['id']}", FirstName=payload["firstName"])
+        )
+        handled = sync_anthology_changes(
+            self.session, self.anthology, self.salesforce, entity_types=["student"], batch_size=1
+        )
+
+        # The failed batch is rolled back, the next one still runs, and the watermark does not move
+        self.assertEqual(handled, {"student": 2})
+        self.session.rollback.assert_called_once()
+        self.assertEqual(self.mocks["update_student"].call_count, 3)
+        self.mocks["set_watermarks"].assert_not_called()
+        # The Salesforce updates of the rolled back batch are not sent
+        self.assertEqual(
+            [c.args[0] for c in self.salesforce.update_contact_records.call_args_list],
+            [{"SF0": {"FirstName": "Foo"}}, {"SF2": {"FirstName": "Foo"}}],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from propus.calbright_sql.user import User
+from propus.helpers.anthology import update_student_course
+from propus.helpers.anthology_webhook_batch import (
+    SalesforceWriteBuffer,
+    coalesce_webhooks,
+    handle_anthology_webhooks,
+)
+
+
+class TestAnthologyWebhookBatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.session = MagicMock()
+        self.salesforce = MagicMock()
+        self.salesforce.update_contact_records.side_effect = lambda records: [
+            {"id": sf_id, "success": True, "errors": []} for sf_id in records
+        ]
+        self.salesforce.fetch_salesforce_id_by_ccc_id.side_effect = lambda ccc_id: f"SF_{ccc_id}"
+        self.foo = User(ccc_id="FOO1", anthology_id=1, salesforce_id="SF_FOO1")
+        self.bar = User(ccc_id="BAR2", anthology_id=2)
+        self.users = {
+            ("ccc_id", "FOO1"): self.foo,
+            ("anthology_id", 1): self.foo,
+            ("ccc_id", "BAR2"): self.bar,
+            ("anthology_id", 2): self.bar,
+        }
+        self.events = [
+            ("student", {"id": 1, "studentNumber": "FOO1", "firstName": "Fo", "lastName": "Oo"}),
+            ("student_course", {"studentId": 2, "previousStatus": 7, "status": 8}),
+            ("student", {"id": 1, "studentNumber": "FOO1", "firstName": "Foo"}),
+            ("student_course", {"studentId": 1, "previousStatus": 10, "status": 11}),
+            ("student_course", {"studentId": 2, "previousStatus": 8, "status": 10}),
+            ("student", {"id": 3, "studentNumber": "UNKNOWN"}),
+        ]
+        self.student_calls = []
+
+        def update_student(session, salesforce, data, user=None, field_maps=None, flush=True):
+            self.student_calls.append((data, user, field_maps, flush))
+            salesforce.update_contact_record(user.salesforce_id, FirstName=data["firstName"])
+
+        patches = [
+            patch("propus.helpers.anthology_webhook_batch.load_users", return_value=self.users),
+            patch("propus.helpers.anthology_webhook_batch.configure_mappers"),
+            patch("propus.helpers.anthology_webhook_batch.selectinload"),
+            patch("propus.helpers.anthology_webhook_batch.create_field_map", return_value={"a": 1}),
+            patch(
+                "propus.helpers.anthology_webhook_batch.create_learner_status_map",
+                return_value={
+                    "Completed Essentials": 8,
+                    "Enrolled in Program Pathway": 10,
+                    "Started Program Pathway": 11,
+                },
+            ),
+            patch.dict(
+                "propus.helpers.anthology_webhook_batch.WEBHOOK_HANDLERS",
+                {"student": update_student, "student_course": update_student_course},
+            ),
+        ]
+        self.mocks = [p.start() for p in patches]
+        self.addCleanup(patch.stopall)
+
+    def test_coalesce_webhooks(self):
+        coalesced = coalesce_webhooks(self.events, self.users)
+
+        self.assertEqual(list(coalesced), [self.foo, self.bar])
+        self.assertEqual(
+            coalesced[self.foo],
+            [
+                ("student", {"id": 1, "studentNumber": "FOO1", "firstName": "Foo", "lastName": "Oo"}),
+                ("student_course", {"studentId": 1, "previousStatus": 10, "status": 11}),
+            ],
+        )
+        # The latest status, compared with the status before the burst
+        self.assertEqual(coalesced[self.bar], [("student_course", {"studentId": 2, "previousStatus": 7, "status": 10})])
+
+    def test_handle_anthology_webhooks(self):
+        handled = handle_anthology_webhooks(self.session, self.salesforce, self.events)
+
+        self.assertEqual(handled, {"student": 1, "student_course": 2})
+        # The lookup maps are built once, and the database written with a single commit
+        self.assertEqual(self.mocks[3].call_count, 2)
+        self.mocks[4].assert_called_once()
+        self.session.commit.assert_called_once()
+        self.assertEqual(len(self.student_calls), 1)
+        self.assertEqual(self.student_calls[0][2], {"suffix": {"a": 1}, "salutation": {"a": 1}})
+        self.assertFalse(self.student_calls[0][3])
+        self.assertEqual(self.foo.learner_status_id, 11)
+        self.assertEqual(self.bar.learner_status_id, 10)
+
+        # Only the missing Salesforce ID is fetched, and all contacts are updated in one request
+        self.salesforce.fetch_salesforce_id_by_ccc_id.assert_called_once_with("BAR2")
+        self.salesforce.update_contact_record.assert_not_called()
+        self.salesforce.update_contact_records.assert_called_once_with(
+            {
+                "SF_FOO1": {"FirstName": "Foo", "cfg_Learner_Status__c": "Started Program Pathway"},
+                "SF_BAR2": {"cfg_Learner_Status__c": "Enrolled in Program Pathway"},
+            }
+        )
+
+    def test_handle_no_known_users(self):
+        handled = handle_anthology_webhooks(self.session, self.salesforce, [("student", {"studentNumber": "X"})])
+        self.assertEqual(handled, {"student": 0, "student_course": 0})
+        self.session.commit.assert_not_called()
+
+    def test_salesforce_write_buffer_chunks(self):
+        buffer = SalesforceWriteBuffer(self.salesforce)
+        for i in range(5):
+            buffer.update_contact_record(f"SF_{i}", Phone=str(i))
+        buffer.update_contact_record(None, Phone="0")
+        self.assertEqual(len(buffer.flush(chunk_size=2)), 5)
+        self.assertEqual(self.salesforce.update_contact_records.call_count, 3)
+        self.assertEqual(buffer.contacts, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
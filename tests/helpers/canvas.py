@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from mock_alchemy.mocking import AlchemyMagicMock
 
 from propus.calbright_sql.enrollment import LMS, Enrollment
@@ -8,13 +8,19 @@ from propus.calbright_sql.user_lms import UserLms
 from propus.helpers.canvas import (
     create_canvas_user,
     create_course_sections,
+    create_course_sections_concurrently,
     get_canvas_id_from_user_lms_list,
     get_student_enrollment,
     create_initial_course_enrollment,
     create_subsequent_course_enrollment,
     enroll_instructors_in_sections,
     conclude_student_enrollments,
+    conclude_student_enrollments_concurrently,
+    enroll_instructors_in_sections_concurrently,
+    create_subsequent_course_enrollments_concurrently,
 )
+from propus.helpers.canvas_workflow import CanvasWorkflowExecutor
+from propus.helpers.exceptions import MissingCanvasUserId, MissingCourseLmsId, NoEnrollmentFound
 from propus.calbright_sql.user import User
 
 
@@ -88,6 +94,25 @@ class TestCanvasHelpers(unittest.TestCase):
         )
         self.assertFalse(sections_created)
 
+    def test_create_course_sections_concurrently(self):
+        self.test_name = "create_course_sections_concurrently"
+        sections = []
+        for section_id, course_lms_id in enumerate([10, 10, None]):
+            section = MagicMock(id=section_id, lms_id=None, section_name=f"BUS500-{section_id}")
+            section.program_version_course.course_version.lms_id = course_lms_id
+            sections.append(section)
+        session = MagicMock()
+        session.execute.return_value.scalars.return_value.all.return_value = sections
+        self.canvas.create_section.side_effect = lambda course_id, name, sis_section_id: {"id": f"{name}@{course_id}"}
+
+        report = create_course_sections_concurrently(
+            session=session, canvas=self.canvas, executor=CanvasWorkflowExecutor(self.canvas, min_interval=0)
+        )
+        self.assertEqual(sorted(report.succeeded), [0, 1])
+        self.assertIsInstance(report.failed[2], MissingCourseLmsId)
+        self.assertEqual([section.lms_id for section in sections], ["BUS500-0@10", "BUS500-1@10", None])
+        self.assertEqual(self.canvas.create_section.call_count, 2)
+
     def test_get_canvas_id_from_user_lms_list(self):
         self.test_name = "get_canvas_id_from_user_lms_list"
         canvas_id = get_canvas_id_from_user_lms_list(self.test_user_lms_list)
@@ -140,6 +165,69 @@ class TestCanvasHelpers(unittest.TestCase):
         )
         self.assertTrue(concluded_enrollments)
 
+    @patch("propus.helpers.canvas.get_student_enrollment")
+    def test_conclude_student_enrollments_concurrently(self, mock_get_student_enrollment):
+        self.test_name = "conclude_student_enrollments_concurrently"
+        enrolled = MagicMock()
+        enrolled.student.user.user_lms = self.test_user_lms_list
+        no_canvas_user = MagicMock()
+        no_canvas_user.student.user.user_lms = []
+        mock_get_student_enrollment.side_effect = [enrolled, no_canvas_user, NoEnrollmentFound(ccc_id="c3")]
+        self.canvas.list_enrollments.return_value = [{"id": 1, "course_id": 10}, {"id": 2, "course_id": 11}]
+
+        report = conclude_student_enrollments_concurrently(
+            ccc_ids=["c1", "c2", "c3"],
+            session=self.session,
+            canvas=self.canvas,
+            executor=CanvasWorkflowExecutor(self.canvas, min_interval=0),
+        )
+        self.assertEqual(report.succeeded, {"c1": 2})
+        self.assertIsInstance(report.failed["c2"], MissingCanvasUserId)
+        self.assertIsInstance(report.failed["c3"], NoEnrollmentFound)
+        self.assertEqual(self.canvas.conclude_delete_deactivate_enrollment.call_count, 2)
+
+    def test_enroll_instructors_in_sections_concurrently(self):
+        self.test_name = "enroll_instructors_in_sections_concurrently"
+        instructor_user = User(first_name="Ada", last_name="Lovelace", calbright_email="ada@calbright.org")
+        sections = []
+        for section_id in range(3):
+            section = MagicMock(id=section_id, lms_id=100 + section_id, instructor_enrollment_lms_id=None)
+            section.instructor.user = instructor_user
+            sections.append(section)
+        session = MagicMock()
+        session.execute.return_value.scalars.return_value.all.return_value = sections
+        self.canvas.create_user.return_value = {"id": 55}
+        self.canvas.create_enrollment.side_effect = lambda section_id, **_: {"id": section_id * 10}
+
+        report = enroll_instructors_in_sections_concurrently(
+            session=session, canvas=self.canvas, executor=CanvasWorkflowExecutor(self.canvas, min_interval=0)
+        )
+        self.assertTrue(report.ok)
+        # The instructor's Canvas account is only created once
+        self.canvas.create_user.assert_called_once()
+        session.add.assert_called_once()
+        self.assertEqual([section.instructor_enrollment_lms_id for section in sections], [1000, 1010, 1020])
+        self.assertEqual(self.canvas.create_enrollment.call_args.kwargs["user_id"], 55)
+
+    @patch("propus.helpers.canvas.get_next_course_section_id", side_effect=[200, None])
+    @patch("propus.helpers.canvas.get_student_enrollment")
+    def test_create_subsequent_course_enrollments_concurrently(self, *_):
+        self.test_name = "create_subsequent_course_enrollments_concurrently"
+        self.canvas.create_enrollment.return_value = {"id": 300}
+        report = create_subsequent_course_enrollments_concurrently(
+            completions=[
+                {"current_course_id": "10", "ccc_id": "c1", "canvas_user_id": 1},
+                {"current_course_id": "11", "ccc_id": "c2", "canvas_user_id": 2},
+            ],
+            session=self.session,
+            canvas=self.canvas,
+            executor=CanvasWorkflowExecutor(self.canvas, min_interval=0),
+        )
+        self.assertEqual(report.succeeded, {"c1": {"id": 300}, "c2": None})
+        self.canvas.create_enrollment.assert_called_once_with(
+            section_id=200, user_id=1, enrollment_type="StudentEnrollment"
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,78 @@
+import json
+import tempfile
+import unittest
+from unittest.mock import AsyncMock
+
+from propus.api_client import FailedRequest
+from propus.helpers.canvas_course_snapshot import CanvasCourseSnapshotCache
+from propus.helpers.canvas_workflow import CanvasWorkflowExecutor
+from propus.helpers.storage import LocalStorage
+
+
+class TestCanvasCourseSnapshotCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(self.directory.name)
+        self.canvas = AsyncMock()
+        self.updated_at = {"115": "2024-06-01T12:00:00Z", "116": "2024-06-02T12:00:00Z"}
+        self.canvas.get_course.side_effect = lambda course_id: [
+            {"id": course_id, "updated_at": self.updated_at[course_id]}
+        ]
+        self.canvas.get_course_modules.side_effect = lambda course_id, include: [{"name": f"module {course_id}"}]
+        self.canvas.get_course_assignment_groups.side_effect = lambda course_id, include: [{"name": "Milestones"}]
+        self.cache = CanvasCourseSnapshotCache(
+            self.canvas, self.storage, executor=CanvasWorkflowExecutor(self.canvas, min_interval=0)
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_get_many_crawls_missing_courses(self):
+        snapshots = self.cache.get_many([115, "116", 115])
+
+        self.assertEqual(set(snapshots), {"115", "116"})
+        self.assertEqual(snapshots["115"]["modules"], [{"name": "module 115"}])
+        self.assertEqual(snapshots["116"]["assignment_groups"], [{"name": "Milestones"}])
+        self.assertEqual(self.canvas.get_course.call_count, 2)
+        self.assertEqual(self.canvas.get_course_modules.call_count, 2)
+        self.canvas.get_course_assignment_groups.assert_any_call(
+            course_id="115", include=["assignments", "discussion_topic"]
+        )
+        stored = json.loads(self.storage.read("canvas_course_snapshots/course_115.json"))
+        self.assertEqual(stored, snapshots["115"])
+
+    def test_get_many_refetches_only_changed_courses(self):
+        self.cache.get_many([115, 116])
+        self.canvas.get_course_modules.reset_mock()
+        self.canvas.get_course_assignment_groups.reset_mock()
+
+        self.updated_at["116"] = "2024-07-01T12:00:00Z"
+        snapshots = CanvasCourseSnapshotCache(
+            self.canvas, self.storage, executor=CanvasWorkflowExecutor(self.canvas, min_interval=0)
+        ).get_many([115, 116])
+
+        self.canvas.get_course_modules.assert_called_once_with(course_id="116", include="items")
+        self.canvas.get_course_assignment_groups.assert_called_once()
+        self.assertEqual(snapshots["116"]["updated_at"], "2024-07-01T12:00:00Z")
+        self.assertEqual(snapshots["115"]["updated_at"], "2024-06-01T12:00:00Z")
+
+    def test_get_uses_validated_snapshot(self):
+        self.cache.get_many([115])
+        self.assertEqual(self.cache.get(115)["course_id"], "115")
+        self.assertEqual(self.canvas.get_course.call_count, 1)
+
+        self.cache.invalidate(115)
+        self.assertIsNone(self.cache.read_snapshot(115))
+        self.cache.get(115)
+        self.assertEqual(self.canvas.get_course.call_count, 2)
+        self.assertEqual(self.canvas.get_course_modules.call_count, 2)
+
+    def test_get_many_raises_on_failure(self):
+        self.canvas.get_course_modules.side_effect = FailedRequest(404, "not found")
+        with self.assertRaises(FailedRequest):
+            self.cache.get_many([115])
+        self.assertIsNone(self.cache.read_snapshot(115))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import csv
+import io
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from propus.api_client import FailedRequest
+from propus.helpers.canvas_page_view_export import (
+    PAGE_VIEW_EXPORT_SOURCE,
+    export_page_views,
+    flatten_page_view,
+    serialize_rows,
+)
+from propus.helpers.canvas_workflow import CanvasWorkflowExecutor
+from propus.helpers.storage import LocalStorage
+
+
+class TestCanvasPageViewExport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(self.directory.name)
+        self.session = MagicMock()
+        self.canvas = AsyncMock()
+        self.canvas.get_user_page_views.side_effect = lambda user_id, start_time, **_: [
+            {
+                "id": f"{user_id}-{start_time.date()}",
+                "url": "https://calbright.instructure.com/courses/115",
+                "interaction_seconds": 12.5,
+                "participated": True,
+                "links": {"user": int(user_id), "context": 115},
+            }
+        ]
+        self.executor = CanvasWorkflowExecutor(self.canvas, min_interval=0)
+        self.watermarks = {}
+        get_patch = patch(
+            "propus.helpers.canvas_page_view_export.get_watermarks",
+            side_effect=lambda session, source, keys: dict(self.watermarks),
+        )
+        set_patch = patch(
+            "propus.helpers.canvas_page_view_export.set_watermarks",
+            side_effect=lambda session, source, watermarks: self.watermarks.update(watermarks),
+        )
+        get_patch.start()
+        self.set_watermarks = set_patch.start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def read_csv(self, key):
+        return list(csv.DictReader(io.StringIO(self.storage.read(key))))
+
+    def test_flatten_page_view(self):
+        row = flatten_page_view({"id": 1, "links": {"context": 115, "asset": None}, "participated": False}, "42")
+        self.assertEqual(row["id"], "1")
+        self.assertEqual(row["user_id"], "42")
+        self.assertEqual(row["context_id"], "115")
+        self.assertIsNone(row["asset_id"])
+        self.assertFalse(row["participated"])
+
+    def test_serialize_rows_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            serialize_rows([], "xlsx")
+
+    def test_export_page_views(self):
+        report = export_page_views(
+            self.session,
+            self.canvas,
+            self.storage,
+            user_ids=[1, 2],
+            start=date(2024, 6, 1),
+            until=date(2024, 6, 3),
+            executor=self.executor,
+        )
+
+        self.assertTrue(report.ok)
+        self.assertEqual(report.succeeded, {"2024-06-01": 2, "2024-06-02": 2})
+        self.assertEqual(self.canvas.get_user_page_views.call_count, 4)
+        rows = self.read_csv("canvas_page_views/date=2024-06-02/user_1.csv")
+        self.assertEqual(rows[0]["id"], "1-2024-06-02")
+        self.assertEqual(rows[0]["user_id"], "1")
+        self.assertEqual(rows[0]["context_id"], "115")
+        self.assertTrue(self.storage.exists("canvas_page_views/date=2024-06-01/_SUCCESS"))
+        self.assertEqual(self.watermarks, {"canvas_page_views": datetime(2024, 6, 3)})
+        self.set_watermarks.assert_called_with(
+            self.session, PAGE_VIEW_EXPORT_SOURCE, {"canvas_page_views": datetime(2024, 6, 3)}
+        )
+        kwargs = self.canvas.get_user_page_views.call_args.kwargs
+        self.assertEqual(kwargs["per_page"], 100)
+
+    def test_export_page_views_resumes_from_watermark(self):
+        self.watermarks["canvas_page_views"] = datetime(2024, 6, 2)
+        report = export_page_views(
+            self.session, self.canvas, self.storage, user_ids=[1], until=date(2024, 6, 3), executor=self.executor
+        )
+        self.assertEqual(list(report.succeeded), ["2024-06-02"])
+        self.canvas.get_user_page_views.assert_called_once()
+
+    def test_export_page_views_restarts_failed_window(self):
+        def get_user_page_views(user_id, **_):
+            if user_id == "2":
+                raise FailedRequest(500, "error")
+            return []
+
+        self.canvas.get_user_page_views.side_effect = get_user_page_views
+        report = export_page_views(
+            self.session,
+            self.canvas,
+            self.storage,
+            user_ids=[1, 2],
+            start=date(2024, 6, 1),
+            until=date(2024, 6, 3),
+            executor=self.executor,
+        )
+        self.assertEqual(list(report.failed), ["2024-06-01"])
+        self.assertEqual(self.watermarks, {})
+        self.assertTrue(self.storage.exists("canvas_page_views/date=2024-06-01/user_1.csv"))
+        self.assertFalse(self.storage.exists("canvas_page_views/date=2024-06-01/_SUCCESS"))
+
+        self.canvas.get_user_page_views.reset_mock()
+        self.canvas.get_user_page_views.side_effect = lambda **_: []
+        report = export_page_views(
+            self.session,
+            self.canvas,
+            self.storage,
+            user_ids=[1, 2],
+            start=date(2024, 6, 1),
+            until=date(2024, 6, 2),
+            executor=self.executor,
+        )
+        self.assertTrue(report.ok)
+        # Only the user which failed is fetched again
+        self.canvas.get_user_page_views.assert_called_once()
+        self.assertEqual(self.canvas.get_user_page_views.call_args.kwargs["user_id"], "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,241 @@
+import csv
+import io
+import unittest
+import zipfile
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from propus.helpers.canvas_sis_import import (
+    SisImportManifest,
+    link_sis_import_results,
+    map_sis_import_errors,
+    provision_canvas_with_sis_import,
+    wait_for_sis_import,
+    write_sis_import_files,
+)
+from propus.helpers.exceptions import SisImportFailed
+
+
+class TestCanvasSisImportHelpers(unittest.TestCase):
+    def setUp(self) -> None:
+        self.canvas = AsyncMock()
+        self.canvas.auth_providers = {"okta": 105, "google": 106}
+        self.canvas.get_course.return_value = [{"id": 10, "sis_course_id": "SIS-10"}]
+
+        self.instructor_rows = [
+            SimpleNamespace(
+                section_id="cvs-1",
+                section_name="T1-IT-101",
+                section_lms_id=None,
+                course_lms_id="10",
+                user_id="user-instructor",
+                first_name="Ada",
+                last_name="Lovelace",
+                calbright_email="ada@calbright.org",
+                has_canvas_user=False,
+            )
+        ]
+        self.student_rows = [
+            SimpleNamespace(
+                enrollment_course_term_id="ect-1",
+                section_name="T1-IT-101",
+                course_lms_id="10",
+                user_id="user-student-1",
+                ccc_id="ABC123",
+                first_name="Tony",
+                last_name="Pizza",
+                calbright_email="tony.pizza@calbright.org",
+                has_canvas_user=False,
+            ),
+            SimpleNamespace(
+                enrollment_course_term_id="ect-2",
+                section_name="T1-IT-101",
+                course_lms_id="10",
+                user_id="user-student-2",
+                ccc_id="DEF456",
+                first_name="Sally",
+                last_name="Ride",
+                calbright_email="sally.ride@calbright.org",
+                has_canvas_user=True,
+            ),
+        ]
+        self.section_rows = [SimpleNamespace(section_id="cvs-1", section_name="T1-IT-101", course_lms_id="10")]
+
+        self.session = MagicMock()
+        self.session.execute.side_effect = [
+            self.instructor_rows,
+            self.student_rows,
+            self.section_rows,
+            self.instructor_rows,
+            self.student_rows,
+        ]
+
+    def read_csv(self, zip_file, name):
+        with zip_file.open(name) as csv_file:
+            return list(csv.reader(io.TextIOWrapper(csv_file, encoding="utf-8")))
+
+    def test_write_sis_import_files(self):
+        file_obj = io.BytesIO()
+        manifest = write_sis_import_files(self.session, self.canvas, ["ABC123", "DEF456"], file_obj)
+
+        with zipfile.ZipFile(file_obj) as zip_file:
+            users = self.read_csv(zip_file, "users.csv")
+            sections = self.read_csv(zip_file, "sections.csv")
+            enrollments = self.read_csv(zip_file, "enrollments.csv")
+
+        self.assertEqual(users[0][0], "user_id")
+        self.assertEqual([row[0] for row in users[1:]], ["ada@calbright.org", "ABC123"])
+        self.assertEqual([row[2] for row in users[1:]], ["105", "106"])
+        self.assertEqual(sections[1:], [["T1-IT-101", "SIS-10", "T1-IT-101", "active"]])
+        self.assertEqual(
+            enrollments[1:],
+            [
+                ["SIS-10", "ada@calbright.org", "teacher", "T1-IT-101", "active"],
+                ["SIS-10", "ABC123", "student", "T1-IT-101", "active"],
+                ["SIS-10", "DEF456", "student", "T1-IT-101", "active"],
+            ],
+        )
+        self.assertEqual(manifest.users, ["user-instructor", "user-student-1"])
+        self.assertEqual(manifest.sections, ["cvs-1"])
+        self.assertEqual(
+            manifest.enrollments,
+            [
+                ("course_version_section", "cvs-1"),
+                ("enrollment_course_term", "ect-1"),
+                ("enrollment_course_term", "ect-2"),
+            ],
+        )
+        self.assertEqual(manifest.sections_by_course, {"10": {"T1-IT-101"}})
+        # The sis_course_id is only fetched once per course
+        self.canvas.get_course.assert_called_once_with(course_id="10")
+
+    def test_write_sis_import_files_skips_courses_without_sis_id(self):
+        self.canvas.get_course.return_value = [{"id": 10, "sis_course_id": None}]
+        manifest = write_sis_import_files(self.session, self.canvas, ["ABC123"], io.BytesIO())
+
+        self.assertEqual(manifest.sections, [])
+        self.assertEqual(manifest.enrollments, [])
+        self.assertEqual(len(manifest.skipped), 4)
+
+    @patch("propus.helpers.canvas_sis_import.sleep")
+    def test_wait_for_sis_import(self, mock_sleep):
+        self.canvas.get_sis_import.side_effect = [
+            {"id": 12, "workflow_state": "importing", "progress": 50},
+            {"id": 12, "workflow_state": "imported", "progress": 100},
+        ]
+        self.assertEqual(wait_for_sis_import(self.canvas, 12, wait=1)["workflow_state"], "imported")
+        mock_sleep.assert_called_once_with(1)
+
+    @patch("propus.helpers.canvas_sis_import.sleep")
+    def test_wait_for_sis_import_failed(self, _):
+        self.canvas.get_sis_import.return_value = {"id": 12, "workflow_state": "failed", "processing_errors": []}
+        with self.assertRaises(SisImportFailed):
+            wait_for_sis_import(self.canvas, 12)
+
+    @patch("propus.helpers.canvas_sis_import.sleep")
+    def test_wait_for_sis_import_timeout(self, _):
+        self.canvas.get_sis_import.return_value = {"id": 12, "workflow_state": "importing"}
+        with self.assertRaises(SisImportFailed):
+            wait_for_sis_import(self.canvas, 12, max_tries=2)
+        self.assertEqual(self.canvas.get_sis_import.call_count, 3)
+
+    def test_map_sis_import_errors(self):
+        manifest = SisImportManifest(
+            users=["user-1", "user-2"],
+            sections=["cvs-1"],
+            enrollments=[("enrollment_course_term", "ect-1")],
+        )
+        errors = [
+            {"file": "users.csv", "row": 3, "message": "Invalid login"},
+            {"file": "enrollments.csv", "row": 2, "message": "Unknown section"},
+            {"file": "enrollments.csv", "row": 9, "message": "Out of range"},
+            {"file": None, "row": None, "message": "Generic failure"},
+        ]
+        self.assertEqual(
+            map_sis_import_errors(errors, manifest),
+            {
+                "users": {"user-2": ["Invalid login"]},
+                "sections": {},
+                "enrollments": {("enrollment_course_term", "ect-1"): ["Unknown section"]},
+                "unmapped": errors[2:],
+            },
+        )
+
+    def test_link_sis_import_results(self):
+        manifest = SisImportManifest(
+            user_ids_by_sis_id={"ada@calbright.org": "user-instructor", "ABC123": "user-student-1"},
+            section_ids_by_name={"T1-IT-101": "cvs-1"},
+            instructor_sections_by_name={"T1-IT-101": "cvs-1"},
+            sections_by_course={"10": {"T1-IT-101"}},
+        )
+        self.canvas.list_enrollments.return_value = [
+            {
+                "id": 500,
+                "type": "TeacherEnrollment",
+                "user_id": 1,
+                "sis_user_id": "ada@calbright.org",
+                "sis_section_id": "T1-IT-101",
+                "course_section_id": 77,
+            },
+            {
+                "id": 501,
+                "type": "StudentEnrollment",
+                "user_id": 2,
+                "sis_user_id": "ABC123",
+                "sis_section_id": "T1-IT-101",
+                "course_section_id": 77,
+            },
+            {
+                "id": 502,
+                "type": "StudentEnrollment",
+                "user_id": 3,
+                "sis_user_id": "DEF456",
+                "sis_section_id": "T1-IT-101",
+                "course_section_id": 77,
+            },
+        ]
+        session = MagicMock()
+
+        self.assertEqual(
+            link_sis_import_results(session, self.canvas, manifest),
+            {"user_lms_created": 2, "sections_linked": 1, "instructor_enrollments_linked": 1},
+        )
+        self.canvas.list_enrollments.assert_called_once_with(
+            object_type="course", object_id="10", sis_section_id=["T1-IT-101"]
+        )
+        # One bulk insert for user_lms and one bulk update for course_version_section
+        self.assertEqual(session.execute.call_count, 2)
+        self.assertEqual(
+            [record["lms_id"] for record in session.execute.call_args_list[0].args[1]],
+            ["1", "2"],
+        )
+        self.assertEqual(
+            session.execute.call_args_list[1].args[1],
+            [{"id": "cvs-1", "lms_id": 77, "instructor_enrollment_lms_id": "500"}],
+        )
+        session.commit.assert_called_once()
+
+    @patch("propus.helpers.canvas_sis_import.sleep")
+    def test_provision_canvas_with_sis_import(self, _):
+        self.canvas.create_sis_import.return_value = {"id": 12, "workflow_state": "created"}
+        self.canvas.get_sis_import.return_value = {"id": 12, "workflow_state": "imported_with_messages"}
+        self.canvas.get_sis_import_errors.return_value = [{"file": "users.csv", "row": 3, "message": "Bad email"}]
+        self.canvas.list_enrollments.return_value = []
+
+        summary = provision_canvas_with_sis_import(self.session, self.canvas, ["ABC123", "DEF456"])
+
+        self.assertEqual(summary["sis_import_id"], 12)
+        self.assertEqual(summary["workflow_state"], "imported_with_messages")
+        self.assertEqual(summary["counts"], {"users": 2, "sections": 1, "enrollments": 3, "skipped": 0})
+        self.assertEqual(summary["errors"]["users"], {"user-student-1": ["Bad email"]})
+        self.canvas.create_sis_import.assert_called_once()
+
+    def test_provision_canvas_with_sis_import_nothing_to_do(self):
+        self.session.execute.side_effect = [[], [], [], [], []]
+        summary = provision_canvas_with_sis_import(self.session, self.canvas, [])
+        self.assertIsNone(summary["sis_import_id"])
+        self.canvas.create_sis_import.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
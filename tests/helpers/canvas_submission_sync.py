@@ -0,0 +1,155 @@
+import datetime
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from propus.calbright_sql.assessment_submission import AssessmentSubmissionStatus
+from propus.helpers.canvas_submission_sync import (
+    SUBMISSION_SYNC_SOURCE,
+    WATERMARK_OVERLAP,
+    build_submission_rows,
+    get_submission_status,
+    sync_canvas_submissions,
+    update_course_progress,
+    upsert_submission_rows,
+)
+from propus.helpers.canvas_workflow import CanvasWorkflowExecutor
+
+
+class TestCanvasSubmissionSync(unittest.TestCase):
+    def setUp(self) -> None:
+        self.canvas = AsyncMock()
+        self.session = MagicMock()
+        self.assessment_id = uuid.uuid4()
+        self.enrollment_id = uuid.uuid4()
+        self.assessment_rows = [SimpleNamespace(id=self.assessment_id, lms_id="258", required_percentage_to_pass=0.8)]
+        self.enrollment_rows = [SimpleNamespace(lms_id="42", enrollment_id=self.enrollment_id)]
+        self.submission = {
+            "id": 900,
+            "assignment_id": 258,
+            "user_id": 42,
+            "attempt": 2,
+            "score": 9.0,
+            "grade": "9",
+            "submitted_at": "2024-06-01T12:00:00Z",
+            "workflow_state": "graded",
+            "assignment": {"points_possible": 10},
+        }
+
+    def test_get_submission_status(self):
+        self.assertEqual(get_submission_status(self.submission, 0.8), AssessmentSubmissionStatus.passed)
+        self.assertEqual(get_submission_status(self.submission, 0.95), AssessmentSubmissionStatus.failed)
+        self.assertEqual(
+            get_submission_status(self.submission | {"workflow_state": "submitted"}, 0.8),
+            AssessmentSubmissionStatus.submitted,
+        )
+        self.assertEqual(
+            get_submission_status(self.submission | {"grade": "complete", "score": 0}, 0.8),
+            AssessmentSubmissionStatus.passed,
+        )
+        self.assertEqual(
+            get_submission_status(self.submission | {"assignment": {"points_possible": 0}}, 0.8),
+            AssessmentSubmissionStatus.submitted,
+        )
+
+    def test_build_submission_rows(self):
+        self.session.execute.side_effect = [self.assessment_rows, self.enrollment_rows]
+        rows = build_submission_rows(
+            self.session,
+            [
+                self.submission,
+                # Returned by both the submitted_since and the graded_since request
+                self.submission,
+                # Unknown student
+                self.submission | {"id": 901, "user_id": 43},
+                # Never submitted
+                self.submission | {"id": 902, "submitted_at": None},
+            ],
+        )
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "enrollment_id": self.enrollment_id,
+                    "assessment_id": self.assessment_id,
+                    "attempt": 2,
+                    "score": 9.0,
+                    "grade": "9",
+                    "submission_timestamp": datetime.datetime(2024, 6, 1, 12, 0),
+                    "lms": rows[0]["lms"],
+                    "lms_id": "900",
+                    "status": AssessmentSubmissionStatus.passed,
+                }
+            ],
+        )
+        # One query for the assessments and one for the enrollments, whatever the number of submissions
+        self.assertEqual(self.session.execute.call_count, 2)
+
+    def test_build_submission_rows_nothing_submitted(self):
+        self.assertEqual(build_submission_rows(self.session, [self.submission | {"submitted_at": None}]), [])
+        self.session.execute.assert_not_called()
+
+    def test_upsert_submission_rows(self):
+        self.session.execute.side_effect = [self.assessment_rows, self.enrollment_rows, None]
+        rows = build_submission_rows(self.session, [self.submission])
+        self.assertEqual(upsert_submission_rows(self.session, rows), 1)
+        sql = str(self.session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        self.assertIn("ON CONFLICT (lms_id) DO UPDATE", sql)
+        self.assertIn("IS DISTINCT FROM", sql)
+        self.assertEqual(upsert_submission_rows(self.session, []), 0)
+
+    def test_update_course_progress(self):
+        update_course_progress(self.session, "115", {self.enrollment_id})
+        sql = str(self.session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        self.assertTrue(sql.startswith("UPDATE enrollment_course_term SET progress="))
+        self.session.reset_mock()
+        update_course_progress(self.session, "115", set())
+        self.session.execute.assert_not_called()
+
+    @patch("propus.helpers.canvas_submission_sync.set_watermarks")
+    @patch("propus.helpers.canvas_submission_sync.get_watermarks")
+    @patch("propus.helpers.canvas_submission_sync.update_course_progress")
+    @patch("propus.helpers.canvas_submission_sync.upsert_submission_rows", return_value=1)
+    @patch("propus.helpers.canvas_submission_sync.build_submission_rows")
+    def test_sync_canvas_submissions(self, mock_build, _, mock_progress, mock_get_watermarks, mock_set_watermarks):
+        watermark = datetime.datetime(2024, 6, 1, 12, 0)
+        mock_get_watermarks.return_value = {"115": watermark}
+        mock_build.return_value = [{"enrollment_id": self.enrollment_id}]
+
+        def list_submissions(object_id, **kwargs):
+            if object_id == "117":
+                raise Exception("Canvas is down")
+            return [self.submission]
+
+        self.canvas.list_assignment_submissions_for_multiple_assignments.side_effect = list_submissions
+        report = sync_canvas_submissions(
+            self.session,
+            self.canvas,
+            course_lms_ids=["115", "116", "117"],
+            executor=CanvasWorkflowExecutor(self.canvas, min_interval=0, commit_batch_size=1),
+        )
+
+        self.assertEqual(report.succeeded, {"115": 2, "116": 1})
+        self.assertEqual(list(report.failed), ["117"])
+        calls = self.canvas.list_assignment_submissions_for_multiple_assignments.call_args_list
+        incremental = [c.kwargs for c in calls if c.kwargs["object_id"] == "115"]
+        since = (watermark - WATERMARK_OVERLAP).replace(tzinfo=datetime.timezone.utc)
+        self.assertCountEqual(
+            [k.get("submitted_since") or k.get("graded_since") for k in incremental],
+            [since, since],
+        )
+        full = [c.kwargs for c in calls if c.kwargs["object_id"] == "116"]
+        self.assertNotIn("submitted_since", full[0])
+        mock_progress.assert_called_with(self.session, mock_progress.call_args.args[1], {self.enrollment_id})
+        # Only the courses which fully synced get their watermark moved
+        source, watermarks = mock_set_watermarks.call_args.args[1:]
+        self.assertEqual(source, SUBMISSION_SYNC_SOURCE)
+        self.assertEqual(set(watermarks), {"115", "116"})
+        self.assertGreater(watermarks["115"], watermark)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from propus.api_client import FailedRequest, TooManyRequests
+from propus.helpers.canvas_workflow import CanvasTask, CanvasWorkflowExecutor, WorkflowReport, is_rate_limited
+
+
+class TestCanvasWorkflowExecutor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.canvas = AsyncMock()
+        self.session = MagicMock()
+        self.executor = CanvasWorkflowExecutor(self.canvas, max_concurrency=4, min_interval=0, retry_wait=0)
+
+    def test_is_rate_limited(self):
+        self.assertTrue(is_rate_limited(TooManyRequests()))
+        self.assertTrue(is_rate_limited(FailedRequest(403, "403 Forbidden (Rate Limit Exceeded)")))
+        self.assertFalse(is_rate_limited(FailedRequest(403, "user not authorized to perform that action")))
+        self.assertFalse(is_rate_limited(ValueError()))
+
+    def test_run(self):
+        self.canvas.create_enrollment.side_effect = lambda section_id, **_: {"id": section_id * 10}
+        updated = {}
+        tasks = [
+            CanvasTask(
+                key=section_id,
+                method="create_enrollment",
+                kwargs={"section_id": section_id, "user_id": 1},
+                on_success=lambda result, section_id=section_id: updated.update({section_id: result["id"]}),
+            )
+            for section_id in range(1, 6)
+        ]
+        report = self.executor.run(tasks, session=self.session)
+
+        self.assertTrue(report.ok)
+        self.assertEqual(report.succeeded, {i: {"id": i * 10} for i in range(1, 6)})
+        self.assertEqual(updated, {i: i * 10 for i in range(1, 6)})
+        self.assertEqual(self.canvas.create_enrollment.call_count, 5)
+        self.session.commit.assert_called_once()
+
+    def test_run_commits_in_batches(self):
+        self.canvas.create_enrollment.return_value = {"id": 1}
+        self.executor.commit_batch_size = 2
+        tasks = [CanvasTask(key=i, method="create_enrollment", on_success=lambda _: None) for i in range(5)]
+        self.executor.run(tasks, session=self.session)
+        self.assertEqual(self.session.commit.call_count, 3)
+
+    def test_run_reports_failures_per_item(self):
+        def create_enrollment(section_id, **_):
+            if section_id == 2:
+                raise FailedRequest(400, "bad section")
+            return {"id": section_id}
+
+        self.canvas.create_enrollment.side_effect = create_enrollment
+        tasks = [CanvasTask(key=i, method="create_enrollment", kwargs={"section_id": i}) for i in range(1, 4)]
+        report = self.executor.run(tasks)
+
+        self.assertFalse(report.ok)
+        self.assertEqual(set(report.succeeded), {1, 3})
+        self.assertIsInstance(report.failed[2], FailedRequest)
+        # Non rate limit failures are not retried
+        self.assertEqual(self.canvas.create_enrollment.call_count, 3)
+
+    def test_run_reports_failed_commits(self):
+        self.canvas.create_enrollment.return_value = {"id": 1}
+        self.session.commit.side_effect = Exception("integrity error")
+        tasks = [CanvasTask(key=i, method="create_enrollment", on_success=lambda _: None) for i in range(2)]
+        report = self.executor.run(tasks, session=self.session)
+
+        self.assertEqual(set(report.failed), {0, 1})
+        self.session.rollback.assert_called_once()
+
+    def test_run_rolls_back_failed_callbacks(self):
+        self.canvas.create_enrollment.return_value = {"id": 1}
+
+        def on_success(_):
+            raise Exception("bad update")
+
+        report = self.executor.run(
+            [CanvasTask(key="a1", method="create_enrollment", on_success=on_success)], session=self.session
+        )
+        self.assertEqual(list(report.failed), ["a1"])
+        self.session.rollback.assert_called_once()
+        self.session.commit.assert_not_called()
+
+    @patch("propus.helpers.canvas_workflow.sleep")
+    def test_run_retries_rate_limited_calls(self, _):
+        self.canvas.list_enrollments.side_effect = [
+            FailedRequest(403, "403 Forbidden (Rate Limit Exceeded)"),
+            TooManyRequests(),
+            [{"id": 1}],
+        ]
+        report = self.executor.run([CanvasTask(key="a1", method="list_enrollments")])
+
+        self.assertEqual(report.succeeded, {"a1": [{"id": 1}]})
+        self.assertEqual(self.canvas.list_enrollments.call_count, 3)
+
+    @patch("propus.helpers.canvas_workflow.sleep")
+    def test_run_gives_up_after_max_retries(self, _):
+        self.canvas.list_enrollments.side_effect = TooManyRequests()
+        self.executor.max_retries = 2
+        report = self.executor.run([CanvasTask(key="a1", method="list_enrollments")])
+
+        self.assertIsInstance(report.failed["a1"], TooManyRequests)
+        self.assertEqual(self.canvas.list_enrollments.call_count, 3)
+
+    def test_run_streams_tasks(self):
+        self.canvas.get_user_page_views.return_value = [{"id": 1}]
+        submitted = []
+
+        def tasks():
+            for i in range(20):
+                submitted.append(i)
+                # Tasks are consumed a few ahead of the workers rather than all at once
+                self.assertLessEqual(len(submitted) - self.canvas.get_user_page_views.call_count, 9)
+                yield CanvasTask(key=i, method="get_user_page_views")
+
+        report = self.executor.run(tasks(), keep_results=False)
+        self.assertEqual(report.succeeded, {i: None for i in range(20)})
+        self.assertEqual(self.canvas.get_user_page_views.call_count, 20)
+
+    def test_report_merge(self):
+        report = WorkflowReport(succeeded={"a": 1, "b": 2})
+        report.merge(WorkflowReport(succeeded={"c": 3}, failed={"b": ValueError()}))
+        self.assertEqual(report.succeeded, {"a": 1, "c": 3})
+        self.assertEqual(list(report.failed), ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,16 @@
+import threading
 import unittest
+from unittest.mock import MagicMock, patch
 
-from propus.helpers.field_maps import extract_data_based_on_mapping
+from propus.helpers import field_maps
+from propus.helpers.field_maps import (
+    create_gender_map,
+    create_pronoun_map,
+    create_pronoun_map_sf,
+    create_program_version_signature_map,
+    extract_data_based_on_mapping,
+    invalidate_field_maps,
+)
 
 
 class TestFieldMaps(unittest.TestCase):
@@ -29,6 +39,10 @@ class TestFieldMaps(unittest.TestCase):
             }
         }
         self.empty_map = {}
+        invalidate_field_maps()
+        self.addCleanup(invalidate_field_maps)
+        self.session = MagicMock()
+        self.session.get_bind.return_value.url.render_as_string.return_value = "postgresql://calbright/prod"
 
     def test_extract_data_with_valid_mapping(self):
         result = extract_data_based_on_mapping(self.data, self.dict_to_column_mapping)
@@ -45,6 +59,74 @@ class TestFieldMaps(unittest.TestCase):
         self.expected_mapping_result["student"].pop(value)
         self.assertDictEqual(result, self.expected_mapping_result)
 
+    @patch("propus.helpers.field_maps.create_field_map")
+    def test_field_map_built_once(self, mock_create_field_map):
+        mock_create_field_map.return_value = {"Female": 1, "No selection": 2}
+        threads = [threading.Thread(target=create_gender_map, args=(self.session,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        gender_map = create_gender_map(self.session)
+        self.assertEqual(gender_map, {"Female": 1, "No selection": 2, None: 2})
+        mock_create_field_map.assert_called_once()
+
+        # Changing the returned map does not change the cache
+        gender_map["Male"] = 3
+        self.assertNotIn("Male", create_gender_map(self.session))
+
+        # Another database gets its own map
+        other = MagicMock()
+        other.get_bind.return_value.url.render_as_string.return_value = "postgresql://calbright/stage"
+        create_gender_map(other)
+        self.assertEqual(mock_create_field_map.call_count, 2)
+
+    @patch("propus.helpers.field_maps.create_field_map")
+    def test_field_map_ttl(self, mock_create_field_map):
+        mock_create_field_map.return_value = {}
+        with patch.object(field_maps, "FIELD_MAP_TTL", 0):
+            create_gender_map(self.session)
+            create_gender_map(self.session)
+        self.assertEqual(mock_create_field_map.call_count, 2)
+
+    @patch("propus.helpers.field_maps.create_field_map")
+    def test_invalidate_field_maps(self, mock_create_field_map):
+        mock_create_field_map.return_value = {"He/Him/His": 1, "She/Her/Hers": 2, "They/Them/Theirs": 3}
+        create_pronoun_map_sf(self.session)
+        create_gender_map(self.session)
+        self.assertEqual(mock_create_field_map.call_count, 2)
+
+        # The Salesforce variant is dropped with the map it is built from
+        invalidate_field_maps("create_pronoun_map")
+        create_pronoun_map_sf(self.session)
+        create_pronoun_map(self.session)
+        create_gender_map(self.session)
+        self.assertEqual(mock_create_field_map.call_count, 3)
+
+        invalidate_field_maps(session=self.session)
+        create_gender_map(self.session)
+        self.assertEqual(mock_create_field_map.call_count, 4)
+
+    def test_create_program_version_signature_map(self):
+        self.session.execute.return_value.all.return_value = [
+            ("Data Analysis", "pv2", "BUS500", 2.0),
+            ("Data Analysis", "pv2", "BUS501", 2.0),
+            ("Data Analysis", "pv3", "BUS500", 3.0),
+            ("Data Analysis", "pv3", "BUS501", 3.0),
+            ("IT Support", "pv5", "IT500", 5.0),
+        ]
+        signatures = create_program_version_signature_map(self.session)
+        self.assertEqual(signatures[("Data Analysis", frozenset({("BUS501", 3.0), ("BUS500", 3.0)}))], "pv3")
+        self.assertEqual(signatures[("IT Support", frozenset({("IT500", 5.0)}))], "pv5")
+        self.assertEqual(len(signatures), 3)
+
+        # Read once, until invalidated
+        create_program_version_signature_map(self.session)
+        self.session.execute.assert_called_once()
+        invalidate_field_maps("create_program_version_signature_map")
+        create_program_version_signature_map(self.session)
+        self.assertEqual(self.session.execute.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
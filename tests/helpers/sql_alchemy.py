@@ -1,25 +1,39 @@
+import asyncio
 import unittest
 import uuid
 
 from mock_alchemy.mocking import AlchemyMagicMock
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.exc import NoResultFound
-from unittest.mock import patch, MagicMock
+from sqlalchemy.dialects import postgresql
+from unittest.mock import AsyncMock, patch, MagicMock
 
 from propus.helpers.exceptions import InvalidKeyList
 from propus.helpers.input_validations import validate_uuid
 from propus.helpers.sql_alchemy import (
+    async_bulk_upsert,
+    async_get_or_create,
     build_query,
+    bulk_upsert,
     create_field_map,
+    create_field_map_from_composite_key,
     create_field_map_many_to_many,
+    get_column_validators,
     get_or_create,
     get_validation_function_by_model_field,
     update_or_create,
     map_value_to_foreign_key,
     apply_mappings,
+    resolve_mappings,
+    find_enum_value,
     upsert_changes,
+    KEYS_PER_QUERY,
 )
 from propus.calbright_sql.salutation import Salutation
+from propus.calbright_sql.suffix import Suffix
+from propus.calbright_sql.term import Term
 from propus.calbright_sql.course import Course
+from propus.calbright_sql.expressed_interest import LeadSource
 from propus.calbright_sql.program_version_course import ProgramVersionCourse
 
 
@@ -97,8 +111,9 @@ class TestSqlAlchemyHelpers(unittest.TestCase):
             build_query(None, self.fields)
 
     def test_create_field_map(self):
-        self.session.scalars.return_value.all.return_value = [self.salutation]
+        self.session.execute.return_value.all.return_value = [(self.salutation.salutation, None)]
         field_map = create_field_map(self.session, Salutation, map_from="salutation")
+        self.assertEqual(list(field_map), [self.salutation.salutation])
 
         for k, v in field_map.items():
             self.assertEqual(k, self.salutation.salutation)
@@ -113,18 +128,25 @@ class TestSqlAlchemyHelpers(unittest.TestCase):
             self.assertIsNone(v[0])
 
     def test_create_field_map_many_to_many_single_mapped_fields(self):
-        with patch("propus.helpers.sql_alchemy.select", return_value=Course) as mock_select:
-            self.session.scalars.return_value.all.return_value = [self.course1, self.course2]
-            expected_field_map = {
-                (getattr(self.course1, "course_name"),): [getattr(self.course1, "course_id")],
-                (getattr(self.course2, "course_name"),): [getattr(self.course2, "course_id")],
-            }
-            field_map = create_field_map_many_to_many(self.session, Course, ["course_name"], ["course_id"])
-            mock_select.assert_called_once_with(Course)
-            self.assertEqual(field_map, expected_field_map)
+        self.session.execute.return_value.all.return_value = [
+            (course.course_name, course.course_id) for course in self.courses
+        ]
+        expected_field_map = {
+            (getattr(self.course1, "course_name"),): [getattr(self.course1, "course_id")],
+            (getattr(self.course2, "course_name"),): [getattr(self.course2, "course_id")],
+        }
+        field_map = create_field_map_many_to_many(self.session, Course, ["course_name"], ["course_id"])
+        # Only the mapped columns are selected
+        self.assertEqual(
+            [c.name for c in self.session.execute.call_args.args[0].selected_columns], ["course_name", "course_id"]
+        )
+        self.assertEqual(field_map, expected_field_map)
 
     def test_create_field_map_many_to_many_with_multiple_mapped_fields(self):
-        self.session.scalars.return_value.all.return_value = [self.course1, self.course2]
+        self.session.execute.return_value.all.return_value = [
+            (course.course_name, course.course_id, course.department_name, course.department_number)
+            for course in self.courses
+        ]
         field_map = create_field_map_many_to_many(
             self.session, Course, map_from=["course_name", "course_id"], map_to=["department_name", "department_number"]
         )
@@ -139,8 +161,13 @@ class TestSqlAlchemyHelpers(unittest.TestCase):
         self.assertEqual(field_map, expected_field_map)
 
     def test_create_field_map_many_to_many_with_mapped_fields_and_key_list(self):
-        self.session.execute.return_value.scalars.return_value.first.side_effect = [self.course1, self.course2]
-        key_list = [(getattr(self.course1, "course_name"), getattr(self.course1, "course_id"))]
+        self.session.execute.return_value.all.return_value = [
+            (self.course1.course_name, self.course1.course_id, self.course1.department_name, 500)
+        ]
+        key_list = [
+            (getattr(self.course1, "course_name"), getattr(self.course1, "course_id")),
+            (getattr(self.course2, "course_name"), getattr(self.course2, "course_id")),
+        ]
 
         field_map = create_field_map_many_to_many(
             self.session,
@@ -158,20 +185,16 @@ class TestSqlAlchemyHelpers(unittest.TestCase):
         }
         self.assertEqual(field_map, expected_field_map)
 
-    @patch("propus.helpers.sql_alchemy.get_validation_function_by_model_field")
-    def test_create_field_map_many_to_many_invalid_key_list(self, mock_get_validation_function):
-        mock_get_validation_function.return_value = validate_uuid
-        key_list = [(getattr(self.course1, "course_name"))]
+    def test_create_field_map_many_to_many_invalid_key_list(self):
+        key_list = [getattr(self.course1, "course_name")]
 
         with self.assertRaises(InvalidKeyList):
             create_field_map_many_to_many(
                 self.session, ProgramVersionCourse, ["program_version_id"], ["course_version_id"], key_list
             )
 
-    @patch("propus.helpers.sql_alchemy.get_validation_function_by_model_field")
-    def test_create_field_map_many_to_many_valid_key_list(self, mock_get_validation_function):
-        self.session.execute.return_value.scalars.return_value.first.return_value = self.program_version_course
-        mock_get_validation_function.return_value = validate_uuid
+    def test_create_field_map_many_to_many_valid_key_list(self):
+        self.session.execute.return_value.all.return_value = [(self.program_version_id, self.course_version_id)]
         key_list = [(str(self.program_version_id),)]
 
         field_map = create_field_map_many_to_many(
@@ -185,6 +208,35 @@ class TestSqlAlchemyHelpers(unittest.TestCase):
         for field in self.fields:
             f = get_validation_function_by_model_field(self.session, Salutation, field)
             self.assertIsNone(f)
+        self.assertEqual(get_column_validators(ProgramVersionCourse)["program_version_id"], validate_uuid)
+
+    def test_create_field_map_key_list_single_query(self):
+        keys = [str(uuid.uuid4()) for _ in range(KEYS_PER_QUERY)]
+        self.session.execute.return_value.all.return_value = [(uuid.UUID(keys[0]), self.course_version_id)]
+        field_map = create_field_map(
+            self.session,
+            ProgramVersionCourse,
+            map_from="program_version_id",
+            map_to="course_version_id",
+            key_list=keys + ["not-a-uuid"],
+        )
+        self.session.execute.assert_called_once()
+        self.assertEqual(field_map[keys[0]], self.course_version_id)
+        self.assertIsNone(field_map[keys[1]])
+        self.assertIsNone(field_map["not-a-uuid"])
+
+    def test_create_field_map_key_types(self):
+        # Keys of another type than the column match like they would in Postgres, e.g. "5" on an INTEGER column
+        self.session.execute.return_value.all.return_value = [(5, "2024-25-TERM-05")]
+        field_map = create_field_map(self.session, Term, "anthology_id", "term_name", key_list=["5", 5, "x", 5.5])
+        self.assertEqual(field_map, {"5": "2024-25-TERM-05", 5: "2024-25-TERM-05", "x": None, 5.5: None})
+        self.assertEqual(self.session.execute.call_args.args[0].compile().params["anthology_id_1"], [5])
+
+        self.session.execute.return_value.all.return_value = [(5, "2024-25-TERM-05", "term_id")]
+        field_map = create_field_map_from_composite_key(
+            self.session, Term, map_from=["anthology_id", "term_name"], key_list=[("5", "2024-25-TERM-05")]
+        )
+        self.assertEqual(field_map, {("5", "2024-25-TERM-05"): "term_id"})
 
     def test_get_or_create(self):
         defaults = dict(salutation="foo")
@@ -222,6 +274,49 @@ class TestSqlAlchemyHelpers(unittest.TestCase):
         self.assertEqual(failed_records, expected_result[1])
         self.assertEqual(mapping_dict, {"learner_status_id": expected_result[2]})
 
+    def test_resolve_mappings(self):
+        self.session.execute.return_value.all.return_value = [("Expressed Interest", 1), ("Enrolled", 2)]
+        data = [
+            record
+            for _ in range(1000)
+            for record in [
+                {"cfg_Learner_Status__c": "Expressed Interest"},
+                {"cfg_Learner_Status__c": "Unknown"},
+                {"cfg_Learner_Status__c": "Enrolled"},
+                {"name": "no status"},
+            ]
+        ]
+        timings = {}
+        valid, failed, map = resolve_mappings(
+            self.session,
+            data,
+            "cfg_Learner_Status__c",
+            "learner_status_id",
+            Salutation,
+            "salutation",
+            return_map=True,
+            is_required=True,
+            timings=timings,
+        )
+
+        # The distinct values of the batch are resolved with a single query
+        self.session.execute.assert_called_once()
+        self.assertEqual(map, {"Expressed Interest": 1, "Enrolled": 2, "Unknown": None})
+        self.assertEqual(len(valid), 3000)
+        self.assertEqual(valid[:3], [{"learner_status_id": 1}, {"learner_status_id": 2}, {"name": "no status"}])
+        self.assertEqual(len(failed), 1000)
+        self.assertEqual(len(data), 4000)
+        self.assertEqual(list(timings["learner_status_id"]), ["collect", "resolve", "apply"])
+
+    def test_resolve_mappings_with_parent(self):
+        self.session.execute.return_value.all.return_value = [("Mx.", 1)]
+        data = [{"student": {"salutation": "Mx."}}, {"student": None}, {}]
+        valid, failed = resolve_mappings(
+            self.session, data, "salutation", "salutation_id", Salutation, "salutation", parent="student"
+        )
+        self.assertEqual(valid, [{"student": {"salutation_id": 1}, "salutation_id": 1}])
+        self.assertEqual([f["record"] for f in failed], [{"student": None}, {}])
+
     def test_upsert_changes(self):
         update_or_create_mock = MagicMock(return_value=(self.salutation, False))
         with patch("propus.helpers.sql_alchemy.update_or_create", update_or_create_mock):
@@ -231,6 +326,19 @@ class TestSqlAlchemyHelpers(unittest.TestCase):
             self.assertEqual(upserts, defaults)
             self.assertEqual(upserted, True)
 
+    def test_upsert_changes_without_flush(self):
+        update_or_create_mock = MagicMock(return_value=(self.salutation, False))
+        with patch("propus.helpers.sql_alchemy.update_or_create", update_or_create_mock), patch(
+            "propus.helpers.sql_alchemy.inspect", return_value=MagicMock(persistent=True)
+        ):
+            upserts, upserted = upsert_changes(
+                self.session, Salutation, self.salutation, {"anthology_id": -2}, flush=False, salutation="Mx."
+            )
+        self.assertEqual(upserts, {"anthology_id": -2})
+        self.assertTrue(upserted)
+        self.assertEqual(self.salutation.anthology_id, -2)
+        update_or_create_mock.assert_not_called()
+
     def test_no_upsert_changes(self):
         self.salutation.anthology_id = 5
         defaults = {"anthology_id": 5}
@@ -239,6 +347,78 @@ class TestSqlAlchemyHelpers(unittest.TestCase):
         self.assertEqual(upserts, {})
         self.assertEqual(upserted, False)
 
+    def test_find_enum_value(self):
+        self.assertEqual(find_enum_value(LeadSource, "social media"), LeadSource.social_media)
+        self.assertEqual(find_enum_value(LeadSource, " DMV "), LeadSource.dmv)
+        self.assertIsNone(find_enum_value(LeadSource, "Billboard"))
+        self.assertIsNone(find_enum_value(LeadSource, None))
+
+    def test_bulk_upsert(self):
+        session = MagicMock()
+        session.execute.return_value.all.side_effect = [
+            [MagicMock(inserted=True), MagicMock(inserted=False)],
+            [MagicMock(inserted=True)],
+        ]
+        rows = [
+            {"suffix": "Jr.", "anthology_id": 1},
+            {"suffix": "Sr", "anthology_id": 2},
+            {"suffix": "Sr.", "anthology_id": 2},
+            {"suffix": "III", "anthology_id": 3},
+            {"suffix": "IV", "anthology_id": 4},
+        ]
+        counts = bulk_upsert(session, Suffix, rows, conflict_target=["anthology_id"], chunk_size=3)
+        self.assertEqual(counts, {"inserted": 2, "updated": 1, "unchanged": 1})
+        self.assertEqual(session.execute.call_count, 2)
+
+        sql = str(session.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+        # The duplicate conflict key is written once, with its last values
+        self.assertEqual(sql.count("::VARCHAR"), 3)
+        self.assertIn("ON CONFLICT (anthology_id) DO UPDATE SET suffix = excluded.suffix, modified_at = now()", sql)
+        self.assertIn("WHERE suffix.suffix IS DISTINCT FROM excluded.suffix RETURNING xmax = 0 AS inserted", sql)
+
+    def test_bulk_upsert_without_skipping_unchanged(self):
+        session = MagicMock()
+        bulk_upsert(session, Suffix, [{"suffix": "Jr.", "anthology_id": 1}], ["anthology_id"], skip_unchanged=False)
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        self.assertNotIn("IS DISTINCT FROM", sql)
+
+        with self.assertRaises(ValueError):
+            bulk_upsert(session, Suffix, [], conflict_target="missing_constraint")
+
+    def test_async_get_or_create(self):
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MagicMock())
+        session.flush = AsyncMock()
+        session.execute.return_value.scalars.return_value.one.return_value = self.salutation
+        obj, created = asyncio.run(async_get_or_create(session, Salutation, salutation="Mx."))
+        self.assertIs(obj, self.salutation)
+        self.assertFalse(created)
+        session.add.assert_not_called()
+
+        session.execute.return_value.scalars.return_value.one.side_effect = NoResultFound()
+        obj, created = asyncio.run(async_get_or_create(session, Salutation, {"anthology_id": 4}, salutation="Dr."))
+        self.assertTrue(created)
+        self.assertEqual((obj.salutation, obj.anthology_id), ("Dr.", 4))
+        session.add.assert_called_once_with(obj)
+        session.flush.assert_awaited_once()
+
+        # Created concurrently: the existing record is returned
+        session.flush.side_effect = IntegrityError("INSERT", {}, Exception("duplicate key"))
+        session.execute.return_value.scalars.return_value.one.side_effect = [NoResultFound(), self.salutation]
+        obj, created = asyncio.run(async_get_or_create(session, Salutation, salutation="Mx."))
+        self.assertIs(obj, self.salutation)
+        self.assertFalse(created)
+
+    def test_async_bulk_upsert(self):
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MagicMock())
+        session.execute.return_value.all.side_effect = [[MagicMock(inserted=True)], [MagicMock(inserted=False)]]
+        rows = [{"suffix": "Jr.", "anthology_id": 1}, {"suffix": "Sr.", "anthology_id": 2}]
+        counts = asyncio.run(async_bulk_upsert(session, Suffix, rows, conflict_target=["anthology_id"], chunk_size=1))
+        self.assertEqual(counts, {"inserted": 1, "updated": 1, "unchanged": 0})
+        sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        self.assertIn("ON CONFLICT (anthology_id) DO UPDATE SET suffix = excluded.suffix", sql)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -16,6 +16,7 @@ from propus.helpers.sql_calbright.enrollment import (
     get_instructor_loads,
     get_instructors_to_assign,
     assign_enrollment_course_term_sections,
+    assign_sections_batch,
 )
 from propus.calbright_sql.course import Course
 from propus.calbright_sql.course_version import CourseVersion
@@ -104,6 +105,17 @@ class TestEnrollmentHelper(unittest.TestCase):
         resp = fetch_program_version_by_course_versions(session_mock, "Data Analysis", "BUS500 - v2.0, BUS501 - v2.0")
         self.assertEqual(resp.program_version_id, self.fpv_query_resp)
 
+    @patch("propus.helpers.sql_calbright.enrollment.create_program_version_signature_map")
+    def test_fetch_program_version_by_course_versions_signature(self, mock_signature_map):
+        session_mock = MagicMock()
+        mock_signature_map.return_value = {
+            ("Data Analysis", frozenset({("BUS500", 2.0), ("BUS501", 2.0)})): "PROGRAM_VERSION_2",
+        }
+
+        resp = fetch_program_version_by_course_versions(session_mock, "Data Analysis", "BUS500 - v2.0, BUS501 - v2.0")
+        self.assertEqual(resp, "PROGRAM_VERSION_2")
+        session_mock.scalars.assert_not_called()
+
     def test_fetch_course_version(self):
         cv_id = "COURSE_VERSION_1234"
         c_id = "COURSE_768439"
@@ -221,6 +233,22 @@ class TestEnrollmentHelper(unittest.TestCase):
         )
         self.assertTrue(self.update_performed)
 
+    def test_upsert_enrollment_with_term_calendar(self):
+        term_calendar = MagicMock()
+        term_calendar.first_term_on_or_after.return_value = MagicMock(id="Term_ID_123")
+        self.session_mock.add = Mock()
+
+        enrollment = upsert_enrollment(
+            self.session_mock,
+            user=User(ccc_id="TEST_CCC_ID", student=Student(enrollment_student=[])),
+            enrollment_data=self.enrollment_data,
+            term_calendar=term_calendar,
+        )
+        term_calendar.first_term_on_or_after.assert_called_once_with("2024-04-22")
+        self.session_mock.scalars.assert_not_called()
+        self.assertEqual(enrollment.first_term_id, "Term_ID_123")
+        self.session_mock.add.assert_called_once_with(enrollment)
+
     def add_new_enrollment(self, enrollment):
         self.assertTrue(isinstance(enrollment, Enrollment))
         self.assertEqual(enrollment.enrollment_date, self.enrollment_data.get("enrollment_date"))
@@ -271,7 +299,7 @@ class TestEnrollmentHelper(unittest.TestCase):
 
         mock_program_version_course = MagicMock()
         mock_program_version_course.course_version.course.course_instructor = [MagicMock(instructor=MagicMock(id=2))]
-        mock_session.query.return_value.join.return_value.filter.return_value.all.return_value = [
+        mock_session.query.return_value.join.return_value.filter.return_value.options.return_value.all.return_value = [
             mock_program_version_course
         ]
 
@@ -304,6 +332,57 @@ class TestEnrollmentHelper(unittest.TestCase):
         self.assertIs(mock_enrollment_course_term.course_version_section, mock_section)
         mock_session.commit.assert_called_once()
 
+    @patch("propus.helpers.sql_calbright.enrollment.get_instructor_loads", autospec=True)
+    def test_assign_sections_batch(self, mock_get_instructor_loads):
+        mock_session = MagicMock()
+        mock_get_instructor_loads.return_value = {"a": 2, "c": 1}
+        # (section, program version course, instructor)
+        mock_session.execute.return_value.all.return_value = [
+            ("section-1a", 1, "a"),
+            ("section-1b", 1, "b"),
+            ("section-1c", 1, "c"),
+            ("section-2a", 2, "a"),
+        ]
+        program_course_versions = [
+            MagicMock(course_version_id=10, id=1),
+            MagicMock(course_version_id=20, id=2),
+            MagicMock(course_version_id=30, id=3),
+        ]
+
+        def course_term(ect_id, enrollment_id, course_version_id, section=None):
+            ect = MagicMock(spec=EnrollmentCourseTerm)
+            ect.id = ect_id
+            ect.enrollment_id = enrollment_id
+            ect.course_version_id = course_version_id
+            ect.course_version_section_id = section
+            ect.course_version_section = None
+            ect.enrollment.program_version.program_course_version = program_course_versions
+            return ect
+
+        cohort = [
+            course_term("ect-1", "e1", 10),
+            course_term("ect-2", "e2", 10),
+            course_term("ect-3", "e3", 10),
+            course_term("ect-4", "e1", 20),
+            course_term("ect-5", "e4", 10, section="section-1a"),
+            course_term("ect-6", "e4", 30),
+        ]
+
+        result = assign_sections_batch(mock_session, cohort)
+
+        # The least loaded instructor first, the loads being updated after each assignment
+        self.assertEqual(
+            result, {"ect-1": "section-1b", "ect-2": "section-1b", "ect-3": "section-1c", "ect-4": "section-2a"}
+        )
+        mock_get_instructor_loads.assert_called_once_with(session=mock_session)
+        # Advisory lock, sections and one bulk update
+        self.assertEqual(mock_session.execute.call_count, 3)
+        self.assertEqual(
+            mock_session.execute.call_args.args[1],
+            [{"id": ect_id, "course_version_section_id": section_id} for ect_id, section_id in result.items()],
+        )
+        mock_session.commit.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
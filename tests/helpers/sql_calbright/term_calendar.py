@@ -0,0 +1,74 @@
+import unittest
+from collections import namedtuple
+from datetime import date, datetime, time
+from unittest.mock import MagicMock
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, create_engine, select
+
+from propus.helpers.sql_calbright.term_calendar import TermCalendar
+
+TermRow = namedtuple("TermRow", ["id", "term_name", "start_date", "end_date", "add_drop_date", "anthology_id"])
+
+
+class TestTermCalendar(unittest.TestCase):
+    def setUp(self):
+        self.terms = [
+            TermRow("t2", "2024-25-TERM-02", date(2024, 4, 1), date(2024, 6, 30), None, 2),
+            TermRow("t1", "2024-25-TERM-01", date(2024, 1, 1), date(2024, 3, 15), None, 1),
+            TermRow("t3", "2024-25-TERM-03", date(2024, 7, 1), date(2024, 9, 30), None, 3),
+        ]
+        self.calendar = TermCalendar(self.terms)
+
+    def test_load(self):
+        session = MagicMock()
+        session.execute.return_value.all.return_value = self.terms
+        calendar = TermCalendar.load(session)
+        self.assertEqual(len(calendar), 3)
+        session.execute.assert_called_once()
+
+    def test_first_term_on_or_after(self):
+        self.assertEqual(self.calendar.first_term_on_or_after(date(2023, 12, 1)).id, "t1")
+        self.assertEqual(self.calendar.first_term_on_or_after(date(2024, 1, 1)).id, "t1")
+        self.assertEqual(self.calendar.first_term_on_or_after("2024-01-02").id, "t2")
+        self.assertEqual(self.calendar.first_term_on_or_after(datetime(2024, 4, 1)).id, "t2")
+        self.assertEqual(self.calendar.first_term_on_or_after(datetime(2024, 4, 1, 10)).id, "t3")
+        self.assertEqual(self.calendar.first_term_on_or_after("2024-04-01T10:00:00").id, "t2")
+        self.assertIsNone(self.calendar.first_term_on_or_after(date(2024, 7, 2)))
+
+    def test_first_term_on_or_after_matches_query(self):
+        # Postgres compares the DATE start_date with a timestamp as midnight of that day. SQLite does not promote dates,
+        # so the starts are stored as midnight timestamps to run the query of upsert_enrollment the same way
+        engine = create_engine("sqlite://")
+        metadata = MetaData()
+        term = Table("term", metadata, Column("id", String), Column("start_date", DateTime))
+        metadata.create_all(engine)
+        with engine.begin() as con:
+            con.execute(
+                term.insert(),
+                [{"id": t.id, "start_date": datetime.combine(t.start_date, time.min)} for t in self.terms],
+            )
+            for day in [
+                datetime(2023, 12, 31, 23, 59),
+                datetime(2024, 1, 1),
+                datetime(2024, 1, 1, 0, 0, 1),
+                datetime(2024, 4, 1, 10),
+                datetime(2024, 6, 30),
+                datetime(2024, 7, 1, 9),
+            ]:
+                expected = con.execute(
+                    select(term.c.id).filter(term.c.start_date >= day).order_by(term.c.start_date)
+                ).scalar()
+                first_term = self.calendar.first_term_on_or_after(day)
+                self.assertEqual(first_term.id if first_term else None, expected, day)
+
+    def test_term_covering_or_following(self):
+        self.assertEqual(self.calendar.term_covering_or_following(date(2023, 12, 1)).id, "t1")
+        self.assertEqual(self.calendar.term_covering_or_following("2024-03-15").id, "t1")
+        # Between two terms
+        self.assertEqual(self.calendar.term_covering_or_following(date(2024, 3, 20)).id, "t2")
+        self.assertEqual(self.calendar.term_covering_or_following(date(2024, 9, 30)).id, "t3")
+        self.assertIsNone(self.calendar.term_covering_or_following(date(2024, 10, 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_s3
+
+from propus.aws.s3 import AWS_S3
+from propus.helpers.storage import LocalStorage, S3Storage
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.local = LocalStorage(self.directory.name)
+        self.s3 = MagicMock()
+        self.s3_storage = S3Storage(self.s3, bucket="calbright-etl", prefix="/snapshots/")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_local_storage(self):
+        self.assertFalse(self.local.exists("canvas/course_115.json"))
+        self.assertIsNone(self.local.read("canvas/course_115.json"))
+
+        self.local.write("canvas/course_115.json", '{"id": 115}')
+        self.local.write("canvas/course_116.json", b'{"id": 116}')
+        self.local.write("other.json", "{}")
+        self.assertTrue(self.local.exists("canvas/course_115.json"))
+        self.assertEqual(self.local.read("canvas/course_116.json"), '{"id": 116}')
+        self.assertEqual(sorted(self.local.list("canvas/")), ["canvas/course_115.json", "canvas/course_116.json"])
+
+        self.local.write("canvas/course_115.json", '{"id": 115, "name": "BUS500"}')
+        self.assertEqual(self.local.read("canvas/course_115.json"), '{"id": 115, "name": "BUS500"}')
+
+        self.local.delete("canvas/course_115.json")
+        self.local.delete("canvas/course_115.json")
+        self.assertEqual(sorted(self.local.list()), ["canvas/course_116.json", "other.json"])
+
+    @mock_s3
+    def test_s3_storage_read(self):
+        s3_client = boto3.client("s3", "us-west-2")
+        s3_client.create_bucket(Bucket="calbright-etl", CreateBucketConfiguration={"LocationConstraint": "us-west-2"})
+        s3_client.put_object(Bucket="calbright-etl", Key="snapshots/course_115.json", Body="{}")
+        storage = S3Storage(AWS_S3(boto3.resource("s3", "us-west-2"), s3_client), "calbright-etl", prefix="snapshots")
+
+        with patch.object(s3_client, "get_object", wraps=s3_client.get_object) as get_object:
+            self.assertEqual(storage.read("course_115.json"), "{}")
+            # A missing key is a single request, not retried
+            self.assertIsNone(storage.read("course_116.json"))
+            self.assertEqual(get_object.call_count, 2)
+
+        # Other errors are raised
+        with self.assertRaises(ClientError):
+            S3Storage(storage.s3, "missing-bucket").read("course_115.json")
+
+    def test_s3_storage_write_delete_list(self):
+        self.s3_storage.write("course_115.json", "{}")
+        self.s3.write_to_s3.assert_called_once_with("calbright-etl", "snapshots/course_115.json", "{}")
+
+        self.s3_storage.delete("course_115.json")
+        self.s3.delete_objects.assert_called_once_with("calbright-etl", ["snapshots/course_115.json"])
+
+        self.s3.list_objects.return_value = iter([{"Key": "snapshots/course_115.json"}])
+        self.assertEqual(list(self.s3_storage.list("course_")), ["course_115.json"])
+        self.s3.list_objects.assert_called_once_with("calbright-etl", "snapshots/course_")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import json
 import unittest
 
 from propus.salesforce import Salesforce
@@ -46,6 +47,22 @@ class TestSalesforceContactRecord(TestAPIClient):
         self.success_response = {"response": {"data": self.test_data}}
         self.assertIsNone(self.salesforce.update_contact_record(self.test_data.get("s_id"), **self.test_data))
 
+    def test_update_contact_records(self):
+        self.test_name = "composite_sobjects"
+        records = {f"SF_{i}": {"Phone": str(i)} for i in range(450)}
+        calls = []
+
+        def make_request(url, data=None, req_type="get"):
+            calls.append(json.loads(data))
+            return [{"id": r["id"], "success": True, "errors": []} for r in json.loads(data)["records"]]
+
+        self.salesforce.make_request = make_request
+        results = self.salesforce.update_contact_records(records)
+        self.assertEqual([r["id"] for r in results], list(records))
+        self.assertEqual([len(c["records"]) for c in calls], [200, 200, 50])
+        self.assertEqual(calls[0]["records"][0], {"attributes": {"type": "Contact"}, "id": "SF_0", "Phone": "0"})
+        self.assertFalse(calls[0]["allOrNone"])
+
     def test_create_contact_record(self):
         self.test_name = "create_contact"
         self.success_response = {"response": {"data": self.test_data}}
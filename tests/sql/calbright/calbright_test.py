@@ -0,0 +1,193 @@
+import unittest
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.dialects.postgresql import psycopg2
+
+from propus.calbright_sql.calbright import Calbright
+from propus.calbright_sql.event import Event, EventSource
+from propus.helpers.sql_calbright.expressed_interest import fetch_programs_by_name
+from propus.helpers.sql_calbright.program import fetch_courses_for_program
+
+
+class TestCalbrightCopyRows(unittest.TestCase):
+    def setUp(self):
+        engine = MagicMock()
+        engine.dialect = psycopg2.dialect()
+        self.calbright = Calbright(engine)
+        self.calbright.session = MagicMock()
+        self.connection = self.calbright.session.connection.return_value
+        self.cursor = self.connection.connection.cursor.return_value
+        self.copied = []
+
+        def copy_expert(sql, file):
+            self.copied.append((sql, "".join(iter(lambda: file.read(16), ""))))
+            self.cursor.rowcount = self.copied[-1][1].count("\n")
+
+        self.cursor.copy_expert.side_effect = copy_expert
+        self.connection.execute.return_value.one.return_value = (1, 1)
+        self.user_id = uuid.uuid4()
+        self.rows = [
+            {
+                "user_id": self.user_id,
+                "event_id": 'say "hi"',
+                "event_source": EventSource.canvas,
+                "event_date": datetime(2024, 5, 1, 12, 30),
+                "event_metadata": {"a": [1, 2]},
+            },
+            (self.user_id, "", None, None, None),
+        ]
+        self.columns = ["user_id", "event_id", "event_source", "event_date", "event_metadata"]
+
+    def test_copy_rows(self):
+        counts = self.calbright.copy_rows(Event, self.rows, self.columns)
+
+        self.assertEqual(counts, {"copied": 2})
+        sql, data = self.copied[0]
+        self.assertEqual(
+            sql,
+            "COPY event (user_id, event_id, event_source, event_date, event_metadata) FROM STDIN WITH (FORMAT csv)",
+        )
+        self.assertEqual(
+            data.splitlines(),
+            [
+                f'"{self.user_id}","say ""hi""","canvas","2024-05-01T12:30:00","{{""a"": [1, 2]}}"',
+                # NULL is an unquoted empty field, an empty string a quoted one
+                f'"{self.user_id}","",,,',
+            ],
+        )
+        self.connection.exec_driver_sql.assert_not_called()
+        self.calbright.session.commit.assert_called_once()
+
+    def test_copy_rows_staging(self):
+        counts = self.calbright.copy_rows(Event, self.rows, self.columns, staging=True, conflict_target=["event_id"])
+
+        self.assertEqual(counts, {"copied": 2, "inserted": 1, "updated": 1})
+        create = self.connection.exec_driver_sql.call_args.args[0]
+        self.assertRegex(create, r"^CREATE TEMPORARY TABLE event_staging_\w+ \(LIKE event INCLUDING DEFAULTS\)")
+        self.assertTrue(self.copied[0][0].startswith("COPY event_staging_"))
+
+        merge = str(self.connection.execute.call_args.args[0].compile(dialect=psycopg2.dialect()))
+        self.assertIn("SELECT DISTINCT ON (event_staging_", merge)
+        self.assertIn("ctid DESC", merge)
+        self.assertIn("ON CONFLICT (event_id) DO UPDATE SET", merge)
+        # json has no equality operator, it is compared as text
+        self.assertIn(
+            "CAST(event.event_metadata AS TEXT) IS DISTINCT FROM CAST(excluded.event_metadata AS TEXT)", merge
+        )
+        self.assertIn("RETURNING xmax = 0 AS inserted", merge)
+
+    def test_copy_rows_rollback(self):
+        self.cursor.copy_expert.side_effect = Exception("invalid input syntax")
+        with self.assertRaises(Exception):
+            self.calbright.copy_rows(Event, self.rows, self.columns)
+        self.calbright.session.rollback.assert_called_once()
+        self.calbright.session.commit.assert_not_called()
+
+
+class TestCalbrightTermCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calbright = Calbright(MagicMock())
+        self.calbright.session = MagicMock()
+        self.calbright.session.execute.return_value.all.return_value = []
+
+    def test_term_calendar(self):
+        calendar = self.calbright.term_calendar()
+        self.assertIs(self.calbright.term_calendar(), calendar)
+        self.calbright.session.execute.assert_called_once()
+
+        self.calbright.invalidate_term_calendar()
+        self.assertIsNot(self.calbright.term_calendar(), calendar)
+        self.assertEqual(self.calbright.session.execute.call_count, 2)
+
+    def test_term_calendar_ttl(self):
+        self.calbright.term_calendar_ttl = 0
+        self.calbright.term_calendar()
+        self.calbright.term_calendar()
+        self.assertEqual(self.calbright.session.execute.call_count, 2)
+
+
+class TestCalbrightReadReplica(unittest.TestCase):
+    def setUp(self):
+        self.primary = create_engine("sqlite://")
+        self.replica = create_engine("sqlite://")
+        for engine, name in [(self.primary, "primary"), (self.replica, "replica")]:
+            with engine.begin() as con:
+                con.execute(text("CREATE TABLE server (name VARCHAR)"))
+                con.execute(text(f"INSERT INTO server VALUES ('{name}')"))
+        self.calbright = Calbright(self.primary, replica_engine=self.replica)
+        self.session = self.calbright.session
+        self.addCleanup(self.calbright.session.remove)
+        self.server = select(text("name")).select_from(text("server"))
+        self.replica_server = self.server.execution_options(use_replica=True)
+
+    def test_without_replica(self):
+        calbright = Calbright(self.primary)
+        self.assertEqual(calbright.session.execute(self.server).scalar(), "primary")
+        self.assertEqual(calbright.execute("SELECT name FROM server"), [("primary",)])
+
+    def test_reads_stay_on_primary(self):
+        self.assertEqual(self.session.execute(self.server).scalar(), "primary")
+
+    def test_use_replica(self):
+        self.assertEqual(self.session.execute(self.replica_server).scalar(), "replica")
+        self.assertEqual(self.calbright.execute(" select name FROM server"), [("replica",)])
+
+    def test_read_after_write(self):
+        self.session.execute(text("INSERT INTO server VALUES ('written')"))
+        self.assertEqual(self.session.execute(self.replica_server.where(text("name = 'written'"))).scalar(), "written")
+        self.session.commit()
+        self.assertEqual(self.session.execute(self.replica_server.where(text("name = 'written'"))).scalar(), "written")
+
+        # Until the session is closed
+        self.session.close()
+        self.assertEqual(self.session.execute(self.replica_server).scalar(), "replica")
+        self.assertEqual(self.session.execute(self.replica_server.with_for_update()).scalar(), "primary")
+        self.assertEqual(self.session.execute(self.replica_server).scalar(), "primary")
+
+    def test_replica_unavailable(self):
+        self.calbright.replica_monitor.mark_unavailable()
+        self.assertEqual(self.session.execute(self.replica_server).scalar(), "primary")
+        self.assertEqual(self.calbright.execute("SELECT name FROM server"), [("primary",)])
+
+        # Tried again after the check interval
+        self.calbright.replica_monitor.check_interval = 0
+        self.assertEqual(self.session.execute(self.replica_server).scalar(), "replica")
+
+    def test_execute_locking_or_writing_selects(self):
+        with patch.object(Calbright, "_execute_on", return_value=[]) as execute_on:
+            for sql in [
+                "SELECT name FROM server FOR UPDATE",
+                "select name from server for no key update skip locked",
+                "SELECT name FROM server FOR SHARE",
+                "SELECT pg_advisory_lock(42)",
+                "SELECT pg_try_advisory_xact_lock(42)",
+                "SELECT nextval('server_id_seq')",
+                "SELECT name INTO server_copy FROM server",
+            ]:
+                self.calbright.execute(sql)
+                self.assertIs(execute_on.call_args.args[0], self.primary, sql)
+            self.calbright.execute("SELECT name FROM server WHERE name LIKE 'form%'")
+            self.assertIs(execute_on.call_args.args[0], self.replica)
+
+    def test_read_only_helpers_use_replica(self):
+        session = MagicMock()
+        fetch_programs_by_name(session, ["Data Analysis"])
+        self.assertTrue(session.scalars.call_args.args[0].get_execution_options().get("use_replica"))
+        session.execute.return_value.scalar_one.return_value.program_version_program = [
+            MagicMock(id=1, program_course_version=[])
+        ]
+        self.assertEqual(fetch_courses_for_program(session, "Data Analysis"), [])
+        self.assertTrue(session.execute.call_args.args[0].get_execution_options().get("use_replica"))
+
+    def test_replica_query_fails(self):
+        with self.replica.begin() as con:
+            con.execute(text("DROP TABLE server"))
+        self.assertEqual(self.calbright.execute("SELECT name FROM server"), [("primary",)])
+        self.assertFalse(self.calbright.replica_monitor.available())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import uuid
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy import select
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from propus.calbright_sql.calbright import Calbright
+from propus.calbright_sql.user import User
+
+
+class TestLoaderProfiles(unittest.TestCase):
+    def test_loader_options(self):
+        profiles = {
+            Calbright.User: "user-with-enrollments",
+            Calbright.Student: "student-with-enrollments",
+            Calbright.Enrollment: "enrollment-with-courses",
+            Calbright.EnrollmentCourseTerm: "enrollment-course-term-with-program",
+            Calbright.CourseVersion: "course-version-with-program-versions",
+            Calbright.ProgramVersionCourse: "program-version-course-with-instructors",
+        }
+        for model, profile in profiles.items():
+            options = model.loader_options(profile)
+            self.assertTrue(options)
+            # The options compile against their model
+            str(select(model).options(*options).compile(dialect=postgresql.dialect()))
+
+        with self.assertRaises(ValueError):
+            User.loader_options("missing-profile")
+
+    def test_eager_load(self):
+        session = Session()
+        session.execute = MagicMock()
+        users = [User(id=uuid.uuid4()) for _ in range(3)]
+        for user in users[:2]:
+            make_transient_to_detached(user)
+            session.add(user)
+
+        # The profile is loaded once for every persistent user, and not loaded again
+        User.eager_load(users, "user-with-enrollments")
+        users[0].load_profile("user-with-enrollments")
+        session.execute.assert_called_once()
+        statement = session.execute.call_args.args[0]
+        self.assertEqual(statement.whereclause.right.value, [users[0].id, users[1].id])
+
+
+if __name__ == "__main__":
+    unittest.main()
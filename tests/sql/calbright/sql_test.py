@@ -4,6 +4,7 @@ import string
 import unittest
 from unittest.mock import MagicMock, Mock
 
+from propus.anthology.configuration._cache import build_configuration_indexes
 from propus.calbright_sql.calbright import Calbright
 from propus.calbright_sql.enrollment_status import EnrollmentStatus
 from propus.calbright_sql.program_version_course import ProgramVersionCourse
@@ -68,6 +69,9 @@ class TestSqlCalbright(unittest.TestCase):
     async def receive_data(self, _):
         return {"value": [self.input_record]}
 
+    async def receive_indexes(self, _):
+        return build_configuration_indexes([self.input_record])
+
     def receive_competencies(self, **kwargs):
         if self.fetch_comp_called:
             return []
@@ -104,6 +108,8 @@ class TestSqlCalbright(unittest.TestCase):
     def test_seed_data_scripts(self):
         anth_mock = MagicMock()
         anth_mock.fetch_configurations = Mock(side_effect=self.receive_data)
+        anth_mock.fetch_cached_configurations = Mock(side_effect=self.receive_data)
+        anth_mock.fetch_configuration_indexes = Mock(side_effect=self.receive_indexes)
 
         strut_mock = MagicMock()
         strut_mock.fetch_competencies = Mock(side_effect=self.receive_competencies)
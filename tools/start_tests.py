@@ -11,6 +11,7 @@ from propus.logging_utility import Logging
 from tests.anthology.certificate.create import TestAnthologyCertificateCreate
 from tests.anthology.configuration.copy import TestAnthologyConfigurationCopy
 from tests.anthology.configuration.create import TestAnthologyConfigurationCreate
+from tests.anthology.configuration.cache import TestAnthologyConfigurationCache
 from tests.anthology.configuration.read import TestAnthologyConfigurationRead
 from tests.anthology.course.change import TestAnthologyCourseChange
 from tests.anthology.course.drop import TestAnthologyCourseDrop
@@ -20,6 +21,8 @@ from tests.anthology.course.register import TestAnthologyCourseRegister
 from tests.anthology.course.reinstate import TestAnthologyCourseReinstate
 from tests.anthology.course.unregister import TestAnthologyCourseUnregister
 from tests.anthology.enrollment.create import TestAnthologyEnrollmentCreate
+from tests.anthology.odata.batch import TestAnthologyODataBatch
+from tests.anthology.odata.read import TestAnthologyODataRead
 from tests.anthology.student.create import TestAnthologyStudentCreate
 from tests.anthology.student.read import TestAnthologyStudentRead
 from tests.anthology.student.update import TestAnthologyStudentUpdate
@@ -41,12 +44,16 @@ from tests.canvas.enrollment.create import TestCanvasEnrollmentCreate
 from tests.canvas.enrollment.delete import TestCanvasEnrollmentDelete
 from tests.canvas.enrollment.read import TestCanvasEnrollmentRead
 from tests.canvas.enrollment.update import TestCanvasEnrollmentUpdate
+from tests.canvas.graphql.read import TestCanvasGraphQLRead
 from tests.canvas.module.read import TestCanvasModuleRead
+from tests.canvas.sis_import.create import TestCanvasSisImportCreate
+from tests.canvas.sis_import.read import TestCanvasSisImportRead
 from tests.canvas.submission.read import TestCanvasSubmissionRead
 from tests.canvas.term.create import TestCanvasTermCreate
 from tests.canvas.term.delete import TestCanvasTermDelete
 from tests.canvas.term.read import TestCanvasTermRead
 from tests.canvas.term.update import TestCanvasTermUpdate
+from tests.canvas.throttle import TestCanvasThrottle
 from tests.canvas.user.create import TestCanvasUserCreate
 from tests.canvas.user.read import TestCanvasUserRead
 from tests.canvas.user.update import TestCanvasUserUpdate
@@ -64,16 +71,25 @@ from tests.gsuite.user_directory_test import TestUserDirectory
 from tests.gsuite.student_users_test import TestStudentUsersHelpers
 
 from tests.helpers.anthology import TestAnthologyHelpers
+from tests.helpers.anthology_delta_sync import TestAnthologyDeltaSync
+from tests.helpers.anthology_webhook_batch import TestAnthologyWebhookBatch
 from tests.helpers.canvas import TestCanvasHelpers
+from tests.helpers.canvas_course_snapshot import TestCanvasCourseSnapshotCache
+from tests.helpers.canvas_page_view_export import TestCanvasPageViewExport
+from tests.helpers.canvas_sis_import import TestCanvasSisImportHelpers
+from tests.helpers.canvas_submission_sync import TestCanvasSubmissionSync
+from tests.helpers.canvas_workflow import TestCanvasWorkflowExecutor
 from tests.helpers.field_maps import TestFieldMaps
 from tests.helpers.input_validations import TestInputValidations
 from tests.helpers.etl import TestETL
 from tests.helpers.salesforce import TestSalesforceInputValidations
 from tests.helpers.sql_alchemy import TestSqlAlchemyHelpers
+from tests.helpers.storage import TestStorage
 from tests.helpers.sql_calbright.contact import TestContactHelper
 from tests.helpers.sql_calbright.course_version_sections import TestCourseVersionSectionsHelper
 from tests.helpers.sql_calbright.enrollment import TestEnrollmentHelper
 from tests.helpers.sql_calbright.expressed_interest import ExpressInterest
+from tests.helpers.sql_calbright.term_calendar import TestTermCalendar
 from tests.helpers.sql_calbright.term_grades import TestUpsertEotgRecords
 
 from tests.hubspot.transactional_email import TestHubspotTransactionalEmails
@@ -103,6 +119,12 @@ from tests.slack.base import TestSlack
 from tests.strut import TestStrut
 
 from tests.sql.calbright.sql_test import TestSqlCalbright
+from tests.sql.calbright.calbright_test import (
+    TestCalbrightCopyRows,
+    TestCalbrightReadReplica,
+    TestCalbrightTermCalendar,
+)
+from tests.sql.calbright.loader_profile_test import TestLoaderProfiles
 
 from tests.symplicity.csm import TestCSM
 
@@ -116,7 +138,6 @@ from tests.zoom import TestZoom
 from tests.tangoe.tangoe_test import TangoeTest
 from tests.tangoe.people_test import TangoePeopleTest
 
-
 logger = Logging.get_logger("unit_test")
 
 
@@ -124,6 +145,7 @@ tests = [
     TestAnthologyCertificateCreate,
     TestAnthologyConfigurationCopy,
     TestAnthologyConfigurationCreate,
+    TestAnthologyConfigurationCache,
     TestAnthologyConfigurationRead,
     TestAnthologyCourseChange,
     TestAnthologyCourseDrop,
@@ -133,7 +155,11 @@ tests = [
     TestAnthologyCourseReinstate,
     TestAnthologyCourseUnregister,
     TestAnthologyEnrollmentCreate,
+    TestAnthologyODataBatch,
+    TestAnthologyODataRead,
     TestAnthologyHelpers,
+    TestAnthologyDeltaSync,
+    TestAnthologyWebhookBatch,
     TestAnthologyStudentCreate,
     TestAnthologyStudentRead,
     TestAnthologyStudentUpdate,
@@ -151,12 +177,16 @@ tests = [
     TestCanvasEnrollmentDelete,
     TestCanvasEnrollmentRead,
     TestCanvasEnrollmentUpdate,
+    TestCanvasGraphQLRead,
     TestCanvasModuleRead,
+    TestCanvasSisImportCreate,
+    TestCanvasSisImportRead,
     TestCanvasSubmissionRead,
     TestCanvasTermCreate,
     TestCanvasTermDelete,
     TestCanvasTermRead,
     TestCanvasTermUpdate,
+    TestCanvasThrottle,
     TestCanvasUserCreate,
     TestCanvasUserRead,
     TestCanvasUserUpdate,
@@ -170,10 +200,17 @@ tests = [
     TestETL,
     TestSqlAlchemyHelpers,
     TestCanvasHelpers,
+    TestCanvasCourseSnapshotCache,
+    TestCanvasPageViewExport,
+    TestStorage,
+    TestCanvasSisImportHelpers,
+    TestCanvasSubmissionSync,
+    TestCanvasWorkflowExecutor,
     TestContactHelper,
     TestCourseVersionSectionsHelper,
     TestEnrollmentHelper,
     ExpressInterest,
+    TestTermCalendar,
     TestUpsertEotgRecords,
     TestHubspotTransactionalEmails,
     TestInputValidations,
@@ -197,6 +234,10 @@ tests = [
     TestStudentUsersHelpers,
     TestSecurityValidation,
     TestSqlCalbright,
+    TestCalbrightCopyRows,
+    TestCalbrightTermCalendar,
+    TestCalbrightReadReplica,
+    TestLoaderProfiles,
     TestCSM,
     TestTwilio,
     TestUserDirectory,